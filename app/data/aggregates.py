@@ -0,0 +1,139 @@
+"""Agrégats précalculés pour les routes `/api/stats`.
+
+Chaque route de statistiques parcourait toute la table à chaque requête
+(moyenne, mode, `pd.cut`, groupby par type et par jour). Les données ne
+changeant qu'au rechargement, tous ces agrégats sont calculés ensemble, en
+une seule construction par snapshot, et mémorisés dans le store du
+snapshot (`TransactionStore.derived`) : un nouveau snapshot (nouvelle
+version) repart d'un cache vide.
+"""
+
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.data.aggregation import aggregate, dense_keys
+from app.data.store import NAT, TransactionStore, date_values
+
+# Tranches de `/api/stats/amount-distribution` (bornes droites incluses,
+# première tranche fermée à gauche, comme `pd.cut(include_lowest=True)`)
+AMOUNT_BINS = [0, 100, 500, 1000, 5000]
+AMOUNT_LABELS = ["0-100", "100-500", "500-1000", "1000-5000"]
+
+NANOS_PER_DAY = 86_400 * 10**9
+
+
+def _mean(total: float, count: int) -> float:
+    return round(float(total / count), 2) if count else 0.0
+
+
+def compute_aggregates(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Calcule tous les agrégats des routes de statistiques.
+
+    Les montants, les codes de type et les jours sont extraits une fois,
+    puis réduits par clé dense (`app.data.aggregation`, pas de groupby
+    pandas).
+
+    Args:
+        df: DataFrame des transactions (montants numériques)
+
+    Returns:
+        Dict avec les clés `overview`, `amount_distribution`, `by_type`
+        et `daily`, au format des réponses des routes
+    """
+    amounts = df["amount"].to_numpy(dtype="float64", na_value=np.nan)
+    valid = ~np.isnan(amounts)
+
+    # Par type de transaction
+    type_codes, categories = dense_keys(df["use_chip"].astype("category"))
+    types = aggregate(type_codes, amounts, len(categories), extrema=False)
+    type_rows = types.rows
+    by_type = [
+        {
+            "type": str(name),
+            "count": int(types.count[i]),
+            "avg_amount": _mean(types.sum[i], types.count[i]),
+        }
+        for i, name in enumerate(categories)
+        if type_rows[i] > 0
+    ]
+
+    # Mode : type le plus fréquent, le plus petit en cas d'égalité
+    most_common_type: Optional[str] = None
+    if type_rows.any():
+        best = min(
+            range(len(categories)),
+            key=lambda i: (-type_rows[i], str(categories[i])),
+        )
+        most_common_type = str(categories[best])
+
+    # Tranches de montants
+    bins = np.searchsorted(AMOUNT_BINS, amounts[valid], side="left")
+    bins[amounts[valid] == AMOUNT_BINS[0]] = 1
+    in_range = (bins >= 1) & (bins < len(AMOUNT_BINS))
+    distribution = np.bincount(
+        bins[in_range] - 1, minlength=len(AMOUNT_LABELS)
+    )
+
+    # Par jour
+    dates = date_values(df["date"])
+    dated = dates != NAT
+    days, day_codes = np.unique(
+        dates[dated] // NANOS_PER_DAY, return_inverse=True
+    )
+    by_day = aggregate(day_codes, amounts[dated], len(days), extrema=False)
+    daily = [
+        {
+            "date": str(np.datetime64(int(day), "D")),
+            "volume": int(by_day.count[i]),
+            "avg_amount": _mean(by_day.sum[i], by_day.count[i]),
+        }
+        for i, day in enumerate(days)
+    ]
+
+    return {
+        "overview": {
+            "total_transactions": len(df),
+            "avg_amount": _mean(amounts[valid].sum(), int(valid.sum())),
+            "most_common_type": most_common_type,
+        },
+        "amount_distribution": {
+            "bins": list(AMOUNT_LABELS),
+            "counts": [int(value) for value in distribution],
+        },
+        "by_type": by_type,
+        "daily": daily,
+    }
+
+
+def get_aggregates(store: TransactionStore) -> Dict[str, Any]:
+    """Retourne les agrégats du snapshot, calculés au premier appel."""
+    return store.derived("aggregates", compute_aggregates)
+
+
+# Dernier comptage de fraudes, pour le DataFrame de labels publié
+_fraud_count: Optional[Tuple[weakref.ref, int]] = None
+
+
+def count_frauds(labels: pd.DataFrame) -> int:
+    """
+    Nombre de labels "Yes", mémorisé pour le DataFrame de labels courant.
+
+    Args:
+        labels: DataFrame `load_train_fraud`
+
+    Returns:
+        Nombre de transactions labellisées frauduleuses
+    """
+    global _fraud_count
+
+    cached = _fraud_count
+    if cached is not None and cached[0]() is labels:
+        return cached[1]
+
+    count = int((labels["is_fraud"] == "Yes").sum())
+    _fraud_count = (weakref.ref(labels), count)
+    return count
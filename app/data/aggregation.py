@@ -0,0 +1,228 @@
+"""Agrégations par clé dense, par accumulation `np.bincount`.
+
+Un groupby pandas hache chaque clé et matérialise un objet par groupe.
+Pour des clés entières denses (identifiants client ou carte, mcc, codes de
+catégories), chaque clé est directement l'indice de son groupe : les
+mesures s'accumulent dans des tableaux de la taille du nombre de groupes,
+en un passage par mesure.
+
+`dense_keys` convertit une colonne en codes denses, `aggregate` calcule
+les mesures par code et `GroupStats.regroup` fusionne des groupes déjà
+agrégés (marginalisation d'un cube, voir `app.data.cube`).
+"""
+
+from typing import Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.data.store import DENSE_SPAN_FACTOR
+
+
+def dense_keys(values: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convertit une colonne en codes de groupe denses.
+
+    - colonne catégorielle : codes des catégories
+    - entiers d'étendue compacte (≤ `DENSE_SPAN_FACTOR` × lignes) : valeur
+      moins le minimum, sans tri
+    - sinon : rang de la valeur parmi les valeurs distinctes
+
+    Args:
+        values: Colonne (Series ou tableau)
+
+    Returns:
+        Tuple (codes ``int64``, -1 pour une valeur absente ; clé de chaque
+        code). Les clés d'une colonne non catégorielle sont triées.
+    """
+    if isinstance(getattr(values, "dtype", None), pd.CategoricalDtype):
+        return (
+            values.cat.codes.to_numpy().astype("int64"),
+            values.cat.categories.to_numpy(),
+        )
+
+    if isinstance(values, pd.Series):
+        if isinstance(values.dtype, pd.api.extensions.ExtensionDtype):
+            values = values.to_numpy(dtype="float64", na_value=np.nan)
+        else:
+            values = values.to_numpy()
+
+    if values.dtype.kind == "f":
+        valid = ~np.isnan(values)
+        if valid.all() and (values == np.floor(values)).all():
+            values = values.astype("int64")
+        else:
+            codes = np.full(len(values), -1, dtype="int64")
+            keys, codes[valid] = np.unique(
+                values[valid], return_inverse=True
+            )
+            return codes, keys
+
+    if values.dtype.kind in "iu" and len(values):
+        low, high = int(values.min()), int(values.max())
+        if high - low < DENSE_SPAN_FACTOR * len(values):
+            codes = values.astype("int64") - low
+            return codes, np.arange(low, high + 1, dtype=values.dtype)
+
+    keys, codes = np.unique(values, return_inverse=True)
+    return codes.astype("int64"), keys
+
+
+class GroupStats:
+    """
+    Mesures par groupe : indice `i` = groupe de code `i`.
+
+    Attributes:
+        rows: Nombre de lignes
+        count: Nombre de valeurs renseignées (non NaN)
+        sum: Somme des valeurs
+        sumsq: Somme des carrés des valeurs
+        min: Minimum (+inf si aucune valeur)
+        max: Maximum (-inf si aucune valeur)
+    """
+
+    def __init__(
+        self,
+        rows: np.ndarray,
+        count: np.ndarray,
+        sum: np.ndarray,
+        sumsq: np.ndarray,
+        min: np.ndarray,
+        max: np.ndarray,
+    ):
+        self.rows = rows
+        self.count = count
+        self.sum = sum
+        self.sumsq = sumsq
+        self.min = min
+        self.max = max
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def mean(self) -> np.ndarray:
+        """Moyenne par groupe (NaN si aucune valeur)."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.sum / self.count
+
+    @property
+    def variance(self) -> np.ndarray:
+        """Variance de population par groupe (NaN si aucune valeur)."""
+        mean = self.mean
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.maximum(self.sumsq / self.count - mean * mean, 0.0)
+
+    def regroup(self, codes: np.ndarray, size: int) -> "GroupStats":
+        """
+        Fusionne des groupes : le groupe `i` rejoint le groupe `codes[i]`.
+
+        Args:
+            codes: Nouveau code de chaque groupe (négatif : groupe écarté)
+            size: Nombre de nouveaux groupes
+
+        Returns:
+            Mesures des nouveaux groupes
+        """
+        stats = self
+        keep = codes >= 0
+        if not keep.all():
+            codes = codes[keep]
+            stats = GroupStats(
+                self.rows[keep],
+                self.count[keep],
+                self.sum[keep],
+                self.sumsq[keep],
+                self.min[keep],
+                self.max[keep],
+            )
+
+        def total(values: np.ndarray) -> np.ndarray:
+            return np.bincount(codes, weights=values, minlength=size)
+
+        minimum, _ = _extrema(codes, stats.min, size)
+        _, maximum = _extrema(codes, stats.max, size)
+        return GroupStats(
+            total(stats.rows).astype("int64"),
+            total(stats.count).astype("int64"),
+            total(stats.sum),
+            total(stats.sumsq),
+            minimum,
+            maximum,
+        )
+
+
+def _extrema(
+    codes: np.ndarray, values: np.ndarray, size: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Minimum et maximum par groupe (+/-inf pour un groupe vide)."""
+    minimum = np.full(size, np.inf)
+    maximum = np.full(size, -np.inf)
+    if len(codes):
+        order = np.argsort(codes, kind="stable")
+        codes, values = codes[order], values[order]
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        minimum[codes[starts]] = np.minimum.reduceat(values, starts)
+        maximum[codes[starts]] = np.maximum.reduceat(values, starts)
+    return minimum, maximum
+
+
+def aggregate(
+    codes: np.ndarray,
+    values: Optional[np.ndarray] = None,
+    size: Optional[int] = None,
+    extrema: bool = True,
+) -> GroupStats:
+    """
+    Agrège des valeurs par code de groupe dense.
+
+    Les lignes de code négatif (clé absente) sont ignorées, les valeurs
+    NaN ne comptent que dans `rows`.
+
+    Args:
+        codes: Code de groupe de chaque ligne (voir `dense_keys`)
+        values: Valeurs numériques (sans valeurs : comptage seul)
+        size: Nombre de groupes (par défaut, plus grand code + 1)
+        extrema: Calculer min et max (tri des lignes par groupe)
+
+    Returns:
+        Mesures par groupe
+    """
+    if size is None:
+        size = int(codes.max()) + 1 if len(codes) else 0
+    if values is not None:
+        values = np.asarray(values, dtype="float64")
+    keep = codes >= 0
+    if not keep.all():
+        codes = codes[keep]
+        values = None if values is None else values[keep]
+
+    rows = np.bincount(codes, minlength=size)
+    if values is None:
+        empty = np.zeros(size)
+        return GroupStats(
+            rows,
+            rows,
+            empty,
+            empty,
+            np.full(size, np.inf),
+            np.full(size, -np.inf),
+        )
+
+    valid = ~np.isnan(values)
+    if not valid.all():
+        codes, values = codes[valid], values[valid]
+
+    if extrema:
+        minimum, maximum = _extrema(codes, values, size)
+    else:
+        minimum = np.full(size, np.nan)
+        maximum = np.full(size, np.nan)
+    return GroupStats(
+        rows,
+        np.bincount(codes, minlength=size),
+        np.bincount(codes, weights=values, minlength=size),
+        np.bincount(codes, weights=values * values, minlength=size),
+        minimum,
+        maximum,
+    )
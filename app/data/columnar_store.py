@@ -0,0 +1,190 @@
+"""Stockage binaire en colonnes des datasets volumineux.
+
+Chaque colonne d'un DataFrame est écrite dans son propre fichier ``.npy``
+et décrite dans un manifeste JSON (type, encodage, empreinte du fichier
+source). Les démarrages suivants rouvrent les colonnes en *memory mapping* :
+aucune donnée n'est relue ni parsée, les pages sont chargées à la demande
+par le système.
+
+Encodages supportés :
+
+- ``numeric`` : entiers, flottants et booléens numpy
+- ``datetime`` : ``datetime64[ns]`` stocké comme une vue ``int64``
+- ``categorical`` : codes entiers + catégories dans le manifeste
+  (les colonnes texte ``object`` sont encodées en dictionnaire)
+- ``masked`` : entiers nullables pandas (valeurs + masque de validité)
+
+Aucun encodage ne recopie les valeurs à l'ouverture : une colonne rouverte
+reste adossée à son fichier mappé (les montants sont stockés tels quels en
+dollars ``float64``, sans conversion depuis des centimes).
+"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+MANIFEST_NAME = "manifest.json"
+FORMAT_VERSION = 3
+
+
+def source_fingerprint(path: Path) -> Optional[Dict[str, int]]:
+    """
+    Calcule l'empreinte d'un fichier source (taille et date de modification).
+
+    Args:
+        path: Chemin du fichier source
+
+    Returns:
+        Dict ``{"size", "mtime_ns"}`` ou None si le fichier est absent
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _encode_column(
+    series: pd.Series, directory: Path, stem: str
+) -> Dict[str, Any]:
+    """Écrit une colonne sur disque et retourne sa description."""
+    dtype = series.dtype
+
+    if isinstance(dtype, pd.CategoricalDtype) or dtype == object:
+        categorical = (
+            series.array
+            if isinstance(dtype, pd.CategoricalDtype)
+            else pd.Categorical(series)
+        )
+        np.save(directory / f"{stem}.npy", np.asarray(categorical.codes))
+        return {
+            "encoding": "categorical",
+            "categories": categorical.categories.tolist(),
+        }
+
+    if isinstance(dtype, pd.api.extensions.ExtensionDtype):
+        if not pd.api.types.is_integer_dtype(dtype):
+            raise TypeError(f"Type de colonne non supporté : {dtype}")
+        values = series.to_numpy(dtype=dtype.numpy_dtype, na_value=0)
+        np.save(directory / f"{stem}.npy", values)
+        np.save(directory / f"{stem}.mask.npy", series.isna().to_numpy())
+        return {"encoding": "masked", "dtype": str(dtype)}
+
+    if pd.api.types.is_datetime64_dtype(dtype):
+        values = series.to_numpy(dtype="datetime64[ns]").view("int64")
+        np.save(directory / f"{stem}.npy", values)
+        return {"encoding": "datetime"}
+
+    np.save(directory / f"{stem}.npy", series.to_numpy())
+    return {"encoding": "numeric", "dtype": str(dtype)}
+
+
+def _decode_column(spec: Dict[str, Any], directory: Path) -> Any:
+    """Rouvre une colonne en memory mapping à partir de sa description."""
+    values = np.load(directory / spec["file"], mmap_mode="r")
+    encoding = spec["encoding"]
+
+    if encoding == "categorical":
+        return pd.Categorical.from_codes(
+            values, categories=spec["categories"]
+        )
+
+    if encoding == "masked":
+        mask = np.load(directory / spec["mask_file"], mmap_mode="r")
+        return pd.arrays.IntegerArray(values, mask)
+
+    if encoding == "datetime":
+        return values.view("datetime64[ns]")
+
+    return values
+
+
+def save_frame(
+    df: pd.DataFrame,
+    directory: Path,
+    fingerprint: Dict[str, int],
+) -> None:
+    """
+    Écrit un DataFrame au format colonnes avec son manifeste.
+
+    L'écriture se fait dans un répertoire temporaire renommé à la fin :
+    un lecteur ne voit jamais un cache à moitié écrit.
+
+    Args:
+        df: DataFrame à persister
+        directory: Répertoire cible du cache
+        fingerprint: Empreinte du fichier source (voir `source_fingerprint`)
+    """
+    directory = Path(directory)
+    tmp_dir = directory.with_name(f"{directory.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    try:
+        columns = []
+        for position, name in enumerate(df.columns):
+            stem = f"col_{position:03d}"
+            spec = _encode_column(df[name], tmp_dir, stem)
+            spec.update({"name": name, "file": f"{stem}.npy"})
+            if spec["encoding"] == "masked":
+                spec["mask_file"] = f"{stem}.mask.npy"
+            columns.append(spec)
+
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "source": fingerprint,
+            "rows": len(df),
+            "columns": columns,
+        }
+        with open(tmp_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp_dir, directory)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def open_frame(
+    directory: Path, fingerprint: Dict[str, int]
+) -> Optional[pd.DataFrame]:
+    """
+    Rouvre un DataFrame persisté, en memory mapping.
+
+    Args:
+        directory: Répertoire du cache
+        fingerprint: Empreinte actuelle du fichier source
+
+    Returns:
+        DataFrame en lecture seule, ou None si le cache est absent,
+        illisible ou obsolète (fichier source modifié)
+    """
+    directory = Path(directory)
+    try:
+        with open(directory / MANIFEST_NAME, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if (
+        manifest.get("format_version") != FORMAT_VERSION
+        or manifest.get("source") != fingerprint
+    ):
+        return None
+
+    try:
+        columns = {
+            spec["name"]: _decode_column(spec, directory)
+            for spec in manifest["columns"]
+        }
+    except (OSError, ValueError, KeyError):
+        return None
+
+    # copy=False : les colonnes restent adossées aux fichiers mappés
+    return pd.DataFrame(columns, copy=False)
@@ -0,0 +1,242 @@
+"""Cube de pré-agrégats pour les analyses multi-dimensionnelles.
+
+Le cube agrège les transactions une fois par snapshot (et par DataFrame de
+labels de fraude) selon toutes les dimensions d'analyse à la fois :
+
+    jour × use_chip × mcc × merchant_state × is_fraud
+
+Chaque cellule porte le nombre de transactions et, sur les montants
+renseignés, leur nombre, somme, somme des carrés, minimum et maximum.
+Toute agrégation sur un sous-ensemble de ces dimensions (avec filtres)
+s'obtient en marginalisant les cellules, sans relire les lignes : la
+moyenne et l'écart-type se déduisent des sommes.
+
+Les dimensions temporelles `month` et `year` sont dérivées du jour.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from app.data.aggregation import GroupStats, aggregate
+from app.data.store import (
+    FRAUD,
+    NAT,
+    NOT_FRAUD,
+    TransactionStore,
+    date_values,
+)
+
+# Dimensions stockées dans le cube
+CUBE_DIMENSIONS = ("day", "use_chip", "mcc", "merchant_state", "is_fraud")
+
+# Dimensions temporelles dérivées du jour, avec leur unité numpy
+TIME_GRAINS = {"month": "M", "year": "Y"}
+
+DIMENSIONS = CUBE_DIMENSIONS + ("month", "year")
+
+# Colonnes des transactions nécessaires à la construction du cube
+CUBE_COLUMNS = ("id", "date", "amount", "use_chip", "mcc", "merchant_state")
+
+NANOS_PER_DAY = 86_400 * 10**9
+
+
+def _fraud_label(value: int) -> str:
+    if value == FRAUD:
+        return "Yes"
+    if value == NOT_FRAUD:
+        return "No"
+    return "Unlabeled"
+
+
+def _encode(values: Any) -> tuple:
+    """Codes entiers (0 = valeur absente) et libellés d'une colonne."""
+    categorical = pd.Categorical(values)
+    labels = [None] + [
+        value.item() if hasattr(value, "item") else value
+        for value in categorical.categories
+    ]
+    return categorical.codes.astype("int64") + 1, labels
+
+
+class RollupCube:
+    """
+    Pré-agrégats par (jour, use_chip, mcc, merchant_state, is_fraud).
+
+    Attributes:
+        codes: Par dimension, code de chaque cellule
+        labels: Par dimension, libellé de chaque code
+        stats: Mesures des montants par cellule (voir `GroupStats`)
+    """
+
+    def __init__(self, df: pd.DataFrame, fraud: np.ndarray):
+        dates = date_values(df["date"])
+        days = np.where(dates == NAT, NAT, dates // NANOS_PER_DAY)
+        columns = {
+            "day": days,
+            "use_chip": df["use_chip"],
+            "mcc": df["mcc"],
+            "merchant_state": df["merchant_state"],
+            "is_fraud": fraud,
+        }
+
+        # Clé composite de chaque ligne (base mixte sur les codes)
+        row_codes: Dict[str, np.ndarray] = {}
+        self.labels: Dict[str, List[Any]] = {}
+        key = np.zeros(len(df), dtype="int64")
+        for name in CUBE_DIMENSIONS:
+            values = columns[name]
+            if name == "day":
+                values = pd.Series(values).where(values != NAT)
+            codes, labels = _encode(values)
+            if name == "day":
+                labels = [None] + [
+                    str(np.datetime64(int(day), "D")) for day in labels[1:]
+                ]
+            if name == "is_fraud":
+                labels = [None] + [_fraud_label(v) for v in labels[1:]]
+            row_codes[name] = codes
+            self.labels[name] = labels
+            key = key * len(labels) + codes
+
+        cells, inverse = np.unique(key, return_inverse=True)
+        size = len(cells)
+
+        # Codes de chaque cellule, retrouvés depuis sa ligne représentative
+        first = np.zeros(size, dtype="int64")
+        first[inverse[::-1]] = np.arange(len(df))[::-1]
+        self.codes = {
+            name: codes[first] for name, codes in row_codes.items()
+        }
+
+        amounts = df["amount"].to_numpy(dtype="float64", na_value=np.nan)
+        self.stats = aggregate(inverse, amounts, size)
+
+    @property
+    def size(self) -> int:
+        return len(self.stats)
+
+    def _dimension_codes(self, name: str) -> tuple:
+        """Codes par cellule et libellés d'une dimension (grains compris)."""
+        if name in CUBE_DIMENSIONS:
+            return self.codes[name], self.labels[name]
+
+        # Mois / année : regroupement des libellés de jours
+        days = np.array(
+            [
+                np.datetime64("NaT") if day is None else np.datetime64(day)
+                for day in self.labels["day"]
+            ],
+            dtype="datetime64[D]",
+        )
+        grains = days.astype(f"datetime64[{TIME_GRAINS[name]}]")
+        codes, labels = _encode(
+            pd.Series(grains.astype(str)).where(~np.isnat(grains))
+        )
+        return codes[self.codes["day"]], labels
+
+    def rollup(
+        self,
+        group_by: Sequence[str],
+        filters: Optional[Dict[str, List[str]]] = None,
+        start_day: Optional[str] = None,
+        end_day: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Agrège les cellules selon des dimensions, après filtrage.
+
+        Args:
+            group_by: Dimensions de regroupement (voir `DIMENSIONS`)
+            filters: Valeurs acceptées par dimension (comparées à leur
+                libellé texte)
+            start_day: Premier jour inclus (ISO), optionnel
+            end_day: Dernier jour inclus (ISO), optionnel
+
+        Returns:
+            Une ligne par groupe : valeurs des dimensions, `count`,
+            `total_amount`, `avg_amount`, `std_amount`, `min_amount`,
+            `max_amount`
+
+        Raises:
+            ValueError: si une dimension est inconnue
+        """
+        unknown = [
+            name
+            for name in list(group_by) + list(filters or {})
+            if name not in DIMENSIONS
+        ]
+        if unknown:
+            raise ValueError(f"Dimensions inconnues: {', '.join(unknown)}")
+
+        keep = np.ones(self.size, dtype=bool)
+        for name, accepted in (filters or {}).items():
+            codes, labels = self._dimension_codes(name)
+            allowed = np.array([str(label) in accepted for label in labels])
+            keep &= allowed[codes]
+
+        if start_day or end_day:
+            days = np.array(self.labels["day"][1:], dtype="datetime64[D]")
+            in_range = np.ones(len(days), dtype=bool)
+            if start_day:
+                in_range &= days >= np.datetime64(start_day, "D")
+            if end_day:
+                in_range &= days <= np.datetime64(end_day, "D")
+            keep &= np.append(False, in_range)[self.codes["day"]]
+
+        cells = np.flatnonzero(keep)
+        key = np.zeros(len(cells), dtype="int64")
+        dimensions = []
+        for name in group_by:
+            codes, labels = self._dimension_codes(name)
+            key = key * len(labels) + codes[cells]
+            dimensions.append((name, codes, labels))
+
+        groups, inverse = np.unique(key, return_inverse=True)
+        group_codes = np.full(self.size, -1, dtype="int64")
+        group_codes[cells] = inverse
+        stats = self.stats.regroup(group_codes, len(groups))
+
+        # Cellule représentative de chaque groupe, pour ses libellés
+        first = np.zeros(len(groups), dtype="int64")
+        first[inverse[::-1]] = cells[::-1]
+
+        columns = {
+            name: [labels[code] for code in codes[first].tolist()]
+            for name, codes, labels in dimensions
+        }
+        columns.update(_summary(stats))
+        return [
+            dict(zip(columns, values)) for values in zip(*columns.values())
+        ]
+
+
+def _summary(stats: GroupStats) -> Dict[str, List[Any]]:
+    """Mesures lisibles par groupe (None si aucun montant renseigné)."""
+    has_amount = stats.count > 0
+
+    def rounded(values: np.ndarray) -> List[Optional[float]]:
+        return [
+            value if valid else None
+            for value, valid in zip(
+                values.round(2).tolist(), has_amount.tolist()
+            )
+        ]
+
+    return {
+        "count": stats.rows.tolist(),
+        "total_amount": stats.sum.round(2).tolist(),
+        "avg_amount": rounded(stats.mean),
+        "std_amount": rounded(np.sqrt(stats.variance)),
+        "min_amount": rounded(stats.min),
+        "max_amount": rounded(stats.max),
+    }
+
+
+def get_cube(store: TransactionStore, labels: pd.DataFrame) -> RollupCube:
+    """Retourne le cube du snapshot, construit au premier appel."""
+    return store.joined(
+        "cube",
+        labels,
+        lambda df, labels: RollupCube(df, store.fraud_column(labels)),
+    )
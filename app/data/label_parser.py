@@ -0,0 +1,86 @@
+"""Lecture en flux de `train_fraud_labels.json`.
+
+Le fichier est un unique objet ``{"target": {"<id>": "Yes" | "No", ...}}``
+de plusieurs millions d'entrées. `json.load` le matérialise en un
+dictionnaire de chaînes Python (plusieurs centaines d'octets par entrée),
+avant toute conversion. Ici le fichier est lu par blocs ; les paires
+``"id": "label"`` de chaque bloc sont extraites puis converties
+directement en tableaux numpy compacts (``int32`` + ``int8``), si bien que
+seul un bloc à la fois existe sous forme d'objets Python.
+"""
+
+import re
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+# Taille des blocs lus : borne le nombre d'objets Python temporaires
+BLOCK_SIZE = 1024 * 1024
+
+LABELS = ("No", "Yes")
+
+_TARGET_KEY = b'"target"'
+_PAIR = re.compile(rb'"(\d+)"\s*:\s*"(Yes|No)"')
+
+
+def _parse_block(block: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    """Extrait les paires (id, label) d'un bloc de texte complet."""
+    pairs = _PAIR.findall(block)
+    if not pairs:
+        return np.empty(0, dtype="int32"), np.empty(0, dtype="int8")
+    ids, labels = zip(*pairs)
+    return (
+        np.array(ids).astype("int32"),
+        (np.array(labels) == b"Yes").astype("int8"),
+    )
+
+
+def parse_fraud_labels(
+    path: Path, block_size: int = BLOCK_SIZE
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Lit les labels de fraude en deux tableaux numpy, bloc par bloc.
+
+    Args:
+        path: Chemin de `train_fraud_labels.json`
+        block_size: Taille des blocs lus, en octets
+
+    Returns:
+        Tuple (identifiants ``int32``, labels ``int8`` : 1 pour "Yes",
+        0 pour "No"), dans l'ordre du fichier
+
+    Raises:
+        ValueError: si le fichier n'a pas de clé "target"
+    """
+    id_parts: List[np.ndarray] = []
+    label_parts: List[np.ndarray] = []
+    carry = b""
+    found_target = False
+
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(block_size)
+            data = carry + block
+            if not found_target:
+                start = data.find(_TARGET_KEY)
+                if start < 0:
+                    if not block:
+                        raise ValueError("Clé 'target' absente")
+                    # La clé peut être à cheval sur deux blocs
+                    carry = data[-len(_TARGET_KEY):]
+                    continue
+                found_target = True
+                data = data[start + len(_TARGET_KEY):]
+
+            # Une entrée ne contient pas de virgule : on coupe après la
+            # dernière, la suite est reportée au bloc suivant
+            cut = len(data) if not block else data.rfind(b",") + 1
+            ids, labels = _parse_block(data[:cut])
+            id_parts.append(ids)
+            label_parts.append(labels)
+            carry = data[cut:]
+            if not block:
+                break
+
+    return np.concatenate(id_parts), np.concatenate(label_parts)
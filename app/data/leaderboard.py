@@ -0,0 +1,165 @@
+"""Classement des clients (`/api/customers/top`).
+
+Les mesures par client (nombre de transactions, total et moyenne des
+montants, taux de fraude) et le classement complet de chaque mesure sont
+calculés une fois par snapshot : un top N est alors une tranche du
+classement. Le taux de fraude dépend aussi des labels : il est mémorisé
+par couple (snapshot, labels), voir `TransactionStore.joined`.
+
+Sur une fenêtre de dates, les mesures sont agrégées sur les seules lignes
+de la fenêtre (index des dates), puis les N premiers sont sélectionnés par
+`np.argpartition`, sans trier tous les clients.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.data.aggregation import aggregate, dense_keys
+from app.data.store import FRAUD, UNLABELED, TransactionStore
+
+# Mesures de classement : nom du paramètre `by` -> mesure
+METRICS = ("amount", "count", "avg", "fraud_rate")
+
+
+def top_k(values: np.ndarray, keys: np.ndarray, n: int) -> np.ndarray:
+    """
+    Positions des N plus grandes valeurs, sans tri complet.
+
+    Les valeurs NaN sont exclues ; à valeur égale, la plus petite clé
+    passe en premier.
+
+    Args:
+        values: Mesure de chaque groupe
+        keys: Clé de chaque groupe (départage des égalités)
+        n: Nombre de groupes retenus
+
+    Returns:
+        Positions des groupes retenus, par valeur décroissante
+    """
+    candidates = np.flatnonzero(~np.isnan(values))
+    if n < len(candidates):
+        part = np.argpartition(-values[candidates], n - 1)[:n]
+        # Les ex aequo du N-ième sont gardés pour un départage stable
+        threshold = values[candidates[part]].min()
+        candidates = candidates[values[candidates] >= threshold]
+    order = np.lexsort((keys[candidates], -values[candidates]))
+    return candidates[order[:n]]
+
+
+class ClientLeaderboard:
+    """
+    Mesures par client et classements, pour un ensemble de lignes.
+
+    Attributes:
+        clients: Identifiant de chaque client (clients sans ligne exclus)
+        values: Par mesure de `METRICS`, valeur de chaque client (NaN si
+            non définie)
+    """
+
+    def __init__(self, clients: np.ndarray, values: Dict[str, np.ndarray]):
+        self.clients = clients
+        self.values = values
+        self._ranks: Dict[str, np.ndarray] = {}
+
+    def ranking(self, metric: str) -> np.ndarray:
+        """Classement complet d'une mesure (positions), mémorisé."""
+        ranks = self._ranks.get(metric)
+        if ranks is None:
+            values = self.values[metric]
+            ranks = self._ranks[metric] = top_k(
+                values, self.clients, len(values)
+            )
+        return ranks
+
+    def top(self, metric: str, n: int, ranked: bool = True) -> np.ndarray:
+        """
+        Positions des N premiers clients d'une mesure.
+
+        Args:
+            metric: Mesure de `METRICS`
+            n: Nombre de clients
+            ranked: Utiliser (et mémoriser) le classement complet ; sinon
+                sélection par `argpartition`, pour un classement à usage
+                unique
+
+        Returns:
+            Positions dans `clients`, par valeur décroissante
+        """
+        if ranked:
+            return self.ranking(metric)[:n]
+        return top_k(self.values[metric], self.clients, n)
+
+
+def _client_codes(store: TransactionStore):
+    """Codes denses des clients de chaque ligne, mémorisés par snapshot."""
+    return store.derived(
+        "codes:client_id", lambda df: dense_keys(df["client_id"])
+    )
+
+
+def _leaderboard(
+    store: TransactionStore,
+    rows: Optional[np.ndarray],
+    fraud: Optional[np.ndarray],
+) -> ClientLeaderboard:
+    """Agrège les mesures par client sur des lignes (None : toutes)."""
+    codes, keys = _client_codes(store)
+    amounts = store.frame["amount"].to_numpy(dtype="float64", na_value=np.nan)
+    if rows is not None:
+        codes, amounts = codes[rows], amounts[rows]
+        fraud = None if fraud is None else fraud[rows]
+
+    stats = aggregate(codes, amounts, len(keys), extrema=False)
+    present = stats.rows > 0
+    values = {
+        "amount": stats.sum,
+        "count": stats.rows.astype("float64"),
+        "avg": stats.mean,
+    }
+    if fraud is not None:
+        labelled = fraud != UNLABELED
+        frauds = aggregate(
+            codes[labelled],
+            fraud[labelled] == FRAUD,
+            len(keys),
+            extrema=False,
+        )
+        values["fraud_rate"] = frauds.mean
+    return ClientLeaderboard(
+        keys[present], {name: v[present] for name, v in values.items()}
+    )
+
+
+def get_leaderboard(
+    store: TransactionStore,
+    labels: Optional[pd.DataFrame] = None,
+    rows: Optional[np.ndarray] = None,
+) -> ClientLeaderboard:
+    """
+    Retourne le classement des clients d'un snapshot.
+
+    Args:
+        store: Store du snapshot
+        labels: DataFrame `load_train_fraud`, requis pour `fraud_rate`
+        rows: Lignes retenues (fenêtre de dates) ; None pour toute la
+            table, dont le classement est mémorisé
+
+    Returns:
+        Mesures et classements par client
+    """
+    if rows is not None:
+        fraud = None if labels is None else store.fraud_column(labels)
+        return _leaderboard(store, rows, fraud)
+    if labels is None:
+        return store.derived(
+            "leaderboard", lambda df: _leaderboard(store, None, None)
+        )
+    return store.joined(
+        "leaderboard",
+        labels,
+        lambda df, labels: _leaderboard(
+            store, None, store.fraud_column(labels)
+        ),
+    )
@@ -1,124 +1,410 @@
+import logging
+import os
+import threading
+from collections import deque
 from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
 import pandas as pd
 
+from app.data.aggregates import get_aggregates
+from app.data.columnar_store import open_frame, save_frame, source_fingerprint
+from app.data.cube import CUBE_COLUMNS, get_cube
+from app.data.label_parser import LABELS, parse_fraud_labels
+from app.data.leaderboard import get_leaderboard
+from app.data.parallel_ingest import RangeParseError, parse_csv_parallel
+from app.data.registry import loader_registry
+from app.data.store import get_store
+from app.data.schema import apply_schema, concat_typed
+
+logger = logging.getLogger(__name__)
+
 DATA_DIR = Path("app/data/dataset")
+CACHE_DIR = DATA_DIR / ".cache"
+
+# Nombre de processus pour parser le CSV des transactions (1 = séquentiel)
+INGEST_WORKERS = int(
+    os.environ.get("APIBANK_INGEST_WORKERS", os.cpu_count() or 1)
+)
+# En dessous de cette taille, le démarrage du pool coûte plus qu'il ne
+# rapporte : le CSV est parsé séquentiellement
+PARALLEL_INGEST_MIN_BYTES = 64 * 1024 * 1024
+
+# Snapshots de transactions remplacés gardés en mémoire, pour que les
+# curseurs de pagination en cours restent lisibles après un rechargement
+SNAPSHOT_RETENTION = int(os.environ.get("APIBANK_SNAPSHOT_RETENTION", 1))
 
 _transactions_df = None
+_retained_snapshots: Deque[pd.DataFrame] = deque(maxlen=SNAPSHOT_RETENTION)
 _df_card_data = None
 _mcc_codes_df = None
 _train_fraud_df = None
 _user_data_df = None
 
-
-def load_transactions(chunksize=50_000) -> pd.DataFrame:
-    """Charge les transactions en paquets puis renvoie un DataFrame complet
-    avec nettoyage."""
-    global _transactions_df
-
-    if _transactions_df is None:
+# Publication des transactions et des labels de fraude : le chargement
+# publié en second voit toujours l'autre dataset et construit la jointure
+_publish_lock = threading.Lock()
+
+# Numéro de publication des datasets : incrémenté à chaque dataset publié
+# (chargement ou rechargement), voir `dataset_version`
+_data_version = 0
+
+# Empreinte (taille, mtime) des fichiers sources des datasets mémoïsés,
+# relevée au moment de leur chargement
+_source_fingerprints: Dict[str, Optional[Dict[str, int]]] = {}
+
+
+def _read_typed_chunks(
+    path: Path,
+    chunksize: int,
+    size: int,
+    progress: Optional[Callable[[float], None]],
+) -> Iterator[pd.DataFrame]:
+    """Lit le CSV par paquets typés en signalant la progression en octets."""
+    if not size:
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            yield apply_schema(chunk)
+        return
+
+    with open(path, "rb") as f:
+        for chunk in pd.read_csv(f, chunksize=chunksize):
+            yield apply_schema(chunk)
+            if progress is not None:
+                progress(f.tell() / size)
+
+
+def _parse_transactions_csv(
+    path: Path,
+    chunksize: int,
+    size: int = 0,
+    progress: Optional[Callable[[float], None]] = None,
+) -> pd.DataFrame:
+    """Parse le CSV des transactions en DataFrame typé.
+
+    Les gros fichiers sont parsés en parallèle par plages d'octets (voir
+    `app.data.parallel_ingest`). Sinon, chaque paquet est nettoyé (montants
+    en centimes, dates) et typé dès sa lecture : le pic mémoire reste
+    proche de la taille finale du DataFrame compact, sans copie
+    intermédiaire en colonnes `object`.
+
+    Dans les deux cas, les NaN des colonnes optionnelles sont conservés ;
+    la conversion en None est faite à la sérialisation (voir
+    `df_to_records`). Si le découpage en plages échoue (ligne vide, saut
+    de ligne entre guillemets), le fichier est reparsé séquentiellement.
+    """
+    if INGEST_WORKERS > 1 and size >= PARALLEL_INGEST_MIN_BYTES:
         try:
-            reader = pd.read_csv(
-                DATA_DIR / "transactions_data.csv", chunksize=chunksize
+            return parse_csv_parallel(
+                path, INGEST_WORKERS, progress=progress
             )
-            _transactions_df = pd.concat(reader, ignore_index=True)
-
-            # Nettoyer le montant : enlever $ et convertir en float
-            _transactions_df["amount"] = (
-                _transactions_df["amount"]
-                .replace(r"[\$,]", "", regex=True)
-                .astype(float)
+        except RangeParseError as e:
+            logger.warning(
+                "Parsing parallèle abandonné (%s), repli séquentiel : %s",
+                path,
+                e,
             )
 
-            # Convertir les dates en datetime
-            _transactions_df["date"] = pd.to_datetime(
-                _transactions_df["date"], errors="coerce"
-            )
+    return concat_typed(_read_typed_chunks(path, chunksize, size, progress))
 
-            # Remplacer les NaN des colonnes optionnelles par None
-            optional_cols = [
-                "use_chip",
-                "merchant_id",
-                "merchant_city",
-                "merchant_state",
-                "zip",
-                "mcc",
-                "errors",
-            ]
-            for col in optional_cols:
-                if col in _transactions_df.columns:
-                    _transactions_df[col] = _transactions_df[col].where(
-                        pd.notna(_transactions_df[col]), None
-                    )
-
-        except FileNotFoundError:
-            raise FileNotFoundError(
-                "Fichier transactions_data.csv introuvable"
-            )
-        except Exception as e:
-            raise Exception(f"Erreur lors du chargement des transactions: {e}")
 
-    return _transactions_df
+def load_transactions(chunksize=50_000) -> pd.DataFrame:
+    """Charge les transactions puis renvoie un DataFrame complet nettoyé.
+
+    Le premier chargement parse le CSV par paquets et écrit une copie
+    binaire en colonnes dans `CACHE_DIR`. Les démarrages suivants rouvrent
+    ce cache en memory mapping, tant que la taille et la date de
+    modification du CSV sont inchangées.
+
+    Les appels concurrents partagent un seul chargement (voir
+    `app.data.registry`), dont la progression est publiée dans le
+    registre.
+    """
+    return loader_registry.load(
+        "transactions",
+        lambda: _load_transactions(chunksize),
+        cached=lambda: _transactions_df,
+    )
+
+
+def reload_transactions(chunksize=50_000) -> pd.DataFrame:
+    """Recharge les transactions et publie une nouvelle version.
+
+    Le nouveau DataFrame et ses index sont construits à côté du snapshot
+    courant, qui reste servi pendant le rechargement, puis publiés par
+    simple remplacement de la référence globale : les requêtes en cours
+    terminent sur l'ancienne version, sans interruption de service.
+    """
+    return loader_registry.load(
+        "transactions", lambda: _load_transactions(chunksize)
+    )
+
+
+def _published() -> None:
+    """Signale la publication d'un dataset (nouvelle version des données)."""
+    global _data_version
+    _data_version += 1
+
+
+def transaction_snapshots() -> List[pd.DataFrame]:
+    """
+    Snapshots de transactions en mémoire, lisibles par les curseurs.
+
+    Returns:
+        Snapshot publié (s'il est chargé), puis les snapshots remplacés
+        gardés (voir `SNAPSHOT_RETENTION`), du plus récent au plus ancien
+    """
+    current = [] if _transactions_df is None else [_transactions_df]
+    return current + list(reversed(_retained_snapshots))
+
+
+def dataset_version() -> Optional[int]:
+    """
+    Version courante de l'ensemble des datasets publiés.
+
+    Toute réponse calculée depuis les datasets est identique tant que
+    cette version ne change pas : elle sert à valider les réponses en
+    cache des clients (ETag) sans appeler les routes.
+
+    Returns:
+        Numéro de publication, ou None si les transactions ne sont pas
+        chargées ou si le fichier d'un dataset mémoïsé a changé (il sera
+        rechargé au prochain accès)
+    """
+    if _transactions_df is None:
+        return None
+    memoized = (
+        ("cards", _df_card_data, DATA_DIR / "cards_data.csv"),
+        ("mcc_codes", _mcc_codes_df, DATA_DIR / "mcc_codes.json"),
+        ("users", _user_data_df, DATA_DIR / "users_data.csv"),
+    )
+    for name, value, path in memoized:
+        if value is not None and _if_unchanged(name, value, path) is None:
+            return None
+    return _data_version
+
+
+def _join_fraud_labels(df: pd.DataFrame, labels: pd.DataFrame) -> None:
+    """Construit les structures jointes aux labels : colonne et cube."""
+    if "id" not in df.columns:
+        return
+    store = get_store(df)
+    store.fraud_column(labels)
+    if set(CUBE_COLUMNS) <= set(df.columns):
+        get_cube(store, labels)
+
+
+def _load_transactions(chunksize: int) -> pd.DataFrame:
+    global _transactions_df
+
+    source = DATA_DIR / "transactions_data.csv"
+    cache_dir = CACHE_DIR / "transactions"
+    try:
+        fingerprint = source_fingerprint(source)
+        df = None
+        if fingerprint is not None:
+            df = open_frame(cache_dir, fingerprint)
+
+        if df is None:
+            size = fingerprint["size"] if fingerprint else 0
+            df = _parse_transactions_csv(
+                source,
+                chunksize,
+                size,
+                lambda fraction: loader_registry.report_progress(
+                    "transactions", fraction
+                ),
+            )
+            if fingerprint is not None:
+                df = _write_columnar_cache(df, cache_dir, fingerprint)
+
+    except FileNotFoundError:
+        raise FileNotFoundError("Fichier transactions_data.csv introuvable")
+    except Exception as e:
+        raise Exception(f"Erreur lors du chargement des transactions: {e}")
+
+    # Index, agrégats (et jointures aux labels, s'ils sont chargés) construits
+    # une fois, dans le chargement partagé, avant la publication du snapshot
+    store = get_store(df).prepare()
+    if {"amount", "date", "use_chip"} <= set(df.columns):
+        get_aggregates(store)
+    if {"amount", "client_id"} <= set(df.columns):
+        get_leaderboard(store).ranking("amount")
+    with _publish_lock:
+        if _train_fraud_df is not None:
+            _join_fraud_labels(df, _train_fraud_df)
+        if _transactions_df is not None and _transactions_df is not df:
+            _retained_snapshots.append(_transactions_df)
+        _transactions_df = df
+        _published()
+    return df
+
+
+def _write_columnar_cache(
+    df: pd.DataFrame, cache_dir: Path, fingerprint: Dict[str, int]
+) -> pd.DataFrame:
+    """
+    Persiste un DataFrame dans le cache binaire puis le rouvre mappé.
+
+    Le cache n'est qu'une optimisation : en cas d'échec d'écriture
+    (disque plein, droits), le DataFrame parsé est retourné tel quel.
+    """
+    try:
+        save_frame(df, cache_dir, fingerprint)
+    except OSError as e:
+        logger.warning("Cache binaire non écrit (%s) : %s", cache_dir, e)
+        return df
+
+    reopened = open_frame(cache_dir, fingerprint)
+    return reopened if reopened is not None else df
+
+
+def _if_unchanged(name: str, value: Any, path: Path) -> Any:
+    """
+    Retourne un dataset déjà chargé si son fichier source n'a pas changé.
+
+    Args:
+        name: Nom du dataset
+        value: Dataset chargé (ou None)
+        path: Fichier source du dataset
+
+    Returns:
+        `value` si la taille et la date de modification du fichier sont
+        celles relevées au chargement, None sinon (rechargement)
+    """
+    if value is None:
+        return None
+    fingerprint = _source_fingerprints.get(name)
+    if fingerprint is None or fingerprint != source_fingerprint(path):
+        return None
+    return value
 
 
 def load_card():
-    """Charge les données de cartes à partir du fichier csv."""
+    """Charge les données de cartes à partir du fichier csv.
+
+    Le DataFrame est mémoïsé tant que le fichier est inchangé.
+    """
+    path = DATA_DIR / "cards_data.csv"
+    return loader_registry.load(
+        "cards",
+        lambda: _load_card(path),
+        cached=lambda: _if_unchanged("cards", _df_card_data, path),
+    )
+
 
+def _load_card(path: Path):
     global _df_card_data
-    _df_card_data = pd.read_csv(DATA_DIR / "cards_data.csv")
+    fingerprint = source_fingerprint(path)
+    _df_card_data = pd.read_csv(path)
+    _source_fingerprints["cards"] = fingerprint
+    _published()
 
     return _df_card_data
 
 
 def load_mcc_codes():
-    """Charge les codes MCC à partir du fichier csv."""
+    """Charge les codes MCC à partir du fichier json.
 
+    Le DataFrame est mémoïsé tant que le fichier est inchangé.
+    """
+    path = DATA_DIR / "mcc_codes.json"
+    return loader_registry.load(
+        "mcc_codes",
+        lambda: _load_mcc_codes(path),
+        cached=lambda: _if_unchanged("mcc_codes", _mcc_codes_df, path),
+    )
+
+
+def _load_mcc_codes(path: Path):
     global _mcc_codes_df
-    _mcc_codes_df = pd.read_json(DATA_DIR / "mcc_codes.json")
+    fingerprint = source_fingerprint(path)
+    # Le fichier est un dictionnaire plat {code: description}
+    codes = pd.read_json(path, typ="series")
+    if isinstance(codes, pd.Series):
+        codes = codes.rename_axis("mcc").reset_index(name="description")
+    _mcc_codes_df = codes
+    _source_fingerprints["mcc_codes"] = fingerprint
+    _published()
 
     return _mcc_codes_df
 
 
 def load_train_fraud() -> pd.DataFrame:
-    """Charge les labels de fraude à partir du fichier JSON."""
-    global _train_fraud_df
+    """Charge les labels de fraude à partir du fichier JSON.
 
-    # On ne charge que si la variable globale est vide (None)
-    if _train_fraud_df is None:
-        file_path = DATA_DIR / "train_fraud_labels.json"
-        try:
-            # Lecture directe du dictionnaire
-            import json
+    Le fichier est lu en flux vers des colonnes compactes
+    (`transaction_id` en ``int32``, `is_fraud` catégorielle "No"/"Yes"),
+    puis mis en cache au format binaire : les démarrages suivants ne
+    relisent plus le JSON tant qu'il est inchangé.
+    """
+    return loader_registry.load(
+        "fraud_labels", _load_train_fraud, cached=lambda: _train_fraud_df
+    )
 
-            with open(file_path, "r") as f:
-                data = json.load(f)
 
-            # Conversion de la clé "target" en DataFrame
-            # .items() crée deux colonnes : l'index (ID) et la valeur (Yes/No)
-            _train_fraud_df = pd.DataFrame(
-                list(data["target"].items()),
-                columns=["transaction_id", "is_fraud"],
-            )
+def reload_train_fraud() -> pd.DataFrame:
+    """Recharge les labels de fraude (publication atomique)."""
+    return loader_registry.load("fraud_labels", _load_train_fraud)
 
-            # Optimisation optionnelle : convertir les ID en numérique
-            _train_fraud_df["transaction_id"] = pd.to_numeric(
-                _train_fraud_df["transaction_id"]
-            )
 
-        except FileNotFoundError:
-            raise FileNotFoundError(
-                f"Fichier {file_path.name} introuvable dans {DATA_DIR}"
+def _load_train_fraud() -> pd.DataFrame:
+    global _train_fraud_df
+
+    file_path = DATA_DIR / "train_fraud_labels.json"
+    cache_dir = CACHE_DIR / "fraud_labels"
+    try:
+        fingerprint = source_fingerprint(file_path)
+        if fingerprint is None:
+            raise FileNotFoundError(file_path)
+
+        df = open_frame(cache_dir, fingerprint)
+        if df is None:
+            # Lecture en flux : pas de dictionnaire Python intermédiaire
+            ids, labels = parse_fraud_labels(file_path)
+            df = pd.DataFrame(
+                {
+                    "transaction_id": ids,
+                    "is_fraud": pd.Categorical.from_codes(labels, LABELS),
+                }
             )
-        except Exception as e:
-            raise Exception(f"Erreur lors du chargement des labels: {e}")
+            df = _write_columnar_cache(df, cache_dir, fingerprint)
+
+    except FileNotFoundError:
+        raise FileNotFoundError(
+            f"Fichier {file_path.name} introuvable dans {DATA_DIR}"
+        )
+    except Exception as e:
+        raise Exception(f"Erreur lors du chargement des labels: {e}")
 
-    return _train_fraud_df
+    # Labels alignés (et cube construit) sur le snapshot courant avant
+    # publication
+    with _publish_lock:
+        if _transactions_df is not None:
+            _join_fraud_labels(_transactions_df, df)
+        _train_fraud_df = df
+        _published()
+    return df
 
 
 def load_user_data():
-    """Charge les données utilisateur à partir du fichier csv."""
+    """Charge les données utilisateur à partir du fichier csv.
+
+    Le DataFrame est mémoïsé tant que le fichier est inchangé.
+    """
+    path = DATA_DIR / "users_data.csv"
+    return loader_registry.load(
+        "users",
+        lambda: _load_user_data(path),
+        cached=lambda: _if_unchanged("users", _user_data_df, path),
+    )
+
 
+def _load_user_data(path: Path):
     global _user_data_df
-    _user_data_df = pd.read_csv(DATA_DIR / "users_data.csv")
+    fingerprint = source_fingerprint(path)
+    _user_data_df = pd.read_csv(path)
+    _source_fingerprints["users"] = fingerprint
+    _published()
 
     return _user_data_df
 
@@ -0,0 +1,295 @@
+"""Ingestion parallèle d'un CSV volumineux, multi-processus.
+
+Le fichier est découpé en plages d'octets alignées sur les fins de ligne.
+Chaque plage est parsée, nettoyée et typée (voir `app.data.schema`) par un
+processus du pool, qui écrit ses colonnes numériques directement dans des
+tampons en mémoire partagée préalloués, à sa position dans le résultat
+final. Seules les colonnes catégorielles, compactes, transitent par le
+retour des processus.
+
+Limite : les champs entre guillemets ne doivent pas contenir de saut de
+ligne (c'est le cas des fichiers Kaggle du projet). Une plage dont le
+nombre de lignes parsées diffère du comptage (ligne vide, saut de ligne
+entre guillemets) lève `RangeParseError` : l'appelant se replie alors sur
+un parsing séquentiel.
+"""
+
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.data.schema import TRANSACTION_SCHEMA, apply_schema, concat_typed
+
+# Taille des blocs lus pour compter les lignes
+_READ_BLOCK = 16 * 1024 * 1024
+
+# Types numpy des tampons partagés, par type du schéma
+_BUFFER_DTYPES = {
+    "int16": "int16",
+    "int32": "int32",
+    "int64": "int64",
+    "Int32": "int32",
+    "float64": "float64",
+    "money": "float64",
+    "datetime64[ns]": "int64",
+}
+
+BufferSpec = Dict[str, Tuple[str, str]]
+
+
+class RangeParseError(ValueError):
+    """Plage d'octets dont les lignes ne correspondent pas au comptage."""
+
+
+def split_byte_ranges(path: Path, parts: int) -> Tuple[str, List[Tuple]]:
+    """
+    Découpe un CSV en plages d'octets alignées sur les fins de ligne.
+
+    Args:
+        path: Chemin du CSV (avec ligne d'en-tête)
+        parts: Nombre de plages souhaité
+
+    Returns:
+        Tuple (en-tête, liste de plages ``(début, fin)``), la fin étant
+        exclue ; les plages vides sont omises
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        header = f.readline()
+        data_start = f.tell()
+
+        bounds = [data_start]
+        for k in range(1, parts):
+            target = data_start + (size - data_start) * k // parts
+            if target <= bounds[-1]:
+                continue
+            f.seek(target - 1)
+            f.readline()
+            bounds.append(min(f.tell(), size))
+        bounds.append(size)
+
+    ranges = [
+        (start, end) for start, end in zip(bounds, bounds[1:]) if end > start
+    ]
+    return header.decode("utf-8").strip(), ranges
+
+
+def _count_rows(path: str, start: int, end: int) -> int:
+    """Compte les lignes d'une plage (dernière ligne sans saut comprise)."""
+    count = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = f.read(min(_READ_BLOCK, remaining))
+            if not block:
+                break
+            count += block.count(b"\n")
+            last = block[-1:]
+            remaining -= len(block)
+    return count + (last != b"\n")
+
+
+def _parse_range(
+    path: str,
+    start: int,
+    end: int,
+    names: List[str],
+    row_offset: int,
+    expected_rows: int,
+    buffers: BufferSpec,
+    schema: Dict[str, str],
+) -> pd.DataFrame:
+    """
+    Parse une plage du CSV et écrit ses colonnes dans les tampons partagés.
+
+    Exécuté dans un processus du pool.
+
+    Returns:
+        Colonnes de la plage sans tampon partagé (catégorielles)
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        raw = f.read(end - start)
+
+    chunk = apply_schema(
+        pd.read_csv(io.BytesIO(raw), header=None, names=names), schema
+    )
+    del raw
+    if len(chunk) != expected_rows:
+        raise RangeParseError(
+            f"Plage {start}-{end} : {len(chunk)} lignes parsées, "
+            f"{expected_rows} attendues (lignes vides ?)"
+        )
+    rows = slice(row_offset, row_offset + len(chunk))
+
+    for key, (shm_name, dtype) in buffers.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        try:
+            target = np.ndarray((rows.stop,), dtype=dtype, buffer=shm.buf)
+            name, _, part = key.partition("#")
+            series = chunk[name]
+            if part == "mask":
+                target[rows] = series.isna().to_numpy()
+            elif pd.api.types.is_datetime64_dtype(series.dtype):
+                target[rows] = series.to_numpy().view("int64")
+            else:
+                target[rows] = series.to_numpy(dtype=dtype, na_value=0)
+            del target
+        finally:
+            shm.close()
+
+    return chunk[[name for name in names if name not in buffers]]
+
+
+class _SharedColumns:
+    """Tampons partagés préalloués pour les colonnes numériques."""
+
+    def __init__(self, names: List[str], rows: int, schema: Dict[str, str]):
+        self.rows = rows
+        self.schema = schema
+        self.specs: BufferSpec = {}
+        self._segments: Dict[str, shared_memory.SharedMemory] = {}
+
+        for name in names:
+            dtype = _BUFFER_DTYPES.get(schema.get(name, ""))
+            if dtype is None:
+                continue
+            self._allocate(name, dtype)
+            if pd.api.types.is_integer_dtype(schema[name]):
+                # Masque de validité : un entier peut manquer dans le CSV
+                self._allocate(f"{name}#mask", "bool")
+
+    def _allocate(self, key: str, dtype: str) -> None:
+        size = max(self.rows * np.dtype(dtype).itemsize, 1)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        self._segments[key] = shm
+        self.specs[key] = (shm.name, dtype)
+
+    def _copy(self, key: str) -> np.ndarray:
+        """Copie un tampon dans un tableau privé puis libère le tampon."""
+        shm = self._segments.pop(key)
+        dtype = self.specs[key][1]
+        try:
+            view = np.ndarray((self.rows,), dtype=dtype, buffer=shm.buf)
+            values = view.copy()
+            del view
+        finally:
+            shm.close()
+            shm.unlink()
+        return values
+
+    def collect(self, name: str) -> Any:
+        """Retourne la colonne définitive (numpy ou entier nullable)."""
+        values = self._copy(name)
+        if self.schema[name] == "datetime64[ns]":
+            return values.view("datetime64[ns]")
+
+        mask_key = f"{name}#mask"
+        if mask_key in self._segments:
+            mask = self._copy(mask_key)
+            if self.schema[name].startswith("Int") or mask.any():
+                return pd.arrays.IntegerArray(values, mask)
+        return values
+
+    def release(self) -> None:
+        """Libère les tampons restants (en cas d'erreur)."""
+        for shm in self._segments.values():
+            shm.close()
+            shm.unlink()
+        self._segments.clear()
+
+
+def parse_csv_parallel(
+    path: Path,
+    workers: int,
+    schema: Optional[Dict[str, str]] = None,
+    progress: Optional[Callable[[float], None]] = None,
+) -> pd.DataFrame:
+    """
+    Parse un CSV en parallèle et retourne un DataFrame typé.
+
+    Le nombre de lignes de chaque plage est d'abord compté, pour préallouer
+    les colonnes à leur taille finale ; chaque tampon est libéré dès sa
+    copie, si bien que le pic mémoire reste proche de la taille du
+    DataFrame final.
+
+    Args:
+        path: Chemin du CSV
+        workers: Nombre de processus
+        schema: Schéma typé (par défaut celui des transactions)
+        progress: Callback recevant la fraction des octets déjà parsés
+
+    Returns:
+        DataFrame équivalent à un parsing séquentiel suivi de
+        `apply_schema`
+
+    Raises:
+        RangeParseError: Si une plage ne se découpe pas en lignes
+            comptées (ligne vide, saut de ligne entre guillemets)
+    """
+    schema = schema or TRANSACTION_SCHEMA
+    header, ranges = split_byte_ranges(Path(path), workers)
+    names = header.split(",")
+    if not ranges:
+        return apply_schema(pd.DataFrame(columns=names), schema)
+
+    starts, ends = zip(*ranges)
+    # "spawn" : pas de fork d'un processus serveur multi-thread
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context) as pool:
+        paths = [str(path)] * len(ranges)
+        counts = list(pool.map(_count_rows, paths, starts, ends))
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(int)
+
+        shared = _SharedColumns(names, int(offsets[-1]), schema)
+        try:
+            futures = [
+                pool.submit(
+                    _parse_range,
+                    str(path),
+                    start,
+                    end,
+                    names,
+                    int(offset),
+                    count,
+                    shared.specs,
+                    schema,
+                )
+                for start, end, offset, count in zip(
+                    starts, ends, offsets, counts
+                )
+            ]
+            if progress is not None:
+                total = sum(ends) - sum(starts)
+                sizes = {
+                    future: end - start
+                    for future, start, end in zip(futures, starts, ends)
+                }
+                done = 0
+                for future in as_completed(futures):
+                    done += sizes[future]
+                    progress(done / total)
+
+            others = concat_typed(future.result() for future in futures)
+
+            columns = {
+                name: (
+                    shared.collect(name)
+                    if name in shared.specs
+                    else others[name]
+                )
+                for name in names
+            }
+        finally:
+            shared.release()
+
+    return pd.DataFrame(columns, copy=False)
@@ -0,0 +1,324 @@
+"""Planificateur de requêtes pour les filtres de `/api/transactions`.
+
+Chaque filtre est un prédicat d'intervalle sur une colonne (`client_id`
+par égalité, `amount` et `date` par bornes). Pour chaque prédicat
+disposant d'un index dans le `TransactionStore`, le planificateur calcule
+le nombre exact de lignes qu'il sélectionne (recherches dichotomiques, sans
+lire les lignes), puis choisit comme chemin d'accès l'index le plus
+sélectif. Un index pas encore construit (tri de toute la table) n'est
+estimé que si aucun prédicat n'a d'index déjà construit. Les autres
+prédicats ne sont évalués que sur les lignes
+candidates de ce chemin, au lieu de masques de la taille de la table.
+
+Sans prédicat indexable, le plan est un parcours complet (`full_scan`).
+
+Une page suivante (curseur) reprend l'exécution après la dernière ligne
+servie (`QueryPlan.execute_after`) : seuls les candidats situés après
+elle sont lus, jusqu'à remplir la page.
+"""
+
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.data.store import NAT, TransactionStore
+
+# Colonnes pouvant servir de chemin d'accès, par ordre de préférence à
+# sélectivité égale
+ACCESS_PATHS = ("client_id", "date", "amount")
+
+# Candidats filtrés par lot lors de la reprise d'une exécution
+RESUME_BLOCK_ROWS = 65_536
+
+
+class RangePredicate:
+    """Prédicat ``low <= colonne <= high`` (bornes optionnelles, incluses)."""
+
+    def __init__(self, column: str, low: Any = None, high: Any = None):
+        self.column = column
+        self.low = low
+        self.high = high
+
+    def _format(self, value: Any) -> str:
+        # Les bornes de date sont des entiers int64 (voir `date_values`)
+        if self.column == "date":
+            return pd.Timestamp(value).isoformat()
+        return str(value)
+
+    def describe(self) -> str:
+        """Forme lisible du prédicat, utilisée par `explain`."""
+        if self.low is not None and self.low == self.high:
+            return f"{self.column} = {self._format(self.low)}"
+        parts = []
+        if self.low is not None:
+            parts.append(f"{self.column} >= {self._format(self.low)}")
+        if self.high is not None:
+            parts.append(f"{self.column} <= {self._format(self.high)}")
+        return " AND ".join(parts)
+
+    def matches(self, values: np.ndarray) -> np.ndarray:
+        """Masque des valeurs satisfaisant le prédicat (NaN/NaT exclus)."""
+        if values.dtype.kind == "f":
+            keep = ~np.isnan(values)
+        elif self.column == "date":
+            keep = values != NAT
+        else:
+            keep = np.ones(len(values), dtype=bool)
+        if self.low is not None:
+            keep &= values >= self.low
+        if self.high is not None:
+            keep &= values <= self.high
+        return keep
+
+
+class QueryPlan:
+    """
+    Plan d'exécution : chemin d'accès, puis prédicats résiduels.
+
+    `execute` retourne les positions des lignes sélectionnées, dans
+    l'ordre de la table quel que soit le chemin d'accès, et mesure la
+    durée de chaque étape (voir `explain`).
+    """
+
+    def __init__(
+        self,
+        store: TransactionStore,
+        access: Optional[RangePredicate],
+        residual: List[RangePredicate],
+        estimates: Dict[str, int],
+        planning_ms: float,
+    ):
+        self.store = store
+        self.access = access
+        self.residual = residual
+        self.estimates = estimates
+        self.stages: List[Dict[str, Any]] = [
+            {"stage": "plan", "rows": None, "ms": round(planning_ms, 3)}
+        ]
+
+    @property
+    def access_path(self) -> str:
+        return "full_scan" if self.access is None else self.access.column
+
+    def record_stage(self, stage: str, start: float, rows: int) -> None:
+        """Ajoute une étape, mesurée depuis `start` (`perf_counter`)."""
+        elapsed = (time.perf_counter() - start) * 1000
+        self.stages.append(
+            {"stage": stage, "rows": rows, "ms": round(elapsed, 3)}
+        )
+
+    def execute(self) -> Optional[np.ndarray]:
+        """
+        Exécute le plan.
+
+        Returns:
+            Positions triées des lignes sélectionnées, ou None si aucun
+            filtre n'est demandé (toute la table)
+        """
+        if self.access is None and not self.residual:
+            return None
+
+        rows = None
+        if self.access is not None:
+            start = time.perf_counter()
+            rows = _access_rows(self.store, self.access)
+            self.record_stage(f"access:{self.access_path}", start, len(rows))
+
+        for predicate in self.residual:
+            start = time.perf_counter()
+            values = self.store.column_values(predicate.column)
+            if rows is not None:
+                values = values[rows]
+            keep = predicate.matches(values)
+            rows = np.flatnonzero(keep) if rows is None else rows[keep]
+            self.record_stage(
+                f"filter:{predicate.describe()}", start, len(rows)
+            )
+
+        if self.access is not None:
+            start = time.perf_counter()
+            rows = np.sort(rows)
+            self.record_stage("sort", start, len(rows))
+        return rows
+
+    def execute_after(
+        self, row: int, limit: int, total: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Reprend l'exécution après une ligne, pour une page suivante.
+
+        Sans relire les pages précédentes, les candidats situés après
+        `row` sont filtrés par lots jusqu'à `limit` lignes :
+
+        - si le chemin d'accès est une colonne déjà triée (ou s'il n'y en
+          a pas), ses rangs sont des positions : parcours à partir de
+          ``row + 1`` ;
+        - sinon, si le nombre de lignes du résultat (`total`) fait prévoir
+          un parcours de la table plus court que le tri des candidats du
+          chemin d'accès, la table est parcourue à partir de ``row + 1`` ;
+        - sinon les candidats sont triés en ordre de table et repris après
+          `row` par recherche dichotomique.
+
+        Args:
+            row: Position de la dernière ligne déjà servie
+            limit: Nombre maximum de lignes retournées
+            total: Nombre de lignes du résultat complet, s'il est connu
+
+        Returns:
+            Positions des lignes suivantes, dans l'ordre de la table
+        """
+        start = time.perf_counter()
+        blocks, filters = self._candidates_after(row, limit, total)
+        rows = take_rows(
+            (_filter(self.store, filters, block) for block in blocks), limit
+        )
+        self.record_stage(f"resume:{self.access_path}", start, len(rows))
+        return rows
+
+    def _candidates_after(
+        self, row: int, limit: int, total: Optional[int]
+    ) -> Tuple[Iterator[np.ndarray], List[RangePredicate]]:
+        """Candidats après `row` (lots en ordre de table) et leurs filtres."""
+        size = len(self.store.frame)
+        low, high = row + 1, size
+        if self.access is None:
+            return _ranges(low, high), self.residual
+
+        index = None
+        if self.access.column != "client_id":
+            index = self.store.sorted_index(self.access.column)
+        if index is not None and index.order is None:
+            # Colonne déjà triée : les rangs de l'index sont les positions
+            start, stop = index.bounds(self.access.low, self.access.high)
+            return _ranges(max(start, low), stop), self.residual
+
+        candidates = self.estimates[self.access.describe()]
+        if total and limit * size / total < candidates:
+            return _ranges(low, high), [self.access, *self.residual]
+        rows = np.sort(_access_rows(self.store, self.access), kind="stable")
+        rows = rows[np.searchsorted(rows, row, side="right"):]
+        blocks = (
+            rows[start:start + RESUME_BLOCK_ROWS]
+            for start in range(0, len(rows), RESUME_BLOCK_ROWS)
+        )
+        return blocks, self.residual
+
+    def explain(self) -> Dict[str, Any]:
+        """Retourne le plan choisi, les estimations et les durées."""
+        return {
+            "access_path": self.access_path,
+            "access_predicate": (
+                None if self.access is None else self.access.describe()
+            ),
+            "residual_predicates": [p.describe() for p in self.residual],
+            "estimates": self.estimates,
+            "stages": self.stages,
+        }
+
+
+def take_rows(blocks: Iterable[np.ndarray], limit: int) -> np.ndarray:
+    """
+    Premières positions produites par lots, sans lire les lots suivants.
+
+    Args:
+        blocks: Positions retenues, lot par lot, dans l'ordre
+        limit: Nombre maximum de positions
+
+    Returns:
+        Au plus `limit` positions (``int64``)
+    """
+    taken: List[np.ndarray] = []
+    count = 0
+    for rows in blocks:
+        taken.append(rows[:limit - count])
+        count += len(taken[-1])
+        if count >= limit:
+            break
+    return np.concatenate(taken or [[]]).astype("int64")
+
+
+def _ranges(low: int, high: int) -> Iterator[np.ndarray]:
+    """Positions ``[low, high)`` par lots de `RESUME_BLOCK_ROWS`."""
+    for start in range(low, high, RESUME_BLOCK_ROWS):
+        yield np.arange(start, min(start + RESUME_BLOCK_ROWS, high))
+
+
+def _filter(
+    store: TransactionStore,
+    predicates: List[RangePredicate],
+    rows: np.ndarray,
+) -> np.ndarray:
+    """Garde les positions qui satisfont tous les prédicats."""
+    for predicate in predicates:
+        values = store.column_values(predicate.column)[rows]
+        rows = rows[predicate.matches(values)]
+    return rows
+
+
+def _index_key(column: str) -> str:
+    """Clé de l'index d'une colonne dans `TransactionStore.derived`."""
+    return "client" if column == "client_id" else f"sorted:{column}"
+
+
+def _estimate(store: TransactionStore, predicate: RangePredicate) -> int:
+    """Nombre exact de lignes sélectionnées par un prédicat indexé."""
+    if predicate.column == "client_id":
+        return len(store.client_index.rows(predicate.low))
+    index = store.sorted_index(predicate.column)
+    start, stop = index.bounds(predicate.low, predicate.high)
+    return stop - start
+
+
+def _access_rows(
+    store: TransactionStore, predicate: RangePredicate
+) -> np.ndarray:
+    """Positions candidates du chemin d'accès d'un prédicat indexé."""
+    if predicate.column == "client_id":
+        return store.client_index.rows(predicate.low)
+    index = store.sorted_index(predicate.column)
+    return index.rows(*index.bounds(predicate.low, predicate.high))
+
+
+def plan_query(
+    store: TransactionStore, predicates: List[RangePredicate]
+) -> QueryPlan:
+    """
+    Choisit le chemin d'accès le plus sélectif pour un ensemble de filtres.
+
+    Args:
+        store: Store du DataFrame interrogé
+        predicates: Filtres à appliquer (conjonction)
+
+    Returns:
+        Plan prêt à être exécuté
+    """
+    start = time.perf_counter()
+    columns = set(store.frame.columns)
+    candidates: List[Tuple[int, int, RangePredicate]] = []
+    estimates: Dict[str, int] = {"full_scan": len(store.frame)}
+
+    indexed = [
+        p
+        for p in predicates
+        if p.column in ACCESS_PATHS
+        and (p.column != "client_id" or "date" in columns)
+    ]
+    built = [p for p in indexed if store.is_built(_index_key(p.column))]
+    # Un index déjà construit évite de trier la table pendant la requête
+    for predicate in built or indexed:
+        estimate = _estimate(store, predicate)
+        estimates[predicate.describe()] = estimate
+        rank = ACCESS_PATHS.index(predicate.column)
+        candidates.append((estimate, rank, predicate))
+
+    access = None
+    if candidates:
+        estimate, _, best = min(candidates, key=lambda c: c[:2])
+        if estimate < estimates["full_scan"]:
+            access = best
+
+    residual = [p for p in predicates if p is not access]
+    planning_ms = (time.perf_counter() - start) * 1000
+    return QueryPlan(store, access, residual, estimates, planning_ms)
@@ -0,0 +1,151 @@
+"""Registre des chargements de datasets : single-flight et métriques.
+
+Les handlers synchrones de FastAPI s'exécutent dans le pool de threads
+d'anyio : sans coordination, une rafale de premières requêtes lance autant
+de parsings complets du même fichier. Le `LoaderRegistry` garantit qu'un
+seul chargement par dataset est en cours à un instant donné ; les appelants
+concurrents attendent ce chargement et partagent son résultat.
+
+Le registre compte aussi les chargements, leurs durées et leur progression,
+pour vérifier que chaque dataset n'est parsé qu'une fois.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class _Flight:
+    """Chargement en cours, partagé entre l'appelant et ses suiveurs."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.progress = 0.0
+
+
+class LoaderRegistry:
+    """Coordonne les chargements de datasets et collecte leurs métriques."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def _stats_for(self, name: str) -> Dict[str, Any]:
+        return self._stats.setdefault(
+            name,
+            {
+                "loads": 0,
+                "failures": 0,
+                "shared_waits": 0,
+                "last_duration_ms": None,
+                "total_duration_ms": 0.0,
+            },
+        )
+
+    def load(
+        self,
+        name: str,
+        loader: Callable[[], T],
+        cached: Callable[[], Optional[T]] = lambda: None,
+    ) -> T:
+        """
+        Charge un dataset, sans jamais lancer deux chargements concurrents.
+
+        Args:
+            name: Nom du dataset
+            loader: Fonction de chargement ; elle doit publier son résultat
+                (variable globale) avant de rendre la main
+            cached: Retourne la valeur déjà chargée, ou None ; évaluée
+                sous verrou pour ne pas relancer un chargement qui vient
+                de se terminer
+
+        Returns:
+            Résultat du chargement (éventuellement partagé)
+
+        Raises:
+            Exception: l'erreur du chargement, propagée à tous les
+            appelants qui l'attendaient
+        """
+        with self._lock:
+            value = cached()
+            if value is not None:
+                return value
+
+            flight = self._flights.get(name)
+            leader = flight is None
+            if leader:
+                flight = self._flights[name] = _Flight()
+            else:
+                self._stats_for(name)["shared_waits"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        start = time.perf_counter()
+        try:
+            flight.result = loader()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            with self._lock:
+                stats = self._stats_for(name)
+                stats["failures" if flight.error else "loads"] += 1
+                stats["last_duration_ms"] = round(duration, 1)
+                stats["total_duration_ms"] = round(
+                    stats["total_duration_ms"] + duration, 1
+                )
+                del self._flights[name]
+            flight.done.set()
+
+    def report_progress(self, name: str, fraction: float) -> None:
+        """Met à jour la progression (0 à 1) du chargement en cours."""
+        with self._lock:
+            flight = self._flights.get(name)
+            if flight is not None:
+                flight.progress = min(max(fraction, 0.0), 1.0)
+
+    def progress(self, name: str) -> float:
+        """Progression du chargement en cours, 1 si déjà chargé, 0 sinon."""
+        with self._lock:
+            flight = self._flights.get(name)
+            if flight is not None:
+                return flight.progress
+            return 1.0 if self._stats.get(name, {}).get("loads") else 0.0
+
+    def generation(self, name: str) -> int:
+        """
+        Génération d'un dataset, incrémentée à chaque chargement réussi.
+
+        Les caches dérivés d'un dataset mémorisent la génération qui les a
+        produits et se vident quand elle change.
+        """
+        with self._lock:
+            return self._stats.get(name, {}).get("loads", 0)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Retourne les métriques de chargement par dataset."""
+        with self._lock:
+            report = {}
+            for name in set(self._stats) | set(self._flights):
+                entry = dict(self._stats_for(name))
+                flight = self._flights.get(name)
+                entry["generation"] = entry["loads"]
+                entry["in_flight"] = flight is not None
+                if flight is not None:
+                    entry["progress"] = flight.progress
+                report[name] = entry
+        return report
+
+
+loader_registry = LoaderRegistry()
@@ -0,0 +1,155 @@
+"""Schéma typé et compact du DataFrame des transactions.
+
+Sans schéma explicite, pandas infère des ``int64``/``float64`` pour les
+colonnes numériques et des colonnes ``object`` (une chaîne Python par
+ligne) pour les colonnes texte. Le schéma ci-dessous réduit l'empreinte
+mémoire :
+
+- identifiants en ``int32``
+- colonnes texte encodées en dictionnaire (``category``)
+- ``mcc`` en ``int16``, ``zip`` en ``Int32`` nullable (valeurs + masque)
+- ``amount`` (type ``money``) parsé en centimes entiers (``int64``), puis
+  exposé en dollars ``float64`` arrondis au centime : même taille en
+  mémoire, et le cache binaire le stocke tel quel pour le rouvrir mappé
+"""
+
+from typing import Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+TRANSACTION_SCHEMA: Dict[str, str] = {
+    "id": "int32",
+    "date": "datetime64[ns]",
+    "client_id": "int32",
+    "card_id": "int32",
+    "amount": "money",
+    "use_chip": "category",
+    "merchant_id": "int32",
+    "merchant_city": "category",
+    "merchant_state": "category",
+    "zip": "Int32",
+    "mcc": "int16",
+    "errors": "category",
+}
+
+# Équivalent nullable d'un entier numpy, utilisé si la colonne a des NA
+_NULLABLE_INTEGERS = {
+    "int16": "Int16",
+    "int32": "Int32",
+    "int64": "Int64",
+}
+
+
+def parse_amount_cents(values: pd.Series) -> np.ndarray:
+    """
+    Convertit des montants texte (``"$-77.00"``) en centimes entiers.
+
+    Args:
+        values: Série de montants, texte ou numériques
+
+    Returns:
+        Tableau ``int64`` de montants en centimes
+    """
+    if values.dtype == object:
+        values = values.str.replace(r"[\$,]", "", regex=True)
+    dollars = pd.to_numeric(values).to_numpy(dtype="float64")
+    return np.rint(dollars * 100).astype("int64")
+
+
+def _cast_column(series: pd.Series, dtype: str) -> pd.Series:
+    """Convertit une colonne vers le type cible du schéma."""
+    if dtype == "money":
+        return pd.Series(
+            parse_amount_cents(series) / 100, index=series.index
+        )
+
+    if dtype == "category":
+        if series.isna().all():
+            # Paquet sans valeur : catégories texte pour rester fusionnable
+            series = series.astype(object)
+        return series.astype("category")
+
+    if dtype.startswith("datetime64"):
+        return pd.to_datetime(series, errors="coerce", format="ISO8601")
+
+    if dtype in _NULLABLE_INTEGERS and series.isna().any():
+        dtype = _NULLABLE_INTEGERS[dtype]
+
+    if series.dtype == object:
+        series = pd.to_numeric(series)
+    return series.astype(dtype)
+
+
+def apply_schema(
+    df: pd.DataFrame, schema: Dict[str, str] = TRANSACTION_SCHEMA
+) -> pd.DataFrame:
+    """
+    Applique un schéma typé aux colonnes présentes d'un DataFrame.
+
+    Les colonnes absentes du DataFrame sont ignorées, les colonnes hors
+    schéma sont conservées telles quelles.
+
+    Args:
+        df: DataFrame à typer
+        schema: Dictionnaire colonne -> type cible
+
+    Returns:
+        Nouveau DataFrame typé
+
+    Raises:
+        ValueError: si une colonne numérique contient des valeurs invalides
+    """
+    columns = {}
+    for name in df.columns:
+        if name in schema:
+            columns[name] = _cast_column(df[name], schema[name])
+        else:
+            columns[name] = df[name]
+    return pd.DataFrame(columns, copy=False)
+
+
+def concat_typed(frames: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatène des DataFrames typés en conservant les catégories.
+
+    `pd.concat` retombe sur des colonnes `object` quand les catégories
+    diffèrent d'un paquet à l'autre ; ici les colonnes catégorielles sont
+    fusionnées avec `union_categoricals`.
+
+    Args:
+        frames: DataFrames ayant les mêmes colonnes
+
+    Returns:
+        DataFrame concaténé, index réinitialisé
+    """
+    chunks: List[pd.DataFrame] = list(frames)
+    if not chunks:
+        return pd.DataFrame()
+    if len(chunks) == 1:
+        return chunks[0].reset_index(drop=True)
+
+    columns = {}
+    for name in chunks[0].columns:
+        parts = [chunk[name] for chunk in chunks]
+        if isinstance(parts[0].dtype, pd.CategoricalDtype):
+            columns[name] = pd.api.types.union_categoricals(
+                parts, ignore_order=True
+            )
+        else:
+            columns[name] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(columns, copy=False)
+
+
+def column_memory_report(df: pd.DataFrame) -> Dict[str, int]:
+    """
+    Calcule la mémoire occupée par chaque colonne, en octets.
+
+    Args:
+        df: DataFrame à mesurer
+
+    Returns:
+        Dict colonne -> octets (mesure profonde, chaînes Python comprises)
+    """
+    usage = df.memory_usage(deep=True, index=False)
+    return {str(name): int(size) for name, size in usage.items()}
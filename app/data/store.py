@@ -0,0 +1,532 @@
+"""Index en mémoire construits sur le DataFrame des transactions.
+
+Les routes filtrent le DataFrame chargé avec des masques booléens de la
+taille de la table, soit un parcours complet (13M lignes) par requête.
+Le `TransactionStore` associe au DataFrame des index construits une seule
+fois, puis partagés par toutes les requêtes :
+
+- `IdIndex` : identifiant de transaction -> position de ligne
+- `ClientIndex` : lignes regroupées par client, triées par date
+- `SortedIndex` : lignes triées par date (ou par montant), pour les
+  filtres par intervalle
+- colonne de labels de fraude ``int8`` alignée sur les lignes
+
+Les index sont dérivés du DataFrame lui-même (`get_store`) : les routes
+continuent d'appeler `load_transactions()`, et un DataFrame remplacé
+(rechargement, test) obtient automatiquement ses propres index.
+
+Snapshots : un DataFrame publié par `load_transactions` n'est plus jamais
+modifié. Un rechargement construit un nouveau DataFrame et ses index à
+côté, puis le publie en remplaçant la référence globale (affectation
+atomique) ; les requêtes en cours terminent sur l'ancienne version. Chaque
+store porte un numéro de `version` croissant, qui identifie le snapshot
+auprès des caches et des clients.
+"""
+
+import itertools
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Valeur entière des dates absentes (NaT)
+NAT = np.iinfo("int64").min
+
+# Valeurs de la colonne de labels de fraude
+FRAUD = 1
+NOT_FRAUD = 0
+UNLABELED = -1
+
+# Au-delà de ce rapport (étendue des ids / nombre de lignes), la table
+# d'adressage directe coûterait trop de mémoire
+DENSE_SPAN_FACTOR = 2
+
+# Nombre total de positions gardées par le cache de résultats de requêtes
+# d'un store (pagination par curseur) ; un résultat plus grand n'est pas
+# mémorisé
+QUERY_CACHE_ROWS = 4_000_000
+
+
+def _positions_dtype(rows: int) -> str:
+    return "int32" if rows < np.iinfo("int32").max else "int64"
+
+
+class IdIndex:
+    """
+    Index d'une clé primaire entière vers la position de sa ligne.
+
+    Trois représentations, choisies à la construction :
+
+    - clés déjà triées (cas du CSV Kaggle) : recherche dichotomique
+      directement dans la colonne, sans mémoire supplémentaire
+    - clés compactes (étendue ≤ `DENSE_SPAN_FACTOR` × lignes) : table
+      d'adressage directe, un accès mémoire par recherche
+    - sinon : clés triées et permutation, recherche par `searchsorted`
+    """
+
+    def __init__(self, keys: Any):
+        keys = np.asarray(keys)
+        self.rows = len(keys)
+        self.kind = "empty"
+        self._keys = keys
+        self._order: Optional[np.ndarray] = None
+        self._table: Optional[np.ndarray] = None
+        if not self.rows:
+            return
+
+        self._low, self._high = int(keys.min()), int(keys.max())
+        if np.all(keys[1:] > keys[:-1]):
+            self.kind = "sorted"
+            return
+
+        dtype = _positions_dtype(self.rows)
+        if self._high - self._low + 1 <= DENSE_SPAN_FACTOR * self.rows:
+            self.kind = "dense"
+            self._table = np.full(self._high - self._low + 1, -1, dtype)
+            self._table[keys.astype("int64") - self._low] = np.arange(
+                self.rows, dtype=dtype
+            )
+        else:
+            self.kind = "permuted"
+            self._order = np.argsort(keys, kind="stable").astype(dtype)
+            self._keys = keys[self._order]
+
+    def lookup_many(self, keys: Any) -> np.ndarray:
+        """
+        Retourne la position de chaque clé, -1 si elle est absente.
+
+        Args:
+            keys: Clés recherchées (séquence d'entiers)
+
+        Returns:
+            Tableau ``int64`` de positions, dans l'ordre des clés
+        """
+        keys = np.asarray(keys, dtype="int64").ravel()
+        positions = np.full(len(keys), -1, dtype="int64")
+        if self.kind == "empty":
+            return positions
+
+        inside = np.flatnonzero((keys >= self._low) & (keys <= self._high))
+        needles = keys[inside]
+        if self.kind == "dense":
+            positions[inside] = self._table[needles - self._low]
+            return positions
+
+        # Clés converties au type de la colonne : pas de copie de l'index
+        needles = needles.astype(self._keys.dtype)
+        slots = np.searchsorted(self._keys, needles)
+        hit = self._keys[slots] == needles
+        if self._order is not None:
+            slots = self._order[slots]
+        positions[inside[hit]] = slots[hit]
+        return positions
+
+    def lookup(self, key: int) -> int:
+        """Retourne la position d'une clé, -1 si elle est absente."""
+        if self.kind == "empty" or not self._low <= key <= self._high:
+            return -1
+        if self.kind == "dense":
+            return int(self._table[key - self._low])
+
+        # Clé convertie au type de la colonne : pas de copie de l'index
+        slot = int(np.searchsorted(self._keys, self._keys.dtype.type(key)))
+        if self._keys[slot] != key:
+            return -1
+        return slot if self._order is None else int(self._order[slot])
+
+
+def date_values(dates: pd.Series) -> np.ndarray:
+    """
+    Retourne les dates en entiers ``int64`` (nanosecondes epoch).
+
+    Les dates absentes ou invalides valent `NAT` (minimum ``int64``) et
+    sont donc triées en premier.
+
+    Args:
+        dates: Colonne de dates, typée ou texte
+
+    Returns:
+        Tableau ``int64`` (vue sans copie si la colonne est déjà typée)
+    """
+    if not pd.api.types.is_datetime64_dtype(dates.dtype):
+        dates = pd.to_datetime(dates, errors="coerce")
+    return dates.to_numpy(dtype="datetime64[ns]").view("int64")
+
+
+class ClientIndex:
+    """
+    Lignes groupées par client puis triées par date (format CSR).
+
+    `order` est une permutation des lignes triée par ``(client_id, date)`` ;
+    les lignes du i-ème client de `clients` occupent la tranche
+    ``order[offsets[i]:offsets[i + 1]]``. Lire les transactions d'un
+    client coûte une recherche dichotomique parmi les clients, puis une
+    tranche contiguë, déjà en ordre chronologique.
+    """
+
+    def __init__(self, clients: Any, dates: np.ndarray):
+        clients = np.asarray(clients)
+        dtype = _positions_dtype(len(clients))
+        self.order = np.lexsort((dates, clients)).astype(dtype)
+        self.clients, starts = np.unique(
+            clients[self.order], return_index=True
+        )
+        self.offsets = np.append(starts, len(clients)).astype(dtype)
+
+    def rows(self, client_id: int) -> np.ndarray:
+        """
+        Retourne les positions des lignes d'un client, par date croissante.
+
+        Args:
+            client_id: Identifiant du client
+
+        Returns:
+            Vue (sans copie) sur la permutation, vide si client inconnu
+        """
+        i = int(np.searchsorted(self.clients, client_id))
+        if i == len(self.clients) or self.clients[i] != client_id:
+            return self.order[:0]
+        return self.order[self.offsets[i]:self.offsets[i + 1]]
+
+
+class SortedIndex:
+    """
+    Lignes triées par valeur d'une colonne, pour les filtres par intervalle.
+
+    Un intervalle de valeurs se résout en deux recherches dichotomiques
+    (`bounds`), puis en une tranche contiguë de positions (`rows`). Si la
+    colonne est déjà triée (dates du CSV Kaggle), elle sert d'index telle
+    quelle, sans permutation ni copie.
+
+    Les lignes sans valeur (masque `valid`) sont exclues de l'index : elles
+    ne satisfont aucun intervalle.
+    """
+
+    def __init__(self, values: Any, valid: Optional[np.ndarray] = None):
+        values = np.asarray(values)
+        if valid is not None and valid.all():
+            valid = None
+
+        self.order: Optional[np.ndarray] = None
+        if valid is None and np.all(values[1:] >= values[:-1]):
+            self.values = values
+        else:
+            dtype = _positions_dtype(len(values))
+            positions = (
+                np.arange(len(values), dtype=dtype)
+                if valid is None
+                else np.flatnonzero(valid).astype(dtype)
+            )
+            self.order = positions[
+                np.argsort(values[positions], kind="stable")
+            ]
+            self.values = values[self.order]
+        self.size = len(self.values)
+
+    def bounds(self, low: Any = None, high: Any = None) -> Tuple[int, int]:
+        """
+        Retourne la tranche ``[start, stop)`` des valeurs dans l'intervalle.
+
+        Args:
+            low: Borne inférieure incluse (None : pas de borne)
+            high: Borne supérieure incluse (None : pas de borne)
+
+        Returns:
+            Tuple (start, stop) de rangs dans l'ordre trié
+        """
+        start = 0
+        stop = self.size
+        if low is not None:
+            start = int(np.searchsorted(self.values, low, side="left"))
+        if high is not None:
+            stop = int(np.searchsorted(self.values, high, side="right"))
+        return start, max(start, stop)
+
+    def rows(self, start: int, stop: int) -> np.ndarray:
+        """Retourne les positions des lignes de rangs ``[start, stop)``."""
+        if self.order is None:
+            return np.arange(start, stop)
+        return self.order[start:stop]
+
+
+class TransactionStore:
+    """
+    Index dérivés d'un DataFrame de transactions, construits à la demande.
+
+    Chaque index est construit une seule fois, sous verrou, au premier
+    accès ; `prepare` les construit tous d'avance (au chargement).
+    """
+
+    def __init__(self, df: pd.DataFrame, version: int = 0):
+        self.version = version
+        self.created_at = time.time()
+        self._frame = weakref.ref(df)
+        # Réentrant : une structure dérivée peut en construire une autre
+        self._lock = threading.RLock()
+        self._derived: Dict[str, Any] = {}
+        self._joined: Dict[str, Tuple[weakref.ref, Any]] = {}
+        self._queries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._query_rows = 0
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        df = self._frame()
+        if df is None:
+            raise RuntimeError("DataFrame des transactions libéré")
+        return df
+
+    def derived(self, key: str, builder: Callable[[pd.DataFrame], Any]):
+        """
+        Retourne une structure dérivée du DataFrame, construite une fois.
+
+        Args:
+            key: Nom de la structure
+            builder: Fonction de construction, appelée avec le DataFrame
+
+        Returns:
+            La structure mémorisée
+        """
+        value = self._derived.get(key)
+        if value is None:
+            with self._lock:
+                value = self._derived.get(key)
+                if value is None:
+                    value = self._derived[key] = builder(self.frame)
+        return value
+
+    def is_built(self, key: str) -> bool:
+        """Vrai si la structure dérivée `key` est déjà construite."""
+        return key in self._derived
+
+    @property
+    def id_index(self) -> IdIndex:
+        """Index identifiant de transaction -> position de ligne."""
+        return self.derived("id", lambda df: IdIndex(df["id"].to_numpy()))
+
+    @property
+    def client_index(self) -> ClientIndex:
+        """Lignes de chaque client, contiguës et chronologiques."""
+        return self.derived(
+            "client",
+            lambda df: ClientIndex(
+                df["client_id"].to_numpy(), date_values(df["date"])
+            ),
+        )
+
+    def column_values(self, column: str) -> np.ndarray:
+        """
+        Retourne une colonne en tableau numpy comparable aux bornes.
+
+        Les dates sont en ``int64`` (voir `date_values`), les entiers
+        nullables en ``float64`` (NaN pour les valeurs absentes).
+        """
+
+        def build(df: pd.DataFrame) -> np.ndarray:
+            series = df[column]
+            if column == "date":
+                return date_values(series)
+            if isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+                return series.to_numpy(dtype="float64", na_value=np.nan)
+            return series.to_numpy()
+
+        return self.derived(f"values:{column}", build)
+
+    def sorted_index(self, column: str) -> SortedIndex:
+        """Lignes triées par valeur d'une colonne (absences exclues)."""
+
+        def build(df: pd.DataFrame) -> SortedIndex:
+            values = self.column_values(column)
+            if values.dtype.kind == "f":
+                return SortedIndex(values, valid=~np.isnan(values))
+            if column == "date":
+                return SortedIndex(values, valid=values != NAT)
+            return SortedIndex(values)
+
+        return self.derived(f"sorted:{column}", build)
+
+    @property
+    def date_index(self) -> SortedIndex:
+        """Lignes triées par date (dates invalides exclues)."""
+        return self.sorted_index("date")
+
+    def joined(
+        self,
+        key: str,
+        other: pd.DataFrame,
+        builder: Callable[[pd.DataFrame, pd.DataFrame], Any],
+    ):
+        """
+        Retourne une structure dérivée du snapshot et d'un autre DataFrame.
+
+        La structure est construite une fois par couple (snapshot, autre
+        DataFrame) : un rechargement de l'autre DataFrame la reconstruit.
+
+        Args:
+            key: Nom de la structure
+            other: Second DataFrame (ex. labels de fraude)
+            builder: Fonction de construction, appelée avec les deux
+                DataFrames
+
+        Returns:
+            La structure mémorisée
+        """
+        cached = self._joined.get(key)
+        if cached is not None and cached[0]() is other:
+            return cached[1]
+
+        with self._lock:
+            cached = self._joined.get(key)
+            if cached is not None and cached[0]() is other:
+                return cached[1]
+            value = builder(self.frame, other)
+            self._joined[key] = (weakref.ref(other), value)
+        return value
+
+    def fraud_column(self, labels: pd.DataFrame) -> np.ndarray:
+        """
+        Retourne les labels de fraude alignés sur les lignes des transactions.
+
+        La jointure (via `IdIndex`) est faite une fois par couple (snapshot,
+        DataFrame de labels) : un rechargement des labels la refait.
+
+        Args:
+            labels: DataFrame `load_train_fraud` (`transaction_id`,
+                `is_fraud` valant "Yes" ou "No")
+
+        Returns:
+            Tableau ``int8`` en lecture seule, une valeur par ligne :
+            `FRAUD`, `NOT_FRAUD` ou `UNLABELED`
+        """
+
+        def build(df: pd.DataFrame, labels: pd.DataFrame) -> np.ndarray:
+            positions = self.id_index.lookup_many(
+                labels["transaction_id"].to_numpy()
+            )
+            found = positions >= 0
+            is_fraud = (labels["is_fraud"] == "Yes").to_numpy()
+
+            column = np.full(len(df), UNLABELED, dtype="int8")
+            column[positions[found]] = np.where(
+                is_fraud[found], FRAUD, NOT_FRAUD
+            )
+            column.flags.writeable = False
+            return column
+
+        return self.joined("fraud", labels, build)
+
+    def cached_rows(self, key: str) -> Optional[np.ndarray]:
+        """Positions résultat mémorisées d'une requête, ou None (LRU)."""
+        with self._lock:
+            rows = self._queries.get(key)
+            if rows is not None:
+                self._queries.move_to_end(key)
+            return rows
+
+    def query_rows(
+        self, key: str, builder: Callable[[], np.ndarray]
+    ) -> np.ndarray:
+        """
+        Retourne les positions résultat d'une requête, mémorisées (LRU).
+
+        Optimisation des pages suivantes d'une même requête : tant que le
+        résultat est en cache, la page suivante d'un curseur s'y retrouve
+        par recherche dichotomique (voir `cached_rows`) ; sinon elle est
+        reprise depuis les index (`QueryPlan.execute_after`). Le cache est
+        borné par `QUERY_CACHE_ROWS` positions au total.
+
+        Args:
+            key: Signature de la requête (filtres normalisés)
+            builder: Évaluation de la requête, appelée en cas d'absence
+
+        Returns:
+            Positions des lignes résultat, dans l'ordre de pagination
+        """
+        rows = self.cached_rows(key)
+        if rows is not None:
+            return rows
+
+        rows = builder()
+        if len(rows) > QUERY_CACHE_ROWS:
+            return rows
+        with self._lock:
+            if key not in self._queries:
+                self._queries[key] = rows
+                self._query_rows += len(rows)
+            while self._query_rows > QUERY_CACHE_ROWS:
+                _, evicted = self._queries.popitem(last=False)
+                self._query_rows -= len(evicted)
+        return rows
+
+    def prepare(self) -> "TransactionStore":
+        """Construit d'avance les index dont les colonnes sont présentes."""
+        columns = self.frame.columns
+        if "id" in columns:
+            self.id_index
+        if "date" in columns:
+            self.date_index
+            if "client_id" in columns:
+                self.client_index
+        return self
+
+
+_stores: Dict[int, TransactionStore] = {}
+_stores_lock = threading.Lock()
+_versions = itertools.count(1)
+
+
+def get_store(df: pd.DataFrame) -> TransactionStore:
+    """
+    Retourne le store associé à un DataFrame de transactions.
+
+    Le store est créé au premier appel, avec un nouveau numéro de version,
+    puis retrouvé par identité du DataFrame ; il est oublié quand le
+    DataFrame est libéré (plus aucune requête ne l'utilise).
+
+    Args:
+        df: DataFrame retourné par `load_transactions`
+
+    Returns:
+        TransactionStore du DataFrame
+    """
+    key = id(df)
+    store = _stores.get(key)
+    if store is not None and store._frame() is df:
+        return store
+
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None or store._frame() is not df:
+            store = _stores[key] = TransactionStore(df, next(_versions))
+            weakref.finalize(df, _stores.pop, key, None)
+    return store
+
+
+def find_store(
+    version: int, frames: Iterable[pd.DataFrame]
+) -> Optional[TransactionStore]:
+    """
+    Retrouve par sa version le store d'un snapshot parmi des candidats.
+
+    Seuls les DataFrames passés sont cherchés : une version reçue d'un
+    client ne désigne jamais un autre DataFrame enregistré.
+
+    Args:
+        version: Numéro de version (voir `TransactionStore.version`)
+        frames: Snapshots candidats (voir `transaction_snapshots`)
+
+    Returns:
+        Le store, ou None si aucun candidat n'a cette version
+    """
+    for df in frames:
+        store = _stores.get(id(df))
+        if (
+            store is not None
+            and store.version == version
+            and store._frame() is df
+        ):
+            return store
+    return None
@@ -0,0 +1,125 @@
+"""Préchargement des datasets en arrière-plan au démarrage de l'API.
+
+Sans préchargement, la première requête sur chaque router paie le coût
+complet du chargement des données dans le thread de la requête. Le
+`DatasetWarmup` lance le chargement des cinq datasets en parallèle dès le
+démarrage, suit leur progression et expose un état global utilisé par
+l'endpoint de readiness et par le contrôle d'accès des routes de données.
+
+Les chargeurs passent par le `LoaderRegistry` : une requête arrivée pendant
+le préchargement attend le chargement en cours au lieu d'en lancer un
+second, et la progression est lue dans le registre.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from app.data.load_data import (
+    load_card,
+    load_mcc_codes,
+    load_train_fraud,
+    load_transactions,
+    load_user_data,
+)
+from app.data.registry import LoaderRegistry, loader_registry
+
+# Chargeurs des datasets, indexés par leur nom dans le registre
+DATASET_LOADERS: Dict[str, Callable[[], Any]] = {
+    "transactions": load_transactions,
+    "cards": load_card,
+    "users": load_user_data,
+    "mcc_codes": load_mcc_codes,
+    "fraud_labels": load_train_fraud,
+}
+
+
+class DatasetWarmup:
+    """
+    Charge un ensemble de datasets en arrière-plan, un thread par dataset.
+
+    États d'un dataset : ``pending``, ``loading``, ``ready`` ou ``failed``.
+    État global (`status`) :
+
+    - ``idle`` : préchargement non démarré (chargement paresseux)
+    - ``loading`` : au moins un dataset en attente ou en cours
+    - ``failed`` : au moins un dataset en échec, les autres terminés
+    - ``ready`` : tous les datasets chargés
+    """
+
+    def __init__(
+        self,
+        loaders: Dict[str, Callable[[], Any]],
+        registry: LoaderRegistry = loader_registry,
+    ):
+        self.loaders = loaders
+        self.registry = registry
+        self.started_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._datasets: Dict[str, Dict[str, Any]] = {}
+
+    def start(self) -> None:
+        """Démarre le chargement de tous les datasets (une seule fois)."""
+        with self._lock:
+            if self.started_at is not None:
+                return
+            self.started_at = time.time()
+            for name in self.loaders:
+                self._datasets[name] = {
+                    "status": "pending",
+                    "progress": 0.0,
+                    "duration_ms": None,
+                    "error": None,
+                }
+
+        for name in self.loaders:
+            threading.Thread(
+                target=self._load,
+                args=(name,),
+                name=f"warmup-{name}",
+                daemon=True,
+            ).start()
+
+    def _update(self, name: str, **fields: Any) -> None:
+        with self._lock:
+            self._datasets[name].update(fields)
+
+    def _load(self, name: str) -> None:
+        start = time.perf_counter()
+        self._update(name, status="loading")
+        try:
+            self.loaders[name]()
+        except Exception as e:
+            self._update(name, status="failed", error=str(e))
+        else:
+            self._update(name, status="ready", progress=1.0)
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            self._update(name, duration_ms=round(duration, 1))
+
+    @property
+    def status(self) -> str:
+        """État global du préchargement."""
+        with self._lock:
+            states = [d["status"] for d in self._datasets.values()]
+        if self.started_at is None:
+            return "idle"
+        if any(state in ("pending", "loading") for state in states):
+            return "loading"
+        if "failed" in states:
+            return "failed"
+        return "ready"
+
+    def report(self) -> Dict[str, Any]:
+        """Retourne l'état global et le détail par dataset."""
+        with self._lock:
+            datasets = {
+                name: dict(state) for name, state in self._datasets.items()
+            }
+        for name, state in datasets.items():
+            if state["status"] == "loading":
+                state["progress"] = round(self.registry.progress(name), 4)
+        return {"status": self.status, "datasets": datasets}
+
+
+warmup = DatasetWarmup(DATASET_LOADERS)
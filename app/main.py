@@ -1,6 +1,14 @@
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.data.load_data import dataset_version
+from app.data.warmup import warmup
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.etag import ETagMiddleware, cached_routes
+from app.route import clients_routes, fraude_routes, statistiques_routes
 from app.route.main import root_routes
 from app.route.transaction_routes import router
 from app.route.clients_routes import client_route
@@ -8,11 +16,49 @@ from app.route.administration_routes import administration_route
 from app.route.statistiques_routes import stat_router
 from app.route.fraude_routes import fraud_routes
 
+# Préchargement des datasets au démarrage (désactivable : APIBANK_WARMUP=0)
+WARMUP_ENABLED = os.environ.get("APIBANK_WARMUP", "1") != "0"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Démarre le préchargement des datasets en arrière-plan.
+
+    Le démarrage n'attend pas la fin du chargement : les routes de données
+    répondent 503 (avec `Retry-After`) jusqu'à ce que tout soit prêt, et
+    l'état est exposé par `/api/system/ready`.
+    """
+    if WARMUP_ENABLED:
+        warmup.start()
+    yield
+
+
 app = FastAPI(
     title="Fraud Detection API",
     description="API de démonstration pour l’analyse "
                 "de transactions et la détection de fraude.",
     version="1.0.0",
+    lifespan=lifespan,
+)
+
+
+# ------------------------------------------------------------------
+# Middleware ETag : 304 avant l'appel des routes si les données n'ont pas
+# changé (sous le CORS, pour que les 304 portent ses en-têtes)
+# ------------------------------------------------------------------
+app.add_middleware(
+    ETagMiddleware,
+    version=dataset_version,
+    routes=[
+        *cached_routes(stat_router, statistiques_routes.CACHE_CONTROL),
+        *cached_routes(fraud_routes, fraude_routes.CACHE_CONTROL),
+        *cached_routes(
+            client_route,
+            clients_routes.TOP_CACHE_CONTROL,
+            paths=["/api/customers/top"],
+        ),
+    ],
 )
 
 
@@ -27,6 +73,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ------------------------------------------------------------------
+# Middleware de compression (gzip, brotli, zstd selon Accept-Encoding)
+# ------------------------------------------------------------------
+app.add_middleware(CompressionMiddleware)
+
 
 # ------------------------------------------------------------------
 # Routes
@@ -0,0 +1,306 @@
+"""Compression des réponses selon l'en-tête ``Accept-Encoding``.
+
+Les pages de transactions (jusqu'à 1000 lignes) et les exports de la
+recherche partent sans compression ; vers des clients distants, le temps
+de transfert domine. Le middleware compresse les réponses en zstd, brotli
+ou gzip, au choix du client (facteurs de qualité ``q``, puis préférence
+du serveur dans l'ordre de `PREFERRED_ENCODINGS`). zstd et brotli ne sont
+proposés que si leur paquet (``zstandard``, ``brotli``) est installé.
+
+- Une réponse complète plus petite que `MINIMUM_SIZE` octets part telle
+  quelle : la compression ne ferait rien gagner.
+- Une réponse en flux (`StreamingResponse`) est compressée morceau par
+  morceau, chaque morceau étant vidé (flush) aussitôt : rien n'est
+  accumulé et le client décode les lots au fil de l'eau.
+- Un corps (ou morceau) d'au moins `THREAD_MIN_SIZE` octets est compressé
+  dans un thread : la boucle d'événements continue de servir les autres
+  requêtes pendant la compression d'un gros export.
+
+Configuration par variables d'environnement : ``APIBANK_COMPRESSION_MIN_SIZE``
+et ``APIBANK_COMPRESSION_THREAD_SIZE`` (seuils en octets) et
+``APIBANK_GZIP_LEVEL``, ``APIBANK_BROTLI_LEVEL``, ``APIBANK_ZSTD_LEVEL``
+(niveaux de compression).
+"""
+
+import os
+import zlib
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+import anyio
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Taille minimale (octets) d'une réponse complète compressée
+MINIMUM_SIZE = int(os.environ.get("APIBANK_COMPRESSION_MIN_SIZE", 1024))
+
+# Taille (octets) à partir de laquelle un corps est compressé hors de la
+# boucle d'événements (en dessous, le passage par un thread coûte plus)
+THREAD_MIN_SIZE = int(
+    os.environ.get("APIBANK_COMPRESSION_THREAD_SIZE", 256 * 1024)
+)
+
+# Niveaux de compression : compromis débit / taille pour des réponses
+# dynamiques (les niveaux maximaux coûtent plus qu'ils ne font gagner)
+LEVELS: Dict[str, int] = {
+    "gzip": int(os.environ.get("APIBANK_GZIP_LEVEL", 6)),
+    "br": int(os.environ.get("APIBANK_BROTLI_LEVEL", 4)),
+    "zstd": int(os.environ.get("APIBANK_ZSTD_LEVEL", 3)),
+}
+
+# Préférence du serveur, à qualité égale pour le client
+PREFERRED_ENCODINGS = ("zstd", "br", "gzip")
+
+
+class Encoder(ABC):
+    """Compresseur incrémental d'une réponse (interface commune)."""
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        """Compresse un morceau et vide le tampon du compresseur."""
+
+    @abstractmethod
+    def finish(self) -> bytes:
+        """Termine le flux compressé."""
+
+
+class GzipEncoder(Encoder):
+    """Compression gzip (``zlib``, vidage ``Z_SYNC_FLUSH``)."""
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliEncoder(Encoder):
+    """Compression brotli (paquet optionnel ``brotli``)."""
+
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdEncoder(Encoder):
+    """Compression zstd (paquet optionnel ``zstandard``), bloc par bloc."""
+
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(
+            zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        )
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+ENCODERS = {"gzip": GzipEncoder, "br": BrotliEncoder, "zstd": ZstdEncoder}
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """Encodages proposés, par préférence (paquets installés)."""
+    modules = {"gzip": zlib, "br": brotli, "zstd": zstandard}
+    return tuple(
+        name for name in PREFERRED_ENCODINGS if modules[name] is not None
+    )
+
+
+def choose_encoding(
+    accept_encoding: Optional[str], offered: Tuple[str, ...]
+) -> Optional[str]:
+    """
+    Choisit l'encodage d'après l'en-tête ``Accept-Encoding``.
+
+    Args:
+        accept_encoding: Valeur de l'en-tête, ou None
+        offered: Encodages proposés, par préférence du serveur
+
+    Returns:
+        Encodage de plus grande qualité pour le client (à égalité, le
+        premier de `offered`), ou None pour une réponse non compressée
+    """
+    if not accept_encoding:
+        return None
+    qualities: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, *params = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.lower()] = quality
+
+    wildcard = qualities.get("*", 0.0)
+    ranked: List[Tuple[float, int, str]] = []
+    for rank, name in enumerate(offered):
+        quality = qualities.get(name, wildcard)
+        if quality > 0:
+            ranked.append((-quality, rank, name))
+    return min(ranked)[2] if ranked else None
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI de compression des réponses HTTP.
+
+    Args:
+        app: Application ASGI
+        minimum_size: Taille minimale d'une réponse complète compressée
+        levels: Niveau de compression par encodage
+        thread_size: Taille à partir de laquelle un corps est compressé
+            dans un thread
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: Optional[int] = None,
+        levels: Optional[Dict[str, int]] = None,
+        thread_size: Optional[int] = None,
+    ):
+        self.app = app
+        if minimum_size is None:
+            minimum_size = MINIMUM_SIZE
+        if thread_size is None:
+            thread_size = THREAD_MIN_SIZE
+        self.minimum_size = minimum_size
+        self.thread_size = thread_size
+        self.levels = {**LEVELS, **(levels or {})}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(
+            Headers(scope=scope).get("accept-encoding"),
+            available_encodings(),
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressedResponder(
+            send,
+            encoding,
+            self.levels[encoding],
+            self.minimum_size,
+            self.thread_size,
+        )
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressedResponder:
+    """Compresse les messages d'une réponse avant de les transmettre."""
+
+    def __init__(
+        self,
+        send: Send,
+        encoding: str,
+        level: int,
+        minimum: int,
+        thread_size: int,
+    ):
+        self._send = send
+        self._encoding = encoding
+        self._level = level
+        self._minimum = minimum
+        self._thread_size = thread_size
+        self._start: Optional[Message] = None
+        self._encoder: Optional[Encoder] = None
+        self._passthrough = False
+
+    def _encode(self, data: bytes, final: bool) -> bytes:
+        """Compresse un morceau ; le dernier termine le flux compressé."""
+        chunk = self._encoder.compress(data) if data else b""
+        if final:
+            chunk += self._encoder.finish()
+        return chunk
+
+    async def _compress(self, data: bytes, final: bool) -> bytes:
+        """Compresse un morceau, dans un thread s'il est gros."""
+        if len(data) >= self._thread_size:
+            return await anyio.to_thread.run_sync(self._encode, data, final)
+        return self._encode(data, final)
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Retenu jusqu'au premier morceau : la taille et le mode (flux
+            # ou non) décident de la compression
+            self._start = message
+            headers = Headers(raw=message["headers"])
+            self._passthrough = (
+                "content-encoding" in headers
+                or message["status"] < 200
+                or message["status"] in (204, 304)
+            )
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self._start is not None:
+            start, self._start = self._start, None
+            if self._passthrough or (
+                not more_body and len(body) < self._minimum
+            ):
+                self._passthrough = True
+                await self._send(start)
+                await self._send(message)
+                return
+
+            self._encoder = ENCODERS[self._encoding](self._level)
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self._encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                body = await self._compress(body, final=True)
+                headers["Content-Length"] = str(len(body))
+                await self._send(start)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+            await self._send(start)
+
+        if self._passthrough:
+            await self._send(message)
+            return
+
+        chunk = await self._compress(body, final=not more_body)
+        await self._send(
+            {
+                "type": "http.response.body",
+                "body": chunk,
+                "more_body": more_body,
+            }
+        )
@@ -0,0 +1,164 @@
+"""Validation des réponses en cache des clients (ETag / If-None-Match).
+
+Les statistiques, la fraude et le classement des clients ne changent
+qu'au rechargement des datasets, mais les tableaux de bord les
+interrogent toutes les quelques secondes. Pour les routes GET déclarées
+(voir `cached_routes`), le middleware :
+
+- calcule une ETag forte depuis la version des datasets publiés
+  (`dataset_version`), le chemin, les paramètres de requête normalisés et
+  les en-têtes ``Accept`` / ``Accept-Encoding`` (une ETag par
+  représentation : JSON, Arrow, compressée ou non) ;
+- répond 304 sans appeler la route si ``If-None-Match`` contient cette
+  ETag ;
+- sinon ajoute l'ETag et le ``Cache-Control`` de la route à la réponse,
+  si les données n'ont pas été republiées pendant son calcul.
+
+Les réponses (200 et 304) portent ``Vary: Accept, Accept-Encoding`` : un
+cache partagé ne sert une représentation qu'aux requêtes de mêmes en-têtes.
+"""
+
+import hashlib
+import re
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from fastapi import APIRouter
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Route servie avec ETag : motif du chemin et en-tête Cache-Control
+CachedRoute = Tuple[re.Pattern, str]
+
+# En-têtes de requête qui choisissent la représentation (clé de l'ETag)
+VARY_HEADERS = ("Accept", "Accept-Encoding")
+
+
+def cached_routes(
+    router: APIRouter,
+    cache_control: str,
+    paths: Optional[Iterable[str]] = None,
+) -> List[CachedRoute]:
+    """
+    Déclare les routes GET d'un router servies avec ETag.
+
+    Args:
+        router: Router dont les routes dépendent des seuls datasets
+        cache_control: Valeur de l'en-tête ``Cache-Control`` des réponses
+        paths: Chemins retenus (par défaut, toutes les routes GET)
+
+    Returns:
+        Routes à passer à `ETagMiddleware`
+    """
+    selected = None if paths is None else set(paths)
+    return [
+        (route.path_regex, cache_control)
+        for route in router.routes
+        if isinstance(route, APIRoute)
+        and "GET" in route.methods
+        and (selected is None or route.path in selected)
+    ]
+
+
+def compute_etag(version: int, scope: Scope) -> str:
+    """
+    ETag forte d'une requête pour une version des datasets.
+
+    Les paramètres de requête sont triés : l'ordre dans l'URL ne change
+    pas l'ETag.
+    """
+    headers = Headers(scope=scope)
+    query = urlencode(
+        sorted(
+            parse_qsl(
+                scope.get("query_string", b"").decode("latin-1"),
+                keep_blank_values=True,
+            )
+        )
+    )
+    key = "\n".join(
+        [
+            str(version),
+            scope["path"],
+            query,
+            headers.get("accept", ""),
+            headers.get("accept-encoding", ""),
+        ]
+    )
+    digest = hashlib.blake2b(key.encode(), digest_size=12).hexdigest()
+    return f'"{version}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Vrai si ``If-None-Match`` désigne l'ETag (comparaison faible)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class ETagMiddleware:
+    """
+    Middleware ASGI des réponses conditionnelles.
+
+    Args:
+        app: Application ASGI
+        version: Version courante des datasets (None : pas d'ETag)
+        routes: Routes servies avec ETag (voir `cached_routes`)
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        version: Callable[[], Optional[int]],
+        routes: Sequence[CachedRoute],
+    ):
+        self.app = app
+        self.version = version
+        self.routes = list(routes)
+
+    def _cache_control(self, path: str) -> Optional[str]:
+        for pattern, cache_control in self.routes:
+            if pattern.match(path):
+                return cache_control
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+        cache_control = self._cache_control(scope["path"])
+        version = self.version() if cache_control else None
+        if version is None:
+            await self.app(scope, receive, send)
+            return
+
+        etag = compute_etag(version, scope)
+        headers = {"ETag": etag, "Cache-Control": cache_control}
+        if etag_matches(Headers(scope=scope).get("if-none-match"), etag):
+            response = Response(status_code=304, headers=headers)
+            for name in VARY_HEADERS:
+                response.headers.add_vary_header(name)
+            await response(scope, receive, send)
+            return
+
+        async def send_tagged(message: Message) -> None:
+            if (
+                message["type"] == "http.response.start"
+                and message["status"] == 200
+                # Données republiées pendant le calcul : pas d'ETag
+                and self.version() == version
+            ):
+                response_headers = MutableHeaders(raw=message["headers"])
+                for name, value in headers.items():
+                    response_headers[name] = value
+                for name in VARY_HEADERS:
+                    response_headers.add_vary_header(name)
+            await send(message)
+
+        await self.app(scope, receive, send_tagged)
@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import List
+from functools import lru_cache
+from pydantic import BaseModel, create_model
+from typing import List, Optional, Tuple, Type
 from app.models.transactions import Transaction
 
 
@@ -8,3 +9,41 @@ class TransactionListResponse(BaseModel):
     offset: int
     limit: int
     data: List[Transaction]
+    next_cursor: Optional[str] = None
+
+
+class TransactionBatchResponse(BaseModel):
+    total: int
+    data: List[Transaction]
+    missing: List[int]
+
+
+@lru_cache(maxsize=256)
+def projected_list_response(
+    fields: Tuple[str, ...]
+) -> Type[TransactionListResponse]:
+    """
+    Schéma de liste réduit aux champs demandés (paramètre `fields`).
+
+    Args:
+        fields: Champs de `Transaction` retenus, dans l'ordre du modèle
+
+    Returns:
+        Modèle de réponse dont les transactions n'ont que ces champs
+        (`TransactionListResponse` si tous les champs sont demandés)
+    """
+    if list(fields) == list(Transaction.model_fields):
+        return TransactionListResponse
+    suffix = "_".join(fields)
+    item = create_model(
+        f"Transaction_{suffix}",
+        **{
+            name: (Transaction.model_fields[name].annotation, ...)
+            for name in fields
+        },
+    )
+    return create_model(
+        f"TransactionListResponse_{suffix}",
+        __base__=TransactionListResponse,
+        data=(List[item], ...),
+    )
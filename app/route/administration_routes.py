@@ -1,18 +1,21 @@
 """Routes d'administration pour le système de monitoring."""
 
+import hmac
 import os
+import threading
 import time
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 try:
     import tomllib  # pour Python 3.11+
 except ImportError:
     import tomli as tomllib  # type: ignore
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Header, HTTPException, Response
 
+from app.data import load_data
 from app.data.load_data import (
     _df_card_data,
     _mcc_codes_df,
@@ -20,12 +23,24 @@ from app.data.load_data import (
     _transactions_df,
     _user_data_df,
 )
+from app.data.registry import loader_registry
+from app.data.schema import column_memory_report
+from app.data.store import get_store
+from app.data.warmup import warmup
 
 administration_route = APIRouter(tags=["Administration"])
 
 # Temps de démarrage de l'application (pour le calcul de l'uptime)
 START_TIME = time.time()
 
+# Jeton d'administration exigé par le rechargement des datasets (en-tête
+# ``X-Admin-Token``). Sans jeton configuré, le rechargement est désactivé
+ADMIN_TOKEN = os.environ.get("APIBANK_ADMIN_TOKEN", "")
+
+# Un seul rechargement à la fois : chacun reparse les fichiers et garde
+# l'ancien snapshot en mémoire le temps de la publication
+_reload_lock = threading.Lock()
+
 
 @administration_route.get(
     "/api/system/health",
@@ -104,6 +119,200 @@ def get_health() -> Dict[str, Any]:
     }
 
 
+@administration_route.get(
+    "/api/system/ready",
+    summary="Disponibilité des données",
+    description=(
+        "Indique si les datasets sont chargés, avec la progression du "
+        "préchargement pour chacun d'eux."
+    ),
+)
+def get_readiness(response: Response) -> Dict[str, Any]:
+    """
+    Endpoint de **readiness** pour l'orchestrateur (sonde Kubernetes...).
+
+    ### Informations retournées
+    - **status** : `idle` (chargement à la demande), `loading`, `ready`
+      ou `failed`
+    - **datasets** : par dataset, état, progression (0 à 1), durée de
+      chargement et éventuelle erreur
+
+    Le code HTTP est 503 tant que le préchargement n'est pas terminé ou
+    s'il a échoué, 200 sinon.
+
+    Returns:
+        Dict contenant l'état du préchargement
+    """
+    report = warmup.report()
+    if report["status"] in ("loading", "failed"):
+        response.status_code = 503
+    return report
+
+
+@administration_route.get(
+    "/api/system/memory",
+    summary="Empreinte mémoire des datasets",
+    description=(
+        "Retourne, pour chaque dataset chargé, le nombre d'octets "
+        "occupés par colonne."
+    ),
+)
+def get_memory_usage() -> Dict[str, Any]:
+    """
+    Endpoint de suivi de l'**empreinte mémoire** des datasets chargés.
+
+    ### Informations retournées
+    - **datasets** : par dataset chargé, nombre de lignes, octets par
+      colonne et total
+    - **total_bytes** : total tous datasets confondus
+
+    Note:
+        Les colonnes rouvertes depuis le cache binaire sont mappées en
+        mémoire : leurs octets sont adressés mais pas forcément résidents.
+
+    Returns:
+        Dict contenant le détail mémoire par dataset
+    """
+    loaded = {
+        "transactions": load_data._transactions_df,
+        "fraud_labels": load_data._train_fraud_df,
+        "mcc_codes": load_data._mcc_codes_df,
+        "users": load_data._user_data_df,
+        "cards": load_data._df_card_data,
+    }
+
+    datasets: Dict[str, Any] = {}
+    for name, df in loaded.items():
+        if df is None:
+            continue
+        columns = column_memory_report(df)
+        datasets[name] = {
+            "rows": len(df),
+            "total_bytes": sum(columns.values()),
+            "columns": columns,
+        }
+
+    return {
+        "datasets": datasets,
+        "total_bytes": sum(d["total_bytes"] for d in datasets.values()),
+    }
+
+
+@administration_route.get(
+    "/api/system/loaders",
+    summary="Métriques de chargement des datasets",
+    description=(
+        "Retourne, pour chaque dataset, le nombre de chargements, leur "
+        "durée et le nombre d'appels ayant attendu un chargement en cours."
+    ),
+)
+def get_loader_stats() -> Dict[str, Any]:
+    """
+    Endpoint de suivi des **chargements** de datasets.
+
+    ### Informations retournées (par dataset)
+    - **loads** / **failures** : chargements réussis / en échec
+    - **shared_waits** : appels ayant partagé un chargement en cours
+    - **last_duration_ms** / **total_duration_ms** : durées de chargement
+    - **in_flight** : chargement en cours, avec sa **progression**
+
+    Returns:
+        Dict contenant les métriques par dataset
+    """
+    return {"datasets": loader_registry.stats()}
+
+
+def snapshot_info() -> Dict[str, Any]:
+    """Décrit le snapshot des transactions actuellement publié."""
+    df = load_data._transactions_df
+    if df is None:
+        return {"version": None, "rows": 0, "created_at": None}
+    store = get_store(df)
+    return {
+        "version": store.version,
+        "rows": len(df),
+        "created_at": datetime.fromtimestamp(
+            store.created_at, tz=timezone.utc
+        ).isoformat(),
+    }
+
+
+@administration_route.get(
+    "/api/system/snapshot",
+    summary="Snapshot des transactions publié",
+    description="Version, taille et date de publication du snapshot.",
+)
+def get_snapshot() -> Dict[str, Any]:
+    """
+    Endpoint de suivi du **snapshot** de transactions servi aux requêtes.
+
+    Returns:
+        Dict contenant version, nombre de lignes et date de publication
+        (version None si les transactions ne sont pas encore chargées)
+    """
+    return snapshot_info()
+
+
+@administration_route.post(
+    "/api/system/reload",
+    summary="Recharger les datasets",
+    description=(
+        "Recharge les transactions et les labels de fraude, puis publie "
+        "un nouveau snapshot sans interrompre le service. Réservé à "
+        "l'administration (en-tête `X-Admin-Token`)."
+    ),
+)
+def reload_datasets(
+    x_admin_token: Optional[str] = Header(None),
+) -> Dict[str, Any]:
+    """
+    Recharge les datasets depuis le disque.
+
+    Le nouveau snapshot est construit à côté de l'ancien, qui reste servi
+    jusqu'à la publication (échange atomique de référence) ; les requêtes
+    en cours terminent sur l'ancienne version. En cas d'échec, l'ancien
+    snapshot reste publié.
+
+    Args:
+        x_admin_token: Jeton d'administration (`APIBANK_ADMIN_TOKEN`)
+
+    Returns:
+        Dict contenant la version précédente, le nouveau snapshot et la
+        durée du rechargement
+
+    Raises:
+        HTTPException: 403 si le rechargement est désactivé ou le jeton
+            invalide, 409 si un rechargement est déjà en cours, 500 si le
+            rechargement échoue
+    """
+    if not ADMIN_TOKEN or not hmac.compare_digest(
+        (x_admin_token or "").encode(), ADMIN_TOKEN.encode()
+    ):
+        raise HTTPException(status_code=403, detail="Rechargement refusé")
+    if not _reload_lock.acquire(blocking=False):
+        raise HTTPException(
+            status_code=409, detail="Rechargement déjà en cours"
+        )
+
+    previous = snapshot_info()["version"]
+    start = time.perf_counter()
+    try:
+        load_data.reload_transactions()
+        load_data.reload_train_fraud()
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Rechargement impossible: {e}"
+        )
+    finally:
+        _reload_lock.release()
+
+    return {
+        "previous_version": previous,
+        "snapshot": snapshot_info(),
+        "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
 def load_project_metadata() -> Dict[str, Any]:
     """
     Charge les métadonnées du projet depuis le fichier `pyproject.toml`.
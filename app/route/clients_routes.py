@@ -1,13 +1,71 @@
 """Routes pour la gestion des clients."""
 
-from typing import Any, Dict, List
+import math
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import pandas as pd
-from fastapi import APIRouter, HTTPException, Query
 
-from app.data.load_data import load_transactions, load_user_data
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 
-client_route = APIRouter(tags=["Clients"])
+from app.data.leaderboard import METRICS, get_leaderboard
+from app.data.load_data import (
+    load_train_fraud,
+    load_transactions,
+    load_user_data,
+)
+from app.data.store import IdIndex, get_store
+from app.route.dependencies import require_datasets_ready
+from app.route.serialization import JSONBytesResponse
+from app.route.transaction_routes import parse_date_bound
+
+client_route = APIRouter(
+    tags=["Clients"], dependencies=[Depends(require_datasets_ready)]
+)
+
+# Cache-Control du classement (profils clients : pas de cache partagé),
+# validé par ETag (`app.middleware.etag`)
+TOP_CACHE_CONTROL = "private, no-cache"
+
+# Champs du profil client et leur conversion
+PROFILE_FIELDS: Dict[str, Callable[[Any], Any]] = {
+    "current_age": int,
+    "gender": str,
+    "yearly_income": str,
+    "credit_score": int,
+    "address": str,
+}
+
+
+# Index des profils clients (identifiant -> ligne), pour le DataFrame
+# des utilisateurs publié
+_profile_index: Optional[Tuple[weakref.ref, IdIndex]] = None
+
+
+def profile_index(users_df: pd.DataFrame) -> IdIndex:
+    """
+    Index identifiant client -> ligne du profil, mémorisé par DataFrame.
+
+    Args:
+        users_df: DataFrame `load_user_data`
+
+    Returns:
+        Index des identifiants de la colonne ``id``
+    """
+    global _profile_index
+
+    cached = _profile_index
+    if cached is not None and cached[0]() is users_df:
+        return cached[1]
+
+    index = IdIndex(users_df["id"].to_numpy())
+    _profile_index = (weakref.ref(users_df), index)
+    return index
+
+
+def _rounded(value: float, digits: int = 2) -> Optional[float]:
+    """Arrondit une mesure, None si elle n'est pas définie (NaN)."""
+    return None if math.isnan(value) else round(value, digits)
 
 
 @client_route.get(
@@ -44,6 +102,7 @@ def get_client_cards(client_id: int) -> List[Dict[str, Any]]:
 
 @client_route.get(
     "/api/customers/top",
+    response_model=List[Dict[str, Any]],
     summary="Top clients par volume de dépenses",
     description=(
         "Retourne les clients ayant dépensé le plus, "
@@ -53,59 +112,94 @@ def get_client_cards(client_id: int) -> List[Dict[str, Any]]:
 def get_top_customers(
     n: int = Query(
         default=10, gt=0, description="Nombre de clients à retourner"
-    )
-) -> List[Dict[str, Any]]:
+    ),
+    by: str = Query(
+        default="amount",
+        pattern="^(" + "|".join(METRICS) + ")$",
+        description="Mesure de classement",
+    ),
+    start_date: Optional[str] = Query(
+        default=None, description="Début de la fenêtre (ISO, incluse)"
+    ),
+    end_date: Optional[str] = Query(
+        default=None, description="Fin de la fenêtre (ISO, incluse)"
+    ),
+) -> Response:
     """
-    Calcule le total des dépenses par client.
+    Classe les clients selon une mesure de leurs transactions.
 
-    Retourne les **n** clients ayant le plus dépensé.
+    Retourne les **n** premiers clients. Sans fenêtre de dates, le
+    classement est précalculé par snapshot ; avec une fenêtre, il est
+    calculé sur les transactions de la fenêtre.
 
     Args:
         n: Nombre de clients à retourner (par défaut 10)
+        by: Mesure de classement : `amount` (total dépensé), `count`
+            (nombre de transactions), `avg` (montant moyen) ou
+            `fraud_rate` (part des transactions labellisées frauduleuses)
+        start_date: Début de la fenêtre, optionnel
+        end_date: Fin de la fenêtre, optionnel
 
     Returns:
-        Liste des clients avec leurs dépenses totales et profil
+        Liste des clients avec leurs mesures et profil
+
+    Raises:
+        HTTPException: 400 si une date est invalide
 
     ### Données retournées
     - Identifiant du client
-    - Montant total dépensé
+    - Montant total dépensé, nombre de transactions, montant moyen
+    - Taux de fraude (si `by=fraud_rate`)
     - Profil client (âge, genre, revenus, score de crédit, adresse)
     """
     transactions_df = load_transactions()
     users_df = load_user_data()
-
-    # Calcul du total des dépenses par client
-    spending_by_client = (
-        transactions_df.groupby("client_id")["amount"].sum().reset_index()
-    )
-
-    # Sélection des N meilleurs clients
-    top_clients = spending_by_client.sort_values(
-        by="amount", ascending=False
-    ).head(n)
-
-    # Jointure avec les données clients
-    merged_df = pd.merge(
-        top_clients, users_df, left_on="client_id", right_on="id"
-    )
+    store = get_store(transactions_df)
+    labels = load_train_fraud() if by == "fraud_rate" else None
+
+    # Lignes de la fenêtre de dates (index des dates)
+    rows = None
+    low = parse_date_bound(start_date)
+    high = parse_date_bound(end_date)
+    if low is not None or high is not None:
+        index = store.date_index
+        rows = index.rows(*index.bounds(low, high))
+
+    leaderboard = get_leaderboard(store, labels, rows)
+    top = leaderboard.top(by, n, ranked=rows is None)
+    clients = leaderboard.clients[top]
+
+    # Jointure avec les profils : accès indexé par identifiant client
+    positions = profile_index(users_df).lookup_many(clients)
+    found = positions >= 0
+    top, clients, positions = top[found], clients[found], positions[found]
+    profiles = {
+        column: users_df[column].to_numpy()[positions].tolist()
+        for column in PROFILE_FIELDS
+    }
 
     # Format de réponse
-    result: List[Dict[str, Any]] = [
-        {
-            "client_id": int(row["client_id"]),
-            "total_spent": round(float(row["amount"]), 2),
-            "profile": {
-                "current_age": int(row["current_age"]),
-                "gender": str(row["gender"]),
-                "yearly_income": str(row["yearly_income"]),
-                "credit_score": int(row["credit_score"]),
-                "address": str(row["address"]),
-            },
+    values = {
+        name: metric[top].tolist()
+        for name, metric in leaderboard.values.items()
+    }
+    result: List[Dict[str, Any]] = []
+    for i, client_id in enumerate(clients.tolist()):
+        entry: Dict[str, Any] = {
+            "client_id": int(client_id),
+            "total_spent": round(values["amount"][i], 2),
+            "transaction_count": int(values["count"][i]),
+            "avg_amount": _rounded(values["avg"][i]),
+        }
+        if by == "fraud_rate":
+            entry["fraud_rate"] = _rounded(values["fraud_rate"][i], 4)
+        entry["profile"] = {
+            name: cast(profiles[name][i])
+            for name, cast in PROFILE_FIELDS.items()
         }
-        for _, row in merged_df.iterrows()
-    ]
+        result.append(entry)
 
-    return result
+    return JSONBytesResponse(result)
 
 
 @client_route.get(
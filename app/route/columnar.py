@@ -0,0 +1,166 @@
+"""Formats de réponse colonnaires : JSON par colonne et Arrow IPC.
+
+Une liste d'objets JSON répète chaque nom de champ à chaque ligne. Pour
+les clients d'analyse, deux formats orientés colonnes sont proposés :
+
+- JSON colonnaire (paramètre ``format=columnar``) : un tableau de valeurs
+  par champ, dans l'ordre des champs de la réponse ;
+- flux Arrow IPC (``Accept: application/vnd.apache.arrow.stream``) : un
+  lot d'enregistrements Arrow par lot de lignes, construit depuis les
+  colonnes en mémoire (sans copie pour une colonne numérique sans valeur
+  absente lue d'un bloc).
+
+Arrow nécessite le paquet optionnel ``pyarrow`` : sans lui, ce format est
+refusé (406).
+"""
+
+import io
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+
+from app.route.serialization import column_values
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc  # noqa: F401
+except ImportError:
+    pa = None
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+# Valeur du paramètre `format` des réponses JSON colonnaires
+COLUMNAR = "columnar"
+
+# Documentation OpenAPI des routes qui proposent Arrow
+ARROW_RESPONSES: Dict[Any, Dict[str, Any]] = {
+    200: {
+        "content": {
+            ARROW_STREAM: {"schema": {"type": "string", "format": "binary"}}
+        },
+        "description": (
+            "JSON (par défaut, colonnaire avec `format=columnar`), ou flux "
+            "Arrow IPC selon l'en-tête Accept"
+        ),
+    }
+}
+
+
+def frame_columns(
+    df: pd.DataFrame, columns: Sequence[str]
+) -> Dict[str, List[Any]]:
+    """
+    Convertit un DataFrame en un tableau de valeurs par colonne.
+
+    Args:
+        df: DataFrame à convertir
+        columns: Colonnes retenues, dans l'ordre de la réponse
+
+    Returns:
+        Dict colonne -> valeurs (voir `column_values`)
+    """
+    return {name: column_values(df[name]) for name in columns}
+
+
+def records_columns(records: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """Transpose une liste d'objets en un tableau de valeurs par champ."""
+    names = list(records[0]) if records else []
+    return {name: [record.get(name) for record in records] for name in names}
+
+
+def require_arrow() -> None:
+    """
+    Vérifie que le format Arrow est disponible.
+
+    Raises:
+        HTTPException: 406 si ``pyarrow`` n'est pas installé
+    """
+    if pa is None:
+        raise HTTPException(
+            status_code=406,
+            detail="Format Arrow indisponible (pyarrow non installé)",
+        )
+
+
+def arrow_schema(df: pd.DataFrame, columns: Sequence[str]) -> "pa.Schema":
+    """
+    Schéma Arrow des colonnes, identique pour tous les lots d'un flux.
+
+    Le type d'une colonne ``object`` ne peut pas être déduit d'un lot (un
+    lot sans valeur serait de type null) : ces colonnes sont du texte.
+    Les autres types viennent du dtype de la colonne (une catégorielle
+    donne un type dictionnaire, de même dictionnaire pour tous les lots).
+    """
+    fields = []
+    for name in columns:
+        series = df[name]
+        if series.dtype == object:
+            kind = pa.string()
+        else:
+            kind = pa.Array.from_pandas(series.iloc[:0]).type
+        fields.append(pa.field(name, kind))
+    return pa.schema(fields)
+
+
+def arrow_batch(df: pd.DataFrame, schema: "pa.Schema") -> "pa.RecordBatch":
+    """Construit un lot Arrow depuis les colonnes d'un DataFrame."""
+    return pa.RecordBatch.from_arrays(
+        [
+            pa.Array.from_pandas(df[field.name], type=field.type)
+            for field in schema
+        ],
+        schema=schema,
+    )
+
+
+def _ipc_stream(
+    schema: "pa.Schema", batches: Iterable["pa.RecordBatch"]
+) -> Iterator[bytes]:
+    """Encode des lots au format de flux Arrow IPC, un lot par morceau."""
+    sink = io.BytesIO()
+
+    def drain() -> bytes:
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    writer = pa.ipc.new_stream(sink, schema)
+    for batch in batches:
+        writer.write_batch(batch)
+        yield drain()
+    writer.close()
+    yield drain()
+
+
+def arrow_stream(
+    df: pd.DataFrame,
+    batches: Iterable[np.ndarray],
+    columns: Sequence[str],
+) -> Iterator[bytes]:
+    """
+    Encode des lots de lignes en flux Arrow IPC (voir `ndjson_stream`).
+
+    Args:
+        df: DataFrame des transactions
+        batches: Positions (ou tranches) des lignes, lot par lot
+        columns: Colonnes retenues
+
+    Returns:
+        Morceaux du flux : schéma et premier lot, un message par lot
+        suivant, puis la fin de flux
+    """
+    schema = arrow_schema(df, columns)
+    positions = [df.columns.get_loc(name) for name in columns]
+    return _ipc_stream(
+        schema,
+        (arrow_batch(df.iloc[rows, positions], schema) for rows in batches),
+    )
+
+
+def arrow_records(records: List[Dict[str, Any]]) -> bytes:
+    """Encode une liste d'objets (agrégats) en un flux Arrow IPC."""
+    batch = pa.RecordBatch.from_pylist(records)
+    return b"".join(_ipc_stream(batch.schema, [batch]))
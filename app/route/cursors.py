@@ -0,0 +1,220 @@
+"""Curseurs opaques de pagination des listes de transactions (keyset).
+
+Un curseur encode le snapshot lu (`TransactionStore.version`), la
+signature de la requête (filtres normalisés) et la clé de tri de la
+dernière ligne servie : sa position dans la table et sa clé (identifiant
+de la transaction, ou date pour l'ordre chronologique d'un client). La
+page suivante relit le même snapshot, même après un rechargement (voir
+`SNAPSHOT_RETENTION`), et reprend juste après cette ligne par recherche
+dichotomique dans un index : `limit` lignes lues, quelle que soit la
+profondeur de la page. Le nombre de résultats déjà servis et le total
+voyagent avec le curseur, sans recompter le résultat.
+
+Un curseur est signé (HMAC) : un jeton modifié est refusé (400), de
+même qu'un curseur d'une autre requête. Il désigne un snapshot de
+transactions tant que celui-ci est en mémoire (410 ensuite).
+"""
+
+import base64
+import binascii
+import hashlib
+import hmac
+import os
+import secrets
+from typing import Any, List, Optional, Tuple, Union
+
+import numpy as np
+import orjson
+import pandas as pd
+from fastapi import HTTPException
+
+from app.data.load_data import transaction_snapshots
+from app.data.store import TransactionStore, find_store, get_store
+
+# Clé de signature des curseurs. Par défaut propre au processus, comme
+# les versions des snapshots qu'ils désignent
+CURSOR_SECRET = (
+    os.environ.get("APIBANK_CURSOR_SECRET", "").encode()
+    or secrets.token_bytes(32)
+)
+
+# Taille (octets) de la signature ajoutée au jeton
+SIGNATURE_SIZE = 16
+
+
+class Cursor:
+    """
+    Point de reprise d'un résultat paginé.
+
+    Args:
+        version: Snapshot lu (`TransactionStore.version`)
+        offset: Nombre de résultats déjà servis
+        total: Nombre de résultats (fixe pour un snapshot)
+        row: Position dans la table de la dernière ligne servie
+        key: Clé de tri de cette ligne (valeur de la colonne de clé)
+    """
+
+    def __init__(
+        self, version: int, offset: int, total: int, row: int, key: int
+    ):
+        self.version = version
+        self.offset = offset
+        self.total = total
+        self.row = row
+        self.key = key
+
+    def fields(self) -> List[int]:
+        """Champs encodés dans le jeton, dans l'ordre du constructeur."""
+        return [self.version, self.offset, self.total, self.row, self.key]
+
+
+def cursor_scope(*parts: Any) -> str:
+    """
+    Signature courte d'une requête paginée (route et filtres).
+
+    Args:
+        parts: Éléments identifiant la requête (sérialisables en JSON)
+
+    Returns:
+        Empreinte hexadécimale des éléments
+    """
+    payload = orjson.dumps(parts, option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(payload, digest_size=6).hexdigest()
+
+
+def _sign(payload: bytes) -> bytes:
+    """Signature HMAC-SHA256 (tronquée) du contenu d'un curseur."""
+    digest = hmac.new(CURSOR_SECRET, payload, hashlib.sha256).digest()
+    return digest[:SIGNATURE_SIZE]
+
+
+def encode_cursor(scope: str, cursor: Cursor) -> str:
+    """Encode un point de reprise d'une requête en jeton signé."""
+    payload = orjson.dumps([scope, *cursor.fields()])
+    token = base64.urlsafe_b64encode(payload + _sign(payload))
+    return token.rstrip(b"=").decode()
+
+
+def decode_cursor(token: str, scope: str) -> Cursor:
+    """
+    Décode un curseur produit par `encode_cursor` pour une requête.
+
+    Args:
+        token: Jeton reçu
+        scope: Signature de la requête courante
+
+    Returns:
+        Point de reprise du curseur
+
+    Raises:
+        HTTPException: 400 si le jeton est invalide (mal formé ou de
+            signature fausse) ou produit par une autre requête
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded)
+        payload, signature = raw[:-SIGNATURE_SIZE], raw[-SIGNATURE_SIZE:]
+        if not hmac.compare_digest(signature, _sign(payload)):
+            raise ValueError("signature")
+        token_scope, *fields = orjson.loads(payload)
+        cursor = Cursor(*fields)
+        valid = all(isinstance(value, int) for value in fields) and min(
+            cursor.offset, cursor.total, cursor.row
+        ) >= 0
+    except (ValueError, TypeError, binascii.Error, orjson.JSONDecodeError):
+        valid = False
+    if not valid:
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+    if token_scope != scope:
+        raise HTTPException(
+            status_code=400,
+            detail="Curseur produit par une autre requête",
+        )
+    return cursor
+
+
+def cursor_snapshot(
+    df: pd.DataFrame, token: Optional[str], scope: str, key: str
+) -> Tuple[TransactionStore, Optional[Cursor]]:
+    """
+    Retourne le snapshot à lire et le point de reprise d'une page.
+
+    Args:
+        df: Snapshot courant (`load_transactions`)
+        token: Curseur reçu, ou None pour une première page
+        scope: Signature de la requête courante
+        key: Colonne de la clé de tri (voir `Cursor.key`)
+
+    Returns:
+        Tuple (store du snapshot lu, point de reprise ; None sans curseur)
+
+    Raises:
+        HTTPException: 400 si le curseur est invalide, 410 si son
+            snapshot n'est plus en mémoire
+    """
+    if token is None:
+        return get_store(df), None
+    cursor = decode_cursor(token, scope)
+    store = find_store(cursor.version, [df, *transaction_snapshots()])
+    if store is None or not _row_has_key(store, key, cursor):
+        raise HTTPException(
+            status_code=410,
+            detail="Curseur expiré : données rechargées depuis",
+        )
+    return store, cursor
+
+
+def _row_has_key(store: TransactionStore, key: str, cursor: Cursor) -> bool:
+    """Vrai si la ligne du curseur a toujours sa clé dans le snapshot."""
+    values = store.column_values(key)
+    return cursor.row < len(values) and values[cursor.row] == cursor.key
+
+
+def rows_after(rows: np.ndarray, row: int, limit: int) -> np.ndarray:
+    """
+    Page suivant une ligne dans un résultat en ordre de table.
+
+    Args:
+        rows: Positions du résultat, croissantes
+        row: Position de la dernière ligne servie
+        limit: Taille de la page
+
+    Returns:
+        Les `limit` positions suivant `row` (recherche dichotomique)
+    """
+    start = int(np.searchsorted(rows, row, side="right"))
+    return rows[start:start + limit]
+
+
+def next_cursor(
+    store: TransactionStore,
+    scope: str,
+    key: str,
+    page_rows: Union[np.ndarray, slice],
+    stop: int,
+    total: int,
+) -> Optional[str]:
+    """
+    Curseur de la page suivante, None après la dernière page.
+
+    Args:
+        store: Snapshot lu
+        scope: Signature de la requête
+        key: Colonne de la clé de tri
+        page_rows: Positions (ou tranche) des lignes de la page servie
+        stop: Nombre de résultats servis, page comprise
+        total: Nombre de résultats
+
+    Returns:
+        Jeton reprenant après la dernière ligne de la page
+    """
+    if isinstance(page_rows, slice):
+        page_rows = range(page_rows.start, page_rows.stop)
+    if stop >= total or not len(page_rows):
+        return None
+    row = int(page_rows[-1])
+    cursor = Cursor(
+        store.version, stop, total, row,
+        int(store.column_values(key)[row]),
+    )
+    return encode_cursor(scope, cursor)
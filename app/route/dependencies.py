@@ -0,0 +1,27 @@
+"""Dépendances communes aux routes de l'API."""
+
+from fastapi import HTTPException
+
+from app.data.warmup import warmup
+
+# Délai suggéré aux clients avant de réessayer pendant le préchargement
+RETRY_AFTER_SECONDS = 5
+
+
+def require_datasets_ready() -> None:
+    """
+    Refuse les requêtes de données tant que le préchargement est en cours.
+
+    Hors préchargement (état ``idle``), les datasets restent chargés à la
+    demande ; en cas d'échec, les routes remontent leurs propres erreurs.
+
+    Raises:
+        HTTPException: 503 avec en-tête `Retry-After` pendant le
+        préchargement
+    """
+    if warmup.status == "loading":
+        raise HTTPException(
+            status_code=503,
+            detail="Chargement des données en cours, réessayez plus tard.",
+            headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+        )
@@ -1,48 +1,59 @@
 """Routes pour l'analyse et la prédiction de fraude."""
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
+import numpy as np
 import pandas as pd
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Response
 
+from app.data.aggregation import aggregate, dense_keys
 from app.data.load_data import load_train_fraud, load_transactions
+from app.data.store import FRAUD, UNLABELED, get_store
 from app.models.transaction_entry import TransactionEntry
+from app.route.dependencies import require_datasets_ready
+from app.route.serialization import JSONBytesResponse
 
 fraud_routes = APIRouter(tags=["Fraude"])
 
+# Cache-Control des réponses, validées par ETag (`app.middleware.etag`)
+CACHE_CONTROL = "public, max-age=5"
 
-def prepare_fraud_merge() -> pd.DataFrame:
+
+def flagged_mask(errors: pd.Series) -> np.ndarray:
     """
-    Prépare et fusionne les données de transactions avec les labels de fraude.
+    Simule le signalement des transactions : présence d'une erreur.
+
+    Pour une colonne catégorielle, le test est fait une fois par catégorie
+    puis propagé aux lignes par leurs codes.
 
-    - Harmonise les colonnes (`id`, `is_fraud`)
-    - Convertit les types pour éviter les erreurs de fusion
-    - Retourne un DataFrame fusionné
+    Args:
+        errors: Colonne `errors` des transactions
 
     Returns:
-        DataFrame fusionné avec transactions et labels de fraude
+        Masque booléen, True si la transaction est signalée
     """
-    df_trans = load_transactions()
-    df_fraud = load_train_fraud()
-
-    # Transformation de l'index en colonne 'id' si nécessaire
-    if "id" not in df_fraud.columns:
-        df_fraud = df_fraud.reset_index().rename(columns={"index": "id"})
-
-    # Harmonisation du nom de la colonne fraude
-    if "target" in df_fraud.columns:
-        df_fraud = df_fraud.rename(columns={"target": "is_fraud"})
-
-    # Conversion forcée des identifiants
-    df_trans["id"] = df_trans["id"].astype(str)
-    df_fraud["id"] = df_fraud["id"].astype(str)
-
-    return pd.merge(
-        df_trans,
-        df_fraud[["id", "is_fraud"]],
-        on="id",
-        how="inner",
-    )
+    if isinstance(errors.dtype, pd.CategoricalDtype):
+        categories = errors.cat.categories.astype(str)
+        # Code -1 (valeur absente) : dernier élément, False
+        flagged = np.append(categories.str.len().to_numpy() > 0, False)
+        return flagged[errors.cat.codes.to_numpy()]
+    return (errors.notna() & (errors.astype(str).str.len() > 0)).to_numpy()
+
+
+def fraud_labels() -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Retourne les transactions et leurs labels de fraude alignés.
+
+    Les labels sont joints une fois par snapshot (voir
+    `TransactionStore.fraud_column`) : les agrégations de fraude sont des
+    réductions vectorisées, sans jointure par requête.
+
+    Returns:
+        Tuple (transactions, labels ``int8`` : 1 fraude, 0 légitime,
+        -1 sans label)
+    """
+    df = load_transactions()
+    return df, get_store(df).fraud_column(load_train_fraud())
 
 
 @fraud_routes.get(
@@ -52,6 +63,7 @@ def prepare_fraud_merge() -> pd.DataFrame:
         "Statistiques globales de fraude incluant "
         "précision et rappel simulés."
     ),
+    dependencies=[Depends(require_datasets_ready)],
 )
 def get_fraud_summary() -> Dict[str, Any]:
     """
@@ -69,19 +81,18 @@ def get_fraud_summary() -> Dict[str, Any]:
     Note:
         Le champ `flagged` est simulé à partir de la présence d'erreurs.
     """
-    df = prepare_fraud_merge()
+    df, labels = fraud_labels()
+    is_fraud = labels == FRAUD
 
-    total_frauds = len(df[df["is_fraud"] == "Yes"])
+    total_frauds = int(is_fraud.sum())
 
-    # Simulation du flag (présence d'erreurs)
-    df["flagged"] = df["errors"].apply(
-        lambda x: len(str(x)) > 0 if pd.notna(x) else False
-    )
+    # Simulation du flag (présence d'erreurs), sur les transactions labellisées
+    flagged = flagged_mask(df["errors"]) & (labels != UNLABELED)
 
-    flagged_count = int(df["flagged"].sum())
+    flagged_count = int(flagged.sum())
 
     # Vrais positifs
-    true_positives = len(df[(df["flagged"]) & (df["is_fraud"] == "Yes")])
+    true_positives = int((flagged & is_fraud).sum())
 
     precision = true_positives / flagged_count if flagged_count > 0 else 0.0
     recall = true_positives / total_frauds if total_frauds > 0 else 0.0
@@ -96,13 +107,15 @@ def get_fraud_summary() -> Dict[str, Any]:
 
 @fraud_routes.get(
     "/api/fraud/by-type",
+    response_model=List[Dict[str, Any]],
     summary="Taux de fraude par type de transaction",
     description=(
         "Analyse du taux de fraude selon le type "
         "d'utilisation (chip, swipe, online…)."
     ),
+    dependencies=[Depends(require_datasets_ready)],
 )
-def get_fraud_by_type() -> List[Dict[str, Any]]:
+def get_fraud_by_type() -> Response:
     """
     Statistiques de fraude par type de transaction.
 
@@ -113,26 +126,30 @@ def get_fraud_by_type() -> List[Dict[str, Any]]:
     - **fraud_rate** : taux moyen de fraude
     - **total_transactions** : volume total
     """
-    df = prepare_fraud_merge()
+    df, labels = fraud_labels()
 
-    df["is_fraud_val"] = df["is_fraud"].map({"Yes": 1, "No": 0})
+    codes, categories = dense_keys(df["use_chip"].astype("category"))
+    labelled = labels != UNLABELED
 
-    stats_df = (
-        df.groupby("use_chip")["is_fraud_val"]
-        .agg(["mean", "count"])
-        .reset_index()
+    # Taux de fraude = moyenne de l'indicatrice, par type
+    stats = aggregate(
+        codes[labelled],
+        labels[labelled] == FRAUD,
+        len(categories),
+        extrema=False,
     )
 
     result: List[Dict[str, Any]] = [
         {
-            "type": str(row["use_chip"]),
-            "fraud_rate": round(float(row["mean"]), 4),
-            "total_transactions": int(row["count"]),
+            "type": str(name),
+            "fraud_rate": round(float(stats.mean[i]), 4),
+            "total_transactions": int(stats.count[i]),
         }
-        for _, row in stats_df.iterrows()
+        for i, name in enumerate(categories)
+        if stats.count[i] > 0
     ]
 
-    return result
+    return JSONBytesResponse(result)
 
 
 @fraud_routes.post(
@@ -0,0 +1,161 @@
+"""Sérialisation JSON des réponses, colonne par colonne.
+
+Les pages de transactions étaient converties ligne à ligne (`astype(object)`
+puis `where` sur toute la page, `to_dict("records")`), puis encodées par
+`jsonable_encoder` et `json.dumps`. Ici chaque colonne est convertie d'un
+bloc en liste de valeurs Python natives, les valeurs absentes et les dates
+étant traitées de façon vectorisée. Les lignes sont ensuite assemblées par
+`zip`, et le tout est encodé en octets par `orjson`.
+
+Les données venant du store typé, les réponses de transactions sont
+émises sans validation Pydantic ligne à ligne (`trusted_response`) : le
+`response_model` des routes ne sert plus qu'au schéma OpenAPI. La
+validation peut être réactivée (débogage, tests) par la variable
+d'environnement ``APIBANK_VALIDATE_RESPONSES=1``.
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Sequence, Type
+
+import numpy as np
+import orjson
+import pandas as pd
+from fastapi.exceptions import ResponseValidationError
+from fastapi.responses import Response
+from pydantic import BaseModel, ValidationError
+
+# Types numpy (tableaux compris) sérialisés nativement par orjson
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+# Validation des réponses pré-sérialisées par leur modèle (débogage, tests)
+VALIDATE_RESPONSES = os.environ.get("APIBANK_VALIDATE_RESPONSES", "0") != "0"
+
+
+def _with_none(values: List[Any], missing: np.ndarray) -> List[Any]:
+    """Remplace par None les valeurs des positions absentes."""
+    for i in np.flatnonzero(missing).tolist():
+        values[i] = None
+    return values
+
+
+def _datetimes(values: np.ndarray) -> List[Optional[str]]:
+    """Dates ISO 8601 (format de Pydantic), None pour NaT."""
+    missing = np.isnat(values)
+    # Précision à la seconde si possible, sinon à la microseconde
+    unit = "s"
+    ticks = values[~missing].astype("datetime64[ns]").astype("int64")
+    if (ticks % 10**9).any():
+        unit = "us"
+    text = values.astype(f"datetime64[{unit}]").astype(str).tolist()
+    return _with_none(text, missing)
+
+
+def column_values(series: pd.Series) -> List[Any]:
+    """
+    Convertit une colonne en liste de valeurs Python sérialisables.
+
+    Args:
+        series: Colonne du DataFrame
+
+    Returns:
+        Liste de valeurs natives (int, float, str, bool, dates ISO), None
+        pour les valeurs absentes
+    """
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        # Seules les catégories des lignes sont lues (pas tout le
+        # dictionnaire, qui peut compter des milliers d'entrées)
+        codes = series.cat.codes.to_numpy()
+        categories = dtype.categories.to_numpy()
+        if not len(categories):
+            return [None] * len(codes)
+        values = categories[codes]
+        if values.dtype.kind == "M":
+            values[codes < 0] = np.datetime64("NaT")
+            return _datetimes(values)
+        return _with_none(values.tolist(), codes < 0)
+
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        return _with_none(
+            [value.isoformat() for value in series.dt.to_pydatetime()],
+            series.isna().to_numpy(),
+        )
+
+    if isinstance(dtype, pd.api.extensions.ExtensionDtype):
+        return series.to_numpy(dtype=object, na_value=None).tolist()
+
+    values = series.to_numpy()
+    if values.dtype.kind == "M":
+        return _datetimes(values)
+    if values.dtype.kind == "f":
+        return _with_none(values.tolist(), np.isnan(values))
+    if values.dtype.kind == "O":
+        return _with_none(values.tolist(), pd.isna(values))
+    return values.tolist()
+
+
+def frame_records(
+    df: pd.DataFrame, columns: Optional[Sequence[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Convertit un DataFrame en liste de dicts, colonne par colonne.
+
+    Args:
+        df: DataFrame à convertir
+        columns: Colonnes retenues (par défaut, toutes)
+
+    Returns:
+        Une entrée par ligne, valeurs absentes à None
+    """
+    names = list(df.columns if columns is None else columns)
+    values = [column_values(df[name]) for name in names]
+    return [dict(zip(names, row)) for row in zip(*values)]
+
+
+def dumps(content: Any) -> bytes:
+    """Encode un contenu en JSON (octets UTF-8)."""
+    return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+class JSONBytesResponse(Response):
+    """
+    Réponse JSON encodée par `orjson`.
+
+    Retournée directement par une route, elle évite `jsonable_encoder` :
+    le contenu doit être déjà sérialisable (voir `frame_records`).
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
+
+
+def trusted_response(
+    model: Type[BaseModel], content: Dict[str, Any]
+) -> JSONBytesResponse:
+    """
+    Encode une réponse sans la valider par son modèle.
+
+    Si `VALIDATE_RESPONSES` est actif, le contenu est validé et encodé par
+    le modèle, comme le ferait le `response_model` de FastAPI.
+
+    Args:
+        model: Modèle Pydantic de la réponse (celui du `response_model`)
+        content: Contenu déjà sérialisable (voir `frame_records`)
+
+    Returns:
+        Réponse JSON prête à être envoyée
+
+    Raises:
+        ResponseValidationError: si la validation est active et que le
+            contenu ne respecte pas le modèle
+    """
+    if VALIDATE_RESPONSES:
+        try:
+            content = model.model_validate(content).model_dump(mode="json")
+        except ValidationError as e:
+            raise ResponseValidationError(errors=e.errors())
+    return JSONBytesResponse(content)
@@ -1,19 +1,60 @@
-"""Routes pour les statistiques sur les transactions."""
+"""Routes pour les statistiques sur les transactions.
 
-from typing import Any, Dict, List
+Les agrégats sont calculés une fois par snapshot de données (voir
+`app.data.aggregates`) puis servis depuis la mémoire, encodés directement
+en JSON (voir `app.route.serialization`), en JSON colonnaire ou en Arrow
+(voir `app.route.columnar`). Les agrégations
+multi-dimensionnelles (`/api/stats/rollup`) sont servies par le cube de
+pré-agrégats du snapshot (voir `app.data.cube`).
+"""
+
+from typing import Any, Dict, List, Optional
 
 import pandas as pd
-from fastapi import APIRouter
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+)
 
+from app.data.aggregates import count_frauds, get_aggregates
+from app.data.cube import DIMENSIONS, get_cube
 from app.data.load_data import load_train_fraud, load_transactions
+from app.data.store import get_store
+from app.route.columnar import (
+    ARROW_RESPONSES,
+    ARROW_STREAM,
+    COLUMNAR,
+    arrow_records,
+    records_columns,
+    require_arrow,
+)
+from app.route.dependencies import require_datasets_ready
+from app.route.serialization import JSONBytesResponse
+from app.route.streaming import JSON, negotiate
+
+stat_router = APIRouter(
+    tags=["Statistics"], dependencies=[Depends(require_datasets_ready)]
+)
 
-stat_router = APIRouter(tags=["Statistics"])
+# Cache-Control des réponses, validées par ETag (`app.middleware.etag`)
+CACHE_CONTROL = "public, max-age=5"
 
 
 def normalize_amount(df: pd.DataFrame) -> pd.DataFrame:
     """
     Normalise la colonne `amount` en float si elle est de type object.
 
+    Le chargement typé (`app.data.schema`) fournit déjà des montants
+    ``float64`` : le DataFrame est alors retourné tel quel. Sinon, le
+    DataFrame partagé (snapshot) n'est jamais modifié : une copie
+    superficielle avec la colonne convertie est construite une fois par
+    snapshot (voir `TransactionStore.derived`), si bien que les requêtes
+    suivantes retrouvent le même DataFrame et ses index.
+
     Args:
         df: DataFrame contenant une colonne 'amount'
 
@@ -21,13 +62,52 @@ def normalize_amount(df: pd.DataFrame) -> pd.DataFrame:
         DataFrame avec la colonne 'amount' normalisée en float
     """
     if df["amount"].dtype == "object":
-        df["amount"] = pd.to_numeric(
-            df["amount"].replace({r"\$": "", ",": ""}, regex=True),
-            errors="coerce",
-        )
+        df = get_store(df).derived("normalized_amount", _normalized_amount)
     return df
 
 
+def _normalized_amount(df: pd.DataFrame) -> pd.DataFrame:
+    """Copie superficielle de `df` avec les montants texte convertis."""
+    amount = pd.to_numeric(
+        df["amount"].replace({r"\$": "", ",": ""}, regex=True),
+        errors="coerce",
+    )
+    return df.assign(amount=amount)
+
+
+def table_response(
+    rows: List[Dict[str, Any]],
+    accept: Optional[str],
+    format: Optional[str],
+    envelope: Optional[Dict[str, Any]] = None,
+) -> Response:
+    """
+    Encode une table d'agrégats dans le format demandé.
+
+    Args:
+        rows: Une ligne (dict) par groupe
+        accept: En-tête ``Accept`` (JSON ou Arrow IPC)
+        format: `COLUMNAR` pour un tableau de valeurs par champ
+        envelope: Champs de la réponse JSON, les lignes sous `rows` ; sans
+            enveloppe, la réponse est la table elle-même (ignorée en
+            Arrow, qui ne transporte que la table)
+
+    Returns:
+        Réponse prête à être envoyée
+
+    Raises:
+        HTTPException: 406 si Arrow est demandé sans ``pyarrow``
+    """
+    if negotiate(accept, (JSON, ARROW_STREAM)) == ARROW_STREAM:
+        require_arrow()
+        return Response(arrow_records(rows), media_type=ARROW_STREAM)
+
+    table: Any = records_columns(rows) if format == COLUMNAR else rows
+    if envelope is None:
+        return JSONBytesResponse(table)
+    return JSONBytesResponse({**envelope, "rows": table})
+
+
 @stat_router.get(
     "/api/stats/overview",
     summary="Vue d'ensemble des transactions",
@@ -50,31 +130,19 @@ def get_stats_overview() -> Dict[str, Any]:
     - type de transaction le plus fréquent
     """
     transactions_df = normalize_amount(load_transactions())
-    fraud_df = load_train_fraud()
-
-    total_transactions = len(transactions_df)
-    total_fraud = len(fraud_df[fraud_df["is_fraud"] == "Yes"])
+    overview = get_aggregates(get_store(transactions_df))["overview"]
+    total_fraud = count_frauds(load_train_fraud())
 
+    total_transactions = overview["total_transactions"]
     fraud_rate = (
         total_fraud / total_transactions if total_transactions > 0 else 0.0
     )
 
-    avg_amount = transactions_df["amount"].mean()
-    most_common_type = (
-        transactions_df["use_chip"].mode()[0]
-        if not transactions_df["use_chip"].empty
-        else None
-    )
-
-    avg_amount_value = (
-        round(float(avg_amount), 2) if not pd.isna(avg_amount) else 0.0
-    )
-
     return {
         "total_transactions": int(total_transactions),
         "fraud_rate": round(float(fraud_rate), 5),
-        "avg_amount": avg_amount_value,
-        "most_common_type": str(most_common_type),
+        "avg_amount": overview["avg_amount"],
+        "most_common_type": str(overview["most_common_type"]),
     }
 
 
@@ -91,38 +159,34 @@ def get_amount_distribution() -> Dict[str, Any]:
         Dict contenant les tranches et leur distribution
     """
     df = normalize_amount(load_transactions())
-    amounts = df["amount"].dropna()
-
-    bins = [0, 100, 500, 1000, 5000]
-    labels = ["0-100", "100-500", "500-1000", "1000-5000"]
-
-    distribution = pd.cut(
-        amounts,
-        bins=bins,
-        labels=labels,
-        include_lowest=True,
-    )
-
-    counts = distribution.value_counts().reindex(labels, fill_value=0).tolist()
-
-    return {
-        "bins": labels,
-        "counts": [int(value) for value in counts],
-    }
+    return get_aggregates(get_store(df))["amount_distribution"]
 
 
 @stat_router.get(
     "/api/stats/by-type",
+    response_model=List[Dict[str, Any]],
+    responses=ARROW_RESPONSES,
     summary="Statistiques par type de transaction",
     description=(
         "Nombre et montant moyen par type d'utilisation "
         "(chip, swipe, online…)."
     ),
 )
-def get_stats_by_type() -> List[Dict[str, Any]]:
+def get_stats_by_type(
+    format: Optional[str] = Query(
+        None,
+        pattern=f"^{COLUMNAR}$",
+        description="`columnar` : un tableau de valeurs par champ",
+    ),
+    accept: Optional[str] = Header(None),
+) -> Response:
     """
     Statistiques par type de transaction.
 
+    Args:
+        format: `columnar` pour un tableau de valeurs par champ
+        accept: En-tête ``Accept`` (JSON ou Arrow IPC)
+
     Returns:
         Liste des statistiques par type
 
@@ -131,32 +195,32 @@ def get_stats_by_type() -> List[Dict[str, Any]]:
     - montant moyen
     """
     df = normalize_amount(load_transactions())
-
-    stats_df = (
-        df.groupby("use_chip")["amount"].agg(["count", "mean"]).reset_index()
-    )
-
-    result: List[Dict[str, Any]] = [
-        {
-            "type": str(row["use_chip"]),
-            "count": int(row["count"]),
-            "avg_amount": round(float(row["mean"]), 2),
-        }
-        for _, row in stats_df.iterrows()
-    ]
-
-    return result
+    rows = get_aggregates(get_store(df))["by_type"]
+    return table_response(rows, accept, format)
 
 
 @stat_router.get(
     "/api/stats/daily",
+    response_model=List[Dict[str, Any]],
+    responses=ARROW_RESPONSES,
     summary="Statistiques journalières",
     description="Volume et montant moyen des transactions par jour.",
 )
-def get_daily_stats() -> List[Dict[str, Any]]:
+def get_daily_stats(
+    format: Optional[str] = Query(
+        None,
+        pattern=f"^{COLUMNAR}$",
+        description="`columnar` : un tableau de valeurs par champ",
+    ),
+    accept: Optional[str] = Header(None),
+) -> Response:
     """
     Statistiques journalières des transactions.
 
+    Args:
+        format: `columnar` pour un tableau de valeurs par champ
+        accept: En-tête ``Accept`` (JSON ou Arrow IPC)
+
     Returns:
         Liste des statistiques par jour
 
@@ -165,21 +229,117 @@ def get_daily_stats() -> List[Dict[str, Any]]:
     - montant moyen par jour
     """
     df = normalize_amount(load_transactions())
-    df["date"] = pd.to_datetime(df["date"])
+    rows = get_aggregates(get_store(df))["daily"]
+    return table_response(rows, accept, format)
 
-    daily_stats = (
-        df.groupby(df["date"].dt.date)["amount"]
-        .agg(["count", "mean"])
-        .reset_index()
-    )
 
-    result: List[Dict[str, Any]] = [
-        {
-            "date": str(row["date"]),
-            "volume": int(row["count"]),
-            "avg_amount": round(float(row["mean"]), 2),
-        }
-        for _, row in daily_stats.iterrows()
-    ]
+def parse_rollup_filters(values: List[str]) -> Dict[str, List[str]]:
+    """
+    Convertit les filtres `dimension:valeur` en valeurs par dimension.
+
+    Plusieurs valeurs pour une même dimension sont combinées par OU.
+
+    Args:
+        values: Filtres bruts de la requête
+
+    Returns:
+        Dict dimension -> valeurs acceptées
+
+    Raises:
+        HTTPException: 400 si un filtre est mal formé
+    """
+    filters: Dict[str, List[str]] = {}
+    for value in values:
+        dimension, sep, accepted = value.partition(":")
+        if not sep or not dimension or not accepted:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Filtre invalide (attendu dimension:valeur): {value}",
+            )
+        filters.setdefault(dimension.strip(), []).append(accepted.strip())
+    return filters
+
+
+def parse_day(value: Optional[str]) -> Optional[str]:
+    """
+    Normalise une borne de date en jour ISO (YYYY-MM-DD).
+
+    Raises:
+        HTTPException: 400 si la date est invalide
+    """
+    if value is None:
+        return None
+    try:
+        day = pd.Timestamp(value)
+    except ValueError:
+        day = pd.NaT
+    if day is pd.NaT:
+        raise HTTPException(status_code=400, detail=f"Date invalide: {value}")
+    return day.date().isoformat()
+
 
-    return result
+@stat_router.get(
+    "/api/stats/rollup",
+    response_model=Dict[str, Any],
+    responses=ARROW_RESPONSES,
+    summary="Agrégation multi-dimensionnelle",
+    description=(
+        "Nombre, total, moyenne, écart-type, min et max des montants par "
+        "combinaison de dimensions (" + ", ".join(DIMENSIONS) + "), "
+        "calculés depuis le cube de pré-agrégats."
+    ),
+)
+def get_rollup(
+    group_by: str = Query(
+        "", description="Dimensions de regroupement, séparées par des virgules"
+    ),
+    filter: List[str] = Query(
+        [], description="Filtre `dimension:valeur`, répétable"
+    ),
+    start_date: Optional[str] = Query(None, description="Premier jour inclus"),
+    end_date: Optional[str] = Query(None, description="Dernier jour inclus"),
+    format: Optional[str] = Query(
+        None,
+        pattern=f"^{COLUMNAR}$",
+        description="`columnar` : un tableau de valeurs par champ",
+    ),
+    accept: Optional[str] = Header(None),
+) -> Response:
+    """
+    Agrège les transactions selon des dimensions, sans relire les lignes.
+
+    Args:
+        group_by: Dimensions de regroupement (vide : un seul groupe)
+        filter: Filtres `dimension:valeur` (OU au sein d'une dimension, ET
+            entre dimensions)
+        start_date: Premier jour inclus (YYYY-MM-DD), optionnel
+        end_date: Dernier jour inclus (YYYY-MM-DD), optionnel
+        format: `columnar` pour un tableau de valeurs par champ
+        accept: En-tête ``Accept`` (JSON, ou Arrow IPC pour les seules
+            lignes)
+
+    Returns:
+        Dict contenant les dimensions, les filtres, le nombre de cellules
+        du cube et une ligne par groupe
+
+    Raises:
+        HTTPException: 400 si une dimension, un filtre ou une date est
+            invalide, 406 si Arrow est demandé sans ``pyarrow``
+    """
+    dimensions = [name.strip() for name in group_by.split(",") if name.strip()]
+    filters = parse_rollup_filters(filter)
+    start_day, end_day = (parse_day(start_date), parse_day(end_date))
+
+    df = normalize_amount(load_transactions())
+    cube = get_cube(get_store(df), load_train_fraud())
+    try:
+        rows = cube.rollup(dimensions, filters, start_day, end_day)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return table_response(
+        rows,
+        accept,
+        format,
+        {"group_by": dimensions, "filters": filters, "cells": cube.size},
+    )
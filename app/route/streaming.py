@@ -0,0 +1,133 @@
+"""Négociation de format et export en flux des transactions.
+
+Un export volumineux n'est jamais matérialisé en entier : les positions des
+lignes retenues sont produites bloc par bloc par un générateur, regroupées
+en lots de taille fixe (`STREAM_BATCH_ROWS`), et chaque lot est encodé
+puis envoyé avant de lire le suivant. La mémoire reste bornée par la
+taille d'un lot, et le premier octet part dès le premier lot complet.
+
+Formats : NDJSON (un objet JSON par ligne) et CSV (en-tête, puis une ligne
+par transaction), choisis par l'en-tête ``Accept``.
+"""
+
+import csv
+import io
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from app.route.serialization import column_values, dumps, frame_records
+
+JSON = "application/json"
+NDJSON = "application/x-ndjson"
+CSV = "text/csv"
+
+# Variantes acceptées dans l'en-tête Accept -> format
+MEDIA_ALIASES = {"application/ndjson": NDJSON}
+
+# Lignes par lot encodé et envoyé
+STREAM_BATCH_ROWS = 10_000
+
+
+def negotiate(
+    accept: Optional[str], offered: Sequence[str], default: str = JSON
+) -> str:
+    """
+    Choisit le format de réponse d'après l'en-tête ``Accept``.
+
+    Les types sont classés par facteur de qualité (``q``), puis par ordre
+    d'apparition ; ``*/*`` ou un en-tête absent donnent `default`.
+
+    Args:
+        accept: Valeur de l'en-tête ``Accept``
+        offered: Formats proposés par la route
+        default: Format par défaut
+
+    Returns:
+        Format retenu (un élément de `offered`, ou `default`)
+    """
+    if not accept:
+        return default
+
+    ranked = []
+    for position, item in enumerate(accept.split(",")):
+        media, *params = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        media = MEDIA_ALIASES.get(media.lower(), media.lower())
+        ranked.append((-quality, position, media))
+
+    for quality, _, media in sorted(ranked):
+        if quality == 0:
+            break
+        if media in offered:
+            return media
+        if media == "*/*":
+            return default
+    return default
+
+
+def batched(
+    positions: Iterable[np.ndarray], size: Optional[int] = None
+) -> Iterator[np.ndarray]:
+    """
+    Regroupe des blocs de positions en lots de `size` lignes.
+
+    Args:
+        positions: Positions des lignes retenues, bloc par bloc
+        size: Taille des lots, `STREAM_BATCH_ROWS` par défaut (le dernier
+            peut être plus petit)
+
+    Yields:
+        Lots de positions, dans l'ordre
+    """
+    size = size or STREAM_BATCH_ROWS
+    pending: List[np.ndarray] = []
+    count = 0
+    for block in positions:
+        pending.append(block)
+        count += len(block)
+        while count >= size:
+            merged = np.concatenate(pending)
+            yield merged[:size]
+            pending = [merged[size:]]
+            count -= size
+    if count:
+        yield np.concatenate(pending)
+
+
+def ndjson_stream(
+    df: pd.DataFrame,
+    batches: Iterable[np.ndarray],
+    columns: Sequence[str],
+) -> Iterator[bytes]:
+    """Encode des lots de lignes en NDJSON, un lot par morceau envoyé."""
+    for rows in batches:
+        records = frame_records(df.iloc[rows], columns)
+        yield b"".join(dumps(record) + b"\n" for record in records)
+
+
+def csv_stream(
+    df: pd.DataFrame,
+    batches: Iterable[np.ndarray],
+    columns: Sequence[str],
+) -> Iterator[bytes]:
+    """Encode des lots de lignes en CSV, en-tête dans le premier morceau."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(columns)
+    for rows in batches:
+        page = df.iloc[rows]
+        writer.writerows(zip(*(column_values(page[name]) for name in columns)))
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
@@ -1,15 +1,65 @@
 """Routes pour la gestion des transactions."""
 
-from typing import Any, Dict, List, Optional
+import bisect
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Type
 
+import numpy as np
 import pandas as pd
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 
 from app.data.load_data import load_transactions
-from app.models.transaction_response import TransactionListResponse
+from app.data.planner import RangePredicate, plan_query, take_rows
+from app.data.store import get_store
+from app.models.transaction_response import (
+    TransactionBatchResponse,
+    TransactionListResponse,
+    projected_list_response,
+)
 from app.models.transactions import Transaction
+from app.route.columnar import (
+    ARROW_RESPONSES,
+    ARROW_STREAM,
+    COLUMNAR,
+    arrow_stream,
+    frame_columns,
+    require_arrow,
+)
+from app.route.cursors import (
+    cursor_scope,
+    cursor_snapshot,
+    next_cursor,
+    rows_after,
+)
+from app.route.dependencies import require_datasets_ready
+from app.route.serialization import (
+    JSONBytesResponse,
+    frame_records,
+    trusted_response,
+)
+from app.route.streaming import (
+    CSV,
+    JSON,
+    NDJSON,
+    batched,
+    csv_stream,
+    ndjson_stream,
+    negotiate,
+)
 
-router = APIRouter(tags=["Transactions"])
+router = APIRouter(
+    tags=["Transactions"], dependencies=[Depends(require_datasets_ready)]
+)
+
+# Champs émis pour chaque transaction (ordre du modèle)
+TRANSACTION_FIELDS = list(Transaction.model_fields)
+
+# Lignes par bloc parcouru par la recherche
+SEARCH_BLOCK_ROWS = 65_536
+
+# Taille de page de la recherche paginée par curseur, sans `limit`
+SEARCH_PAGE_ROWS = 100
 
 
 # -------------------------------------------------------------------
@@ -17,22 +67,176 @@ router = APIRouter(tags=["Transactions"])
 # -------------------------------------------------------------------
 
 
-def df_to_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+def df_to_records(
+    df: pd.DataFrame, fields: Optional[Sequence[str]] = None
+) -> List[Dict[str, Any]]:
     """
     Convertit un DataFrame Pandas en liste de dicts compatibles Pydantic.
 
-    Remplace tous les NaN/NA par None.
+    Les NaN/NA sont remplacés par None et les dates converties en texte
+    ISO, colonne par colonne (voir `app.route.serialization`). Seuls les
+    champs du modèle `Transaction` sont retenus, dans son ordre, comme
+    après validation.
 
     Args:
         df: DataFrame à convertir
+        fields: Champs retenus (par défaut, tous ceux de `Transaction`)
 
     Returns:
         Liste de dictionnaires avec NaN remplacés par None
     """
-    cleaned_df = df.where(pd.notna(df), None).replace(
-        {pd.NA: None, float("nan"): None}
-    )
-    return cleaned_df.to_dict("records")
+    return frame_records(df, _present(df, fields))
+
+
+def page_records(
+    df: pd.DataFrame, rows: Any, fields: Optional[Sequence[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Lit les lignes d'une page et les convertit (voir `df_to_records`).
+
+    Seules les colonnes projetées sont copiées puis sérialisées : le coût
+    d'une page est proportionnel au nombre de champs demandés.
+
+    Args:
+        df: DataFrame des transactions
+        rows: Positions (ou tranche) des lignes de la page
+        fields: Champs retenus (par défaut, tous ceux de `Transaction`)
+
+    Returns:
+        Liste de dictionnaires avec NaN remplacés par None
+    """
+    columns = _present(df, fields)
+    positions = [df.columns.get_loc(name) for name in columns]
+    return frame_records(df.iloc[rows, positions], columns)
+
+
+def _present(
+    df: pd.DataFrame, fields: Optional[Sequence[str]]
+) -> List[str]:
+    """Champs retenus présents dans le DataFrame, dans l'ordre demandé."""
+    names = TRANSACTION_FIELDS if fields is None else fields
+    return [name for name in names if name in df.columns]
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """
+    Lit le paramètre `fields` (liste de champs séparés par des virgules).
+
+    Args:
+        fields: Valeur du paramètre, ou None pour tous les champs
+
+    Returns:
+        Champs de `Transaction` demandés, dans l'ordre du modèle
+
+    Raises:
+        HTTPException: 400 si un champ est inconnu
+    """
+    if not fields:
+        return tuple(TRANSACTION_FIELDS)
+    requested = {name.strip() for name in fields.split(",")} - {""}
+    unknown = requested.difference(TRANSACTION_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Champs inconnus: {', '.join(sorted(unknown))}",
+        )
+    if not requested:
+        return tuple(TRANSACTION_FIELDS)
+    return tuple(name for name in TRANSACTION_FIELDS if name in requested)
+
+
+def list_response(
+    model: Type[TransactionListResponse],
+    df: pd.DataFrame,
+    rows: Any,
+    fields: Sequence[str],
+    page: Dict[str, Any],
+    media_type: str,
+    format: Optional[str],
+) -> Response:
+    """
+    Encode une page de transactions dans le format demandé.
+
+    - Arrow (``Accept``) : flux Arrow IPC des lignes, pagination dans les
+      en-têtes ``X-Total-Count`` et ``X-Next-Cursor``
+    - ``format=columnar`` : `data` contient un tableau par champ
+    - sinon : `data` contient un objet par transaction
+
+    Args:
+        model: Modèle de la réponse JSON (voir `projected_list_response`)
+        df: DataFrame lu
+        rows: Positions (ou tranche) des lignes de la page
+        fields: Champs retenus
+        page: `total`, `offset`, `limit` et `next_cursor` de la page
+        media_type: Format négocié (JSON ou Arrow)
+        format: `COLUMNAR` pour un JSON colonnaire
+
+    Returns:
+        Réponse prête à être envoyée
+
+    Raises:
+        HTTPException: 406 si Arrow est demandé sans ``pyarrow``
+    """
+    columns = _present(df, fields)
+    if media_type == ARROW_STREAM:
+        require_arrow()
+        headers = {"X-Total-Count": str(page["total"])}
+        if page["next_cursor"] is not None:
+            headers["X-Next-Cursor"] = page["next_cursor"]
+        return Response(
+            b"".join(arrow_stream(df, [rows], columns)),
+            media_type=ARROW_STREAM,
+            headers=headers,
+        )
+
+    if format == COLUMNAR:
+        positions = [df.columns.get_loc(name) for name in columns]
+        data = frame_columns(df.iloc[rows, positions], columns)
+    else:
+        data = page_records(df, rows, fields)
+    content = {
+        "total": page["total"],
+        "offset": page["offset"],
+        "limit": page["limit"],
+        "data": data,
+        "next_cursor": page["next_cursor"],
+    }
+    if format == COLUMNAR:
+        return JSONBytesResponse(content)
+    return trusted_response(model, content)
+
+
+def parse_date_bound(value: Optional[str]) -> Optional[int]:
+    """
+    Convertit une borne de date ISO en entier ``int64`` (nanosecondes).
+
+    Les dates du dataset sont naïves (sans fuseau horaire) : une borne
+    avec fuseau ne leur est pas comparable et est refusée.
+
+    Args:
+        value: Date au format ISO, ou None
+
+    Returns:
+        Borne comparable aux valeurs de `date_values`, ou None
+
+    Raises:
+        HTTPException: 400 si la date est invalide (``NaT`` compris) ou
+            porte un fuseau horaire
+    """
+    if not value:
+        return None
+    try:
+        bound = pd.Timestamp(value)
+    except ValueError:
+        bound = pd.NaT
+    if bound is pd.NaT:
+        raise HTTPException(status_code=400, detail=f"Date invalide: {value}")
+    if bound.tzinfo is not None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Date avec fuseau horaire non supportée: {value}",
+        )
+    return bound.value
 
 
 def paginate_dataframe(
@@ -79,6 +283,7 @@ def get_transaction_types() -> Dict[str, List[str]]:
 @router.get(
     "/api/transactions",
     response_model=TransactionListResponse,
+    responses=ARROW_RESPONSES,
     summary="Lister les transactions",
 )
 def get_transactions(
@@ -89,25 +294,58 @@ def get_transactions(
     max_amount: Optional[float] = Query(None),
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
-) -> Dict[str, Any]:
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(
+        None, description="Champs retournés, séparés par des virgules"
+    ),
+    format: Optional[str] = Query(
+        None,
+        pattern=f"^{COLUMNAR}$",
+        description="`columnar` : un tableau de valeurs par champ",
+    ),
+    explain: bool = Query(False),
+    accept: Optional[str] = Header(None),
+) -> Response:
     """
     Liste paginée des transactions avec filtres optionnels.
 
+    Les filtres sont planifiés (voir `app.data.planner`) : le plus sélectif
+    d'entre eux sert de chemin d'accès via son index, les autres ne sont
+    évalués que sur ses lignes. Les résultats suivent l'ordre de la table.
+
+    Chaque page porte un curseur (`next_cursor`) : passé en paramètre
+    `cursor` avec les mêmes filtres, il reprend la lecture au même
+    snapshot, juste après la dernière ligne servie, sans relire les pages
+    précédentes (résultat mémorisé par le store, sinon reprise depuis le
+    chemin d'accès : voir `QueryPlan.execute_after`).
+
     Args:
         limit: Nombre maximum de résultats (1-1000)
-        offset: Position de départ
+        offset: Position de départ (ignorée avec `cursor`)
         client_id: Filtrer par ID client
         min_amount: Montant minimum
         max_amount: Montant maximum
         start_date: Date de début (format ISO)
         end_date: Date de fin (format ISO)
+        cursor: Curseur de la page suivante (`next_cursor`)
+        fields: Champs retournés (par défaut, tous)
+        format: `columnar` pour un JSON colonnaire
+        explain: Ajoute à la réponse le plan choisi (`plan`) : chemin
+            d'accès, estimations par prédicat et durée de chaque étape,
+            en JSON
+        accept: En-tête ``Accept`` (JSON ou Arrow IPC)
 
     Returns:
         Dict contenant total, offset, limit et les données paginées
 
     Raises:
-        HTTPException: 404 si fichier introuvable, 500 si erreur interne
+        HTTPException: 404 si fichier introuvable, 500 si erreur interne,
+            400 si curseur ou champ invalide, 410 si curseur expiré, 406
+            si Arrow est demandé sans ``pyarrow``
     """
+    projection = parse_fields(fields)
+    model = projected_list_response(projection)
+    media_type = negotiate(accept, (JSON, ARROW_STREAM))
     try:
         df = load_transactions()
     except FileNotFoundError:
@@ -119,105 +357,350 @@ def get_transactions(
             status_code=500, detail=f"Erreur interne: {str(e)}"
         )
 
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-
-    # Filtres dynamiques
+    start_bound = parse_date_bound(start_date)
+    end_bound = parse_date_bound(end_date)
+    predicates = []
     if client_id is not None:
-        df = df[df["client_id"] == client_id]
+        predicates.append(RangePredicate("client_id", client_id, client_id))
+    if min_amount is not None or max_amount is not None:
+        predicates.append(RangePredicate("amount", min_amount, max_amount))
+    if start_date or end_date:
+        predicates.append(RangePredicate("date", start_bound, end_bound))
+
+    scope = cursor_scope(
+        "transactions", client_id, min_amount, max_amount,
+        start_bound, end_bound,
+    )
+    store, resume = cursor_snapshot(df, cursor, scope, "id")
+    df = store.frame
+
+    plan = plan_query(store, predicates)
+    if resume is not None:
+        offset, total = resume.offset, resume.total
+        rows = None if explain else store.cached_rows(scope)
+        if not predicates:
+            start = resume.row + 1
+            page_rows = slice(start, min(start + limit, len(df)))
+        elif rows is not None:
+            page_rows = rows_after(rows, resume.row, limit)
+        else:
+            page_rows = plan.execute_after(resume.row, limit, total)
+    else:
+        if explain or not predicates:
+            rows = plan.execute()
+        else:
+            rows = store.query_rows(scope, plan.execute)
+        if rows is None:
+            total = len(df)
+            page_rows = slice(offset, min(offset + limit, total))
+        else:
+            total, page_rows = len(rows), rows[offset:offset + limit]
+
+    start = time.perf_counter()
+    if isinstance(page_rows, slice):
+        stop = offset + page_rows.stop - page_rows.start
+    else:
+        stop = offset + len(page_rows)
+    page = {
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "next_cursor": next_cursor(
+            store, scope, "id", page_rows, stop, total
+        ),
+    }
+
+    if explain:
+        data = page_records(df, page_rows, projection)
+        plan.record_stage("materialize", start, len(data))
+        content = model(**page, data=data).model_dump(mode="json")
+        content["plan"] = plan.explain()
+        return JSONBytesResponse(content)
+    return list_response(
+        model, df, page_rows, projection, page, media_type, format
+    )
+
+
+def search_mask(df: pd.DataFrame, search_query: Dict[str, Any]) -> np.ndarray:
+    """
+    Évalue les critères de recherche sur un bloc de transactions.
 
-    if min_amount is not None:
-        df = df[df["amount"] >= min_amount]
+    Args:
+        df: Bloc de lignes de la table
+        search_query: Critères (voir `search_transactions`)
 
-    if max_amount is not None:
-        df = df[df["amount"] <= max_amount]
+    Returns:
+        Masque booléen des lignes retenues
+    """
+    mask = np.ones(len(df), dtype=bool)
 
-    if start_date:
-        df = df[df["date"] >= pd.to_datetime(start_date)]
+    if search_query.get("type"):
+        mask &= (df["use_chip"] == search_query["type"]).to_numpy()
 
-    if end_date:
-        df = df[df["date"] <= pd.to_datetime(end_date)]
+    if search_query.get("isFraud") is not None:
+        mask &= (df["isFraud"] == search_query["isFraud"]).to_numpy()
 
-    total, data = paginate_dataframe(df, offset, limit)
+    if search_query.get("amount_range"):
+        min_amount, max_amount = search_query["amount_range"]
+        amount = df["amount"]
+        mask &= ((amount >= min_amount) & (amount <= max_amount)).to_numpy()
 
-    return {
-        "total": total,
-        "offset": offset,
-        "limit": limit,
-        "data": data,
-    }
+    return mask
+
+
+def search_rows(
+    df: pd.DataFrame,
+    search_query: Dict[str, Any],
+    block_rows: Optional[int] = None,
+    start: int = 0,
+) -> Iterator[np.ndarray]:
+    """
+    Parcourt la table par blocs et produit les positions retenues.
+
+    Les masques ne sont jamais plus grands qu'un bloc : un export en flux
+    n'alloue rien de proportionnel à la table ni au résultat.
+
+    Args:
+        df: DataFrame des transactions
+        search_query: Critères de recherche
+        block_rows: Lignes par bloc parcouru (`SEARCH_BLOCK_ROWS` par
+            défaut)
+        start: Position de la première ligne parcourue (reprise d'un
+            curseur)
+
+    Yields:
+        Positions des lignes retenues de chaque bloc, dans l'ordre
+    """
+    block_rows = block_rows or SEARCH_BLOCK_ROWS
+    for start in range(start, len(df), block_rows):
+        block = df.iloc[start:start + block_rows]
+        yield start + np.flatnonzero(search_mask(block, search_query))
 
 
 @router.post(
     "/api/transactions/search",
     response_model=TransactionListResponse,
     summary="Recherche avancée de transactions",
+    responses={
+        200: {
+            "content": {
+                NDJSON: {"schema": {"type": "string"}},
+                CSV: {"schema": {"type": "string"}},
+                ARROW_STREAM: {
+                    "schema": {"type": "string", "format": "binary"}
+                },
+            },
+            "description": (
+                "JSON (par défaut, colonnaire avec `format=columnar`), ou "
+                "export en flux NDJSON / CSV / Arrow IPC selon l'en-tête "
+                "Accept"
+            ),
+        }
+    },
 )
-def search_transactions(search_query: Dict[str, Any]) -> Dict[str, Any]:
+def search_transactions(
+    search_query: Dict[str, Any],
+    accept: Optional[str] = Header(None),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(
+        None, description="Champs retournés, séparés par des virgules"
+    ),
+    format: Optional[str] = Query(
+        None,
+        pattern=f"^{COLUMNAR}$",
+        description="`columnar` : un tableau de valeurs par champ",
+    ),
+) -> Response:
     """
     Recherche avancée multicritère.
 
+    Avec ``Accept: application/x-ndjson``, ``Accept: text/csv`` ou
+    ``Accept: application/vnd.apache.arrow.stream``, le résultat est
+    exporté en flux par lots de `STREAM_BATCH_ROWS` lignes, à mémoire
+    bornée quelle que soit sa taille.
+
+    En JSON, `limit` ou `cursor` paginent le résultat : il est évalué une
+    fois par snapshot et mémorisé ; chaque page suivante (`next_cursor`)
+    reprend après la dernière ligne servie, dans le résultat mémorisé ou,
+    s'il a été évincé, en reprenant le parcours de la table à cette
+    ligne. Sans l'un ni l'autre, tout le résultat est retourné.
+
     Args:
         search_query: Dictionnaire de critères de recherche
             - type: Type de transaction
             - isFraud: Booléen de fraude
             - amount_range: Tuple (min, max)
+        accept: En-tête ``Accept`` (format de la réponse)
+        limit: Taille de page (`SEARCH_PAGE_ROWS` par défaut avec `cursor`)
+        cursor: Curseur de la page suivante (`next_cursor`)
+        fields: Champs retournés (par défaut, tous)
+        format: `columnar` pour un JSON colonnaire
 
     Returns:
-        Dict contenant les résultats de recherche
+        Dict contenant les résultats de recherche, ou flux NDJSON / CSV /
+        Arrow
+
+    Raises:
+        HTTPException: 400 si curseur ou champ invalide, 410 si curseur
+            expiré, 406 si Arrow est demandé sans ``pyarrow``
     """
+    projection = parse_fields(fields)
+    model = projected_list_response(projection)
     df = load_transactions()
+    media_type = negotiate(accept, (JSON, NDJSON, CSV, ARROW_STREAM))
+    columns = _present(df, projection)
+    paginated = limit is not None or cursor is not None
+
+    if media_type == NDJSON:
+        batches = batched(search_rows(df, search_query))
+        return StreamingResponse(
+            ndjson_stream(df, batches, columns), media_type=NDJSON
+        )
+    if media_type == CSV:
+        batches = batched(search_rows(df, search_query))
+        return StreamingResponse(
+            csv_stream(df, batches, columns), media_type=CSV
+        )
+    if media_type == ARROW_STREAM and not paginated:
+        require_arrow()
+        batches = batched(search_rows(df, search_query))
+        return StreamingResponse(
+            arrow_stream(df, batches, columns), media_type=ARROW_STREAM
+        )
 
-    if search_query.get("type"):
-        df = df[df["use_chip"] == search_query["type"]]
-
-    if search_query.get("isFraud") is not None:
-        df = df[df["isFraud"] == search_query["isFraud"]]
-
-    if search_query.get("amount_range"):
-        min_amount, max_amount = search_query["amount_range"]
-        df = df[(df["amount"] >= min_amount) & (df["amount"] <= max_amount)]
-
-    total = len(df)
-    data = df_to_records(df)
+    def execute(df: pd.DataFrame) -> np.ndarray:
+        rows = np.concatenate(list(search_rows(df, search_query)) or [[]])
+        return rows.astype("int64")
+
+    if not paginated:
+        rows = execute(df)
+        page = {
+            "total": len(rows),
+            "offset": 0,
+            "limit": len(rows),
+            "next_cursor": None,
+        }
+        return list_response(
+            model, df, rows, projection, page, media_type, format
+        )
 
-    return {
+    scope = cursor_scope("search", search_query)
+    store, resume = cursor_snapshot(df, cursor, scope, "id")
+    limit = limit or SEARCH_PAGE_ROWS
+    if resume is None:
+        rows = store.query_rows(scope, lambda: execute(store.frame))
+        offset, total, page_rows = 0, len(rows), rows[:limit]
+    else:
+        offset, total = resume.offset, resume.total
+        rows = store.cached_rows(scope)
+        if rows is not None:
+            page_rows = rows_after(rows, resume.row, limit)
+        else:
+            # Résultat évincé du cache : reprise du parcours après la
+            # dernière ligne servie
+            page_rows = take_rows(
+                search_rows(store.frame, search_query, start=resume.row + 1),
+                limit,
+            )
+    stop = offset + len(page_rows)
+    page = {
         "total": total,
-        "offset": 0,
-        "limit": total,
-        "data": data,
+        "offset": offset,
+        "limit": limit,
+        "next_cursor": next_cursor(
+            store, scope, "id", page_rows, stop, total
+        ),
     }
+    return list_response(
+        model, store.frame, page_rows, projection, page, media_type, format
+    )
 
 
 @router.get(
     "/api/transactions/recent",
     response_model=TransactionListResponse,
+    responses=ARROW_RESPONSES,
     summary="Transactions récentes",
 )
 def get_recent_transactions(
     n: int = Query(10, ge=1, le=100),
-) -> Dict[str, Any]:
+    fields: Optional[str] = Query(
+        None, description="Champs retournés, séparés par des virgules"
+    ),
+    format: Optional[str] = Query(
+        None,
+        pattern=f"^{COLUMNAR}$",
+        description="`columnar` : un tableau de valeurs par champ",
+    ),
+    accept: Optional[str] = Header(None),
+) -> Response:
     """
-    Retourne les N transactions les plus récentes.
+    Retourne les N transactions les plus récentes, de la plus récente à
+    la plus ancienne (index des dates, sans tri de la table).
 
     Args:
         n: Nombre de transactions à retourner (1-100)
+        fields: Champs retournés (par défaut, tous)
+        format: `columnar` pour un JSON colonnaire
+        accept: En-tête ``Accept`` (JSON ou Arrow IPC)
 
     Returns:
         Dict contenant les transactions récentes
+
+    Raises:
+        HTTPException: 400 si un champ est inconnu, 406 si Arrow est
+            demandé sans ``pyarrow``
     """
+    projection = parse_fields(fields)
+    media_type = negotiate(accept, (JSON, ARROW_STREAM))
     df = load_transactions()
 
-    df_sorted = (
-        df.sort_values("step", ascending=False) if "step" in df.columns else df
+    if "date" in df.columns:
+        index = get_store(df).date_index
+        rows = index.rows(max(index.size - n, 0), index.size)[::-1]
+    else:
+        if "step" in df.columns:
+            df = df.sort_values("step", ascending=False)
+        rows = np.arange(min(n, len(df)))
+
+    page = {"total": len(rows), "offset": 0, "limit": n, "next_cursor": None}
+    return list_response(
+        projected_list_response(projection),
+        df, rows, projection, page, media_type, format,
     )
-    data = df_to_records(df_sorted.head(n))
 
-    return {
-        "total": len(data),
-        "offset": 0,
-        "limit": n,
-        "data": data,
-    }
+
+@router.get(
+    "/api/transactions/batch",
+    response_model=TransactionBatchResponse,
+    summary="Récupérer plusieurs transactions par ID",
+)
+def get_transactions_batch(
+    ids: List[int] = Query(..., max_length=1000),
+) -> Response:
+    """
+    Retourne plusieurs transactions en un appel (`?ids=1&ids=2`).
+
+    Args:
+        ids: Identifiants des transactions (1000 au maximum)
+
+    Returns:
+        Dict contenant les transactions trouvées, dans l'ordre demandé,
+        et la liste des identifiants introuvables
+    """
+    df = load_transactions()
+    positions = get_store(df).id_index.lookup_many(ids)
+    found = positions >= 0
+
+    return trusted_response(
+        TransactionBatchResponse,
+        {
+            "total": int(found.sum()),
+            "data": df_to_records(df.iloc[positions[found]]),
+            "missing": [i for i, hit in zip(ids, found) if not hit],
+        },
+    )
 
 
 @router.get(
@@ -225,7 +708,7 @@ def get_recent_transactions(
     response_model=Transaction,
     summary="Récupérer une transaction par ID",
 )
-def get_transaction_by_id(transaction_id: int) -> Dict[str, Any]:
+def get_transaction_by_id(transaction_id: int) -> Response:
     """
     Retourne une transaction par son identifiant.
 
@@ -239,12 +722,14 @@ def get_transaction_by_id(transaction_id: int) -> Dict[str, Any]:
         HTTPException: 404 si transaction non trouvée
     """
     df = load_transactions()
-    transaction = df[df["id"] == transaction_id]
+    position = get_store(df).id_index.lookup(transaction_id)
 
-    if transaction.empty:
+    if position < 0:
         raise HTTPException(status_code=404, detail="Transaction non trouvée")
 
-    return df_to_records(transaction)[0]
+    return trusted_response(
+        Transaction, df_to_records(df.iloc[[position]])[0]
+    )
 
 
 @router.delete(
@@ -266,7 +751,7 @@ def delete_transaction(transaction_id: int) -> Dict[str, Any]:
     """
     df = load_transactions()
 
-    if transaction_id not in df["id"].values:
+    if get_store(df).id_index.lookup(transaction_id) < 0:
         raise HTTPException(status_code=404, detail="Transaction non trouvée")
 
     return {
@@ -278,35 +763,81 @@ def delete_transaction(transaction_id: int) -> Dict[str, Any]:
 @router.get(
     "/api/transactions/by-customer/{customer_id}",
     response_model=TransactionListResponse,
+    responses=ARROW_RESPONSES,
     summary="Transactions émises par un client",
 )
 def get_transactions_by_customer(
     customer_id: int,
     limit: int = Query(100, ge=1, le=1000),
     offset: int = Query(0, ge=0),
-) -> Dict[str, Any]:
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(
+        None, description="Champs retournés, séparés par des virgules"
+    ),
+    format: Optional[str] = Query(
+        None,
+        pattern=f"^{COLUMNAR}$",
+        description="`columnar` : un tableau de valeurs par champ",
+    ),
+    accept: Optional[str] = Header(None),
+) -> Response:
     """
-    Transactions dont le client est l'émetteur.
+    Transactions dont le client est l'émetteur, par date croissante.
+
+    Seules les lignes de la page sont lues (index client, sans parcours
+    de la table). Avec `cursor`, la lecture reprend au même snapshot,
+    après la date et la position de la dernière ligne servie.
 
     Args:
         customer_id: Identifiant du client émetteur
         limit: Nombre maximum de résultats
-        offset: Position de départ
+        offset: Position de départ (ignorée avec `cursor`)
+        cursor: Curseur de la page suivante (`next_cursor`)
+        fields: Champs retournés (par défaut, tous)
+        format: `columnar` pour un JSON colonnaire
+        accept: En-tête ``Accept`` (JSON ou Arrow IPC)
 
     Returns:
         Dict contenant les transactions du client
-    """
-    df = load_transactions()
-    df_customer = df[df["client_id"] == customer_id]
 
-    total, data = paginate_dataframe(df_customer, offset, limit)
+    Raises:
+        HTTPException: 400 si curseur ou champ invalide, 410 si curseur
+            expiré, 406 si Arrow est demandé sans ``pyarrow``
+    """
+    projection = parse_fields(fields)
+    media_type = negotiate(accept, (JSON, ARROW_STREAM))
+    scope = cursor_scope("by-customer", customer_id)
+    store, resume = cursor_snapshot(
+        load_transactions(), cursor, scope, "date"
+    )
+    rows = store.client_index.rows(customer_id)
+    start = offset
+    if resume is not None:
+        # Lignes du client triées par (date, position) : reprise par
+        # recherche dichotomique de la dernière ligne servie
+        offset = resume.offset
+        dates = store.column_values("date")
+        start = bisect.bisect_right(
+            range(len(rows)),
+            (resume.key, resume.row),
+            key=lambda i: (dates[rows[i]], rows[i]),
+        )
 
-    return {
+    total = len(rows)
+    page_rows = rows[start:start + limit]
+    stop = offset + len(page_rows)
+    page = {
         "total": total,
         "offset": offset,
         "limit": limit,
-        "data": data,
+        "next_cursor": next_cursor(
+            store, scope, "date", page_rows, stop, total
+        ),
     }
+    return list_response(
+        projected_list_response(projection),
+        store.frame, page_rows, projection, page, media_type, format,
+    )
 
 
 @router.get(
@@ -318,7 +849,7 @@ def get_transactions_to_customer(
     customer_id: int,
     limit: int = Query(100, ge=1, le=1000),
     offset: int = Query(0, ge=0),
-) -> Dict[str, Any]:
+) -> Response:
     """
     Transactions dont le client est le destinataire.
 
@@ -350,9 +881,13 @@ def get_transactions_to_customer(
 
     total, data = paginate_dataframe(df_customer, offset, limit)
 
-    return {
-        "total": total,
-        "offset": offset,
-        "limit": limit,
-        "data": data,
-    }
+    return trusted_response(
+        TransactionListResponse,
+        {
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "data": data,
+            "next_cursor": None,
+        },
+    )
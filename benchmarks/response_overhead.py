@@ -0,0 +1,90 @@
+"""Coût par page de `/api/transactions`, avec et sans validation.
+
+Mesure le temps de réponse d'une page de 1000 transactions sur un
+DataFrame synthétique typé comme le store : réponse validée par
+`TransactionListResponse` (comportement du `response_model` de FastAPI,
+``APIBANK_VALIDATE_RESPONSES=1``) puis réponse pré-sérialisée de
+confiance (par défaut).
+
+Usage :
+    APIBANK_WARMUP=0 python benchmarks/response_overhead.py [lignes]
+"""
+
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.main import app  # noqa: E402
+from app.route import serialization  # noqa: E402
+from app.route import transaction_routes  # noqa: E402
+
+PAGE = "/api/transactions?limit=1000&offset=5000"
+REPEAT = 30
+
+
+def synthetic_transactions(rows: int) -> pd.DataFrame:
+    """Transactions aléatoires aux types du store compact."""
+    rng = np.random.default_rng(0)
+    states = pd.Categorical(rng.choice(["CA", "NY", "TX", None], rows))
+    errors = pd.Categorical(rng.choice([None, None, None, "Bad PIN"], rows))
+    return pd.DataFrame(
+        {
+            "id": np.arange(rows, dtype="int32"),
+            "date": pd.Timestamp("2010-01-01")
+            + pd.to_timedelta(np.sort(rng.integers(0, 10**8, rows)), "s"),
+            "client_id": rng.integers(0, 2000, rows).astype("int16"),
+            "card_id": rng.integers(0, 6000, rows).astype("int16"),
+            "amount": rng.normal(50, 30, rows).round(2),
+            "use_chip": pd.Categorical(
+                rng.choice(["Chip Transaction", "Swipe Transaction"], rows)
+            ),
+            "merchant_id": pd.array(
+                rng.integers(0, 10**5, rows), dtype="Int32"
+            ),
+            "merchant_city": pd.Categorical(
+                rng.choice(["Paris", "Lyon", "ONLINE"], rows)
+            ),
+            "merchant_state": states,
+            "zip": pd.array(rng.integers(10**4, 10**5, rows), dtype="Int32"),
+            "mcc": pd.array(rng.integers(5000, 6000, rows), dtype="Int16"),
+            "errors": errors,
+        }
+    )
+
+
+def measure(client: TestClient, validate: bool) -> float:
+    """Temps médian d'une page, en millisecondes."""
+    serialization.VALIDATE_RESPONSES = validate
+    client.get(PAGE)
+    durations = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        response = client.get(PAGE)
+        durations.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200
+    return statistics.median(durations)
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    df = synthetic_transactions(rows)
+    transaction_routes.load_transactions = lambda: df
+    client = TestClient(app)
+
+    validated = measure(client, validate=True)
+    trusted = measure(client, validate=False)
+    print(f"page de 1000 lignes ({rows} transactions)")
+    print(f"  validée (response_model) : {validated:8.2f} ms")
+    print(f"  pré-sérialisée           : {trusted:8.2f} ms")
+    print(f"  gain                     : {validated / trusted:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
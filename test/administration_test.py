@@ -65,3 +65,18 @@ def test_metadata_no_pyproject(client, monkeypatch):
 
     assert data["version"] == "0.0.0"
     assert data["last_update"] == "unknown"
+
+
+def test_memory_report(client, monkeypatch):
+    df = pd.DataFrame({"id": pd.array([1, 2], dtype="int32")})
+
+    monkeypatch.setattr(admin.load_data, "_transactions_df", df)
+    monkeypatch.setattr(admin.load_data, "_train_fraud_df", None)
+
+    response = client.get("/api/system/memory")
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data["datasets"]["transactions"]["columns"] == {"id": 8}
+    assert data["datasets"]["transactions"]["rows"] == 2
+    assert "fraud_labels" not in data["datasets"]
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+from app.data.aggregates import (
+    compute_aggregates,
+    count_frauds,
+    get_aggregates,
+)
+from app.data.store import get_store
+
+
+def random_frame(rows=500, seed=0):
+    rng = np.random.default_rng(seed)
+    amounts = rng.uniform(-50, 6000, rows).round(2)
+    amounts[::37] = np.nan
+    amounts[5] = 0.0
+    dates = pd.Timestamp("2020-01-01") + pd.to_timedelta(
+        rng.integers(0, 20 * 24 * 60, rows), unit="min"
+    )
+    types = rng.choice(["Chip", "Swipe", "Online"], rows).astype(object)
+    types[::41] = None
+    return pd.DataFrame(
+        {
+            "amount": amounts,
+            "date": dates,
+            "use_chip": pd.Series(types, dtype="category"),
+        }
+    )
+
+
+def test_aggregates_match_pandas():
+    df = random_frame()
+    aggregates = compute_aggregates(df)
+
+    by_type = df.groupby("use_chip", observed=True)["amount"].agg(
+        ["count", "mean"]
+    )
+    assert {
+        row["type"]: (row["count"], row["avg_amount"])
+        for row in aggregates["by_type"]
+    } == {
+        name: (int(stats["count"]), round(float(stats["mean"]), 2))
+        for name, stats in by_type.iterrows()
+    }
+
+    daily = df.groupby(df["date"].dt.date)["amount"].agg(["count", "mean"])
+    assert [row["date"] for row in aggregates["daily"]] == [
+        str(day) for day in daily.index
+    ]
+    assert [row["volume"] for row in aggregates["daily"]] == daily[
+        "count"
+    ].tolist()
+
+    expected = (
+        pd.cut(
+            df["amount"].dropna(),
+            [0, 100, 500, 1000, 5000],
+            include_lowest=True,
+        )
+        .value_counts(sort=False)
+        .tolist()
+    )
+    assert aggregates["amount_distribution"]["counts"] == expected
+
+    overview = aggregates["overview"]
+    assert overview["avg_amount"] == round(df["amount"].mean(), 2)
+    assert overview["most_common_type"] == df["use_chip"].mode()[0]
+
+
+def test_aggregates_cached_per_snapshot():
+    df = random_frame()
+
+    first = get_aggregates(get_store(df))
+    assert get_aggregates(get_store(df)) is first
+    assert get_aggregates(get_store(df.copy())) is not first
+
+
+def test_count_frauds_memoized():
+    labels = pd.DataFrame({"is_fraud": pd.Categorical(["Yes", "No", "Yes"])})
+
+    assert count_frauds(labels) == 2
+    assert count_frauds(labels) == 2
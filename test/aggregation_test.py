@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.data.aggregation import aggregate, dense_keys
+
+
+def random_frame(rows=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(50, 20, rows)
+    values[::17] = np.nan
+    return pd.DataFrame(
+        {
+            "client_id": rng.integers(100, 160, rows),
+            "mcc": pd.Categorical(rng.choice(["5411", "5812", "4829"], rows)),
+            "amount": values,
+        }
+    )
+
+
+@pytest.mark.parametrize("column", ["client_id", "mcc"])
+def test_aggregate_matches_pandas(column):
+    df = random_frame()
+    codes, keys = dense_keys(df[column])
+    stats = aggregate(codes, df["amount"], len(keys))
+
+    expected = df.groupby(column, observed=True)["amount"].agg(
+        ["size", "count", "sum", "mean", "min", "max"]
+    )
+    expected["var"] = df.groupby(column, observed=True)["amount"].var(ddof=0)
+
+    present = stats.rows > 0
+    assert keys[present].tolist() == expected.index.tolist()
+    assert stats.rows[present].tolist() == expected["size"].tolist()
+    assert stats.count[present].tolist() == expected["count"].tolist()
+    for name, values in [
+        ("sum", stats.sum),
+        ("mean", stats.mean),
+        ("min", stats.min),
+        ("max", stats.max),
+        ("var", stats.variance),
+    ]:
+        assert values[present] == pytest.approx(expected[name].to_numpy())
+
+
+def test_dense_keys_strategies():
+    # Étendue compacte : valeur - minimum, sans tri
+    codes, keys = dense_keys(pd.Series([7, 5, 7, 6]))
+    assert codes.tolist() == [2, 0, 2, 1]
+    assert keys.tolist() == [5, 6, 7]
+
+    # Étendue creuse : rang parmi les valeurs distinctes
+    codes, keys = dense_keys(np.array([10**9, 3, 10**9]))
+    assert codes.tolist() == [1, 0, 1]
+    assert keys.tolist() == [3, 10**9]
+
+    # Valeurs absentes (entier nullable) : code -1
+    codes, keys = dense_keys(pd.Series([4, None, 2], dtype="Int64"))
+    assert codes.tolist() == [1, -1, 0]
+    assert keys.tolist() == [2.0, 4.0]
+
+
+def test_aggregate_ignores_missing_keys_and_counts_only():
+    stats = aggregate(np.array([0, -1, 1, 1]), size=3)
+
+    assert stats.rows.tolist() == [1, 2, 0]
+    assert np.isnan(stats.mean[2])
+
+
+def test_regroup_merges_groups():
+    codes = np.array([0, 1, 1, 2, 3])
+    values = np.array([1.0, 2.0, 4.0, 8.0, np.nan])
+    stats = aggregate(codes, values)
+
+    merged = stats.regroup(np.array([0, 0, 1, -1]), 2)
+
+    assert merged.rows.tolist() == [3, 1]
+    assert merged.count.tolist() == [3, 1]
+    assert merged.sum.tolist() == [7.0, 8.0]
+    assert merged.min.tolist() == [1.0, 8.0]
+    assert merged.max.tolist() == [4.0, 8.0]
+    assert merged.variance[0] == pytest.approx(np.var([1.0, 2.0, 4.0]))
@@ -1,6 +1,7 @@
 import pytest
 import pandas as pd
 from fastapi.testclient import TestClient
+from app.data import store as store_module
 from app.route import clients_routes as client_module
 
 from app.main import app
@@ -92,7 +93,83 @@ def test_get_top_customers_success(
     assert "profile" in data[0]
 
 
+def test_top_customers_profile_index_outside_store_registry(
+    client, mock_users_df, mock_transactions_df, monkeypatch
+):
+    monkeypatch.setattr(client_module, "load_user_data", lambda: mock_users_df)
+    monkeypatch.setattr(
+        client_module, "load_transactions", lambda: mock_transactions_df
+    )
+
+    assert client.get("/api/customers/top?n=2").status_code == 200
+    index = client_module.profile_index(mock_users_df)
+    assert client_module.profile_index(mock_users_df) is index
+    assert id(mock_users_df) not in store_module._stores
+
+
 def test_get_top_customers_invalid_n(client):
     response = client.get("/api/customers/top?n=0")
 
     assert response.status_code == 422
+
+
+def test_get_top_customers_ranking(
+    client, mock_users_df, mock_transactions_df, monkeypatch
+):
+    monkeypatch.setattr(client_module, "load_user_data", lambda: mock_users_df)
+    transactions = mock_transactions_df.assign(
+        amount=[100.0, 250.0, 300.0]
+    )
+    monkeypatch.setattr(
+        client_module, "load_transactions", lambda: transactions
+    )
+
+    response = client.get("/api/customers/top?n=1")
+
+    assert response.status_code == 200
+    assert [(c["client_id"], c["total_spent"]) for c in response.json()] == [
+        (1, 350.0)
+    ]
+
+
+def test_get_top_customers_by_metric_and_window(
+    client, mock_users_df, monkeypatch
+):
+    transactions = pd.DataFrame(
+        {
+            "id": [10, 11, 12, 13],
+            "client_id": [1, 1, 2, 2],
+            "date": pd.to_datetime(
+                ["2020-01-01", "2020-01-02", "2020-02-01", "2020-02-02"]
+            ),
+            "amount": [10.0, 20.0, 100.0, 5.0],
+        }
+    )
+    labels = pd.DataFrame(
+        {"transaction_id": [10, 11, 12], "is_fraud": ["Yes", "No", "No"]}
+    )
+    monkeypatch.setattr(client_module, "load_user_data", lambda: mock_users_df)
+    monkeypatch.setattr(
+        client_module, "load_transactions", lambda: transactions
+    )
+    monkeypatch.setattr(client_module, "load_train_fraud", lambda: labels)
+
+    response = client.get("/api/customers/top?by=avg")
+    assert [c["client_id"] for c in response.json()] == [2, 1]
+    assert response.json()[0]["avg_amount"] == 52.5
+
+    response = client.get("/api/customers/top?by=fraud_rate&n=1")
+    assert response.json()[0]["client_id"] == 1
+    assert response.json()[0]["fraud_rate"] == 0.5
+
+    response = client.get(
+        "/api/customers/top?by=count&end_date=2020-01-15"
+    )
+    assert [
+        (c["client_id"], c["transaction_count"]) for c in response.json()
+    ] == [(1, 2)]
+
+    assert client.get("/api/customers/top?by=foo").status_code == 422
+    assert client.get(
+        "/api/customers/top?start_date=demain"
+    ).status_code == 400
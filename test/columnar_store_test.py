@@ -0,0 +1,109 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import app.data.load_data as ld
+from app.data.columnar_store import open_frame, save_frame, source_fingerprint
+
+CSV_CONTENT = (
+    "id,date,client_id,card_id,amount,use_chip,merchant_id,"
+    "merchant_city,merchant_state,zip,mcc,errors\n"
+    "1,2010-01-01 00:01:00,10,100,$-77.00,Swipe Transaction,500,"
+    "Beulah,ND,58523.0,5499,\n"
+    "2,2010-01-01 00:02:00,11,101,$14.57,Online Transaction,501,"
+    "ONLINE,,,5311,\"Bad PIN,Insufficient Balance\"\n"
+)
+
+
+def write_csv(tmp_path, content=CSV_CONTENT):
+    path = tmp_path / "transactions_data.csv"
+    path.write_text(content)
+    return path
+
+
+def fail_if_parsed(*args, **kwargs):
+    raise AssertionError("Le CSV ne devrait pas être parsé")
+
+
+def use_dataset_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(ld, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(ld, "CACHE_DIR", tmp_path / ".cache")
+    monkeypatch.setattr(ld, "_transactions_df", None)
+
+
+# ---------------------------------------
+# Aller-retour save_frame / open_frame
+# ---------------------------------------
+def test_roundtrip_memory_mapped(tmp_path):
+    df = pd.DataFrame(
+        {
+            "id": np.array([1, 2, 3], dtype="int32"),
+            "date": pd.to_datetime(["2010-01-01", None, "2010-01-03"]),
+            "amount": [1.5, -2.0, 3.25],
+            "city": ["Paris", None, "Lyon"],
+            "zip": pd.array([75001, None, 69001], dtype="Int32"),
+        }
+    )
+    fingerprint = {"size": 1, "mtime_ns": 1}
+
+    save_frame(df, tmp_path / "cache", fingerprint)
+    reopened = open_frame(tmp_path / "cache", fingerprint)
+
+    assert isinstance(reopened["id"].to_numpy().base, np.memmap)
+    assert reopened["id"].tolist() == [1, 2, 3]
+    assert pd.isna(reopened["date"].iloc[1])
+    assert reopened["amount"].tolist() == [1.5, -2.0, 3.25]
+    assert isinstance(reopened["city"].dtype, pd.CategoricalDtype)
+    assert reopened["city"].iloc[0] == "Paris"
+    assert pd.isna(reopened["city"].iloc[1])
+    assert reopened["zip"].dtype == "Int32"
+    assert pd.isna(reopened["zip"].iloc[1])
+
+
+def test_open_frame_stale_fingerprint(tmp_path):
+    df = pd.DataFrame({"id": [1, 2]})
+    save_frame(df, tmp_path / "cache", {"size": 1, "mtime_ns": 1})
+
+    assert open_frame(tmp_path / "cache", {"size": 2, "mtime_ns": 1}) is None
+    assert open_frame(tmp_path / "missing", {"size": 1, "mtime_ns": 1}) is None
+
+
+def test_source_fingerprint_missing_file(tmp_path):
+    assert source_fingerprint(tmp_path / "absent.csv") is None
+
+
+# ---------------------------------------
+# Intégration avec load_transactions
+# ---------------------------------------
+def test_load_transactions_writes_and_reuses_cache(tmp_path, monkeypatch):
+    write_csv(tmp_path)
+    use_dataset_dir(monkeypatch, tmp_path)
+
+    df = ld.load_transactions()
+    assert (tmp_path / ".cache" / "transactions" / "manifest.json").exists()
+    assert df["amount"].tolist() == [-77.0, 14.57]
+
+    # Second démarrage : le CSV n'est plus parsé
+    monkeypatch.setattr(ld, "_transactions_df", None)
+    monkeypatch.setattr(ld.pd, "read_csv", fail_if_parsed)
+    cached = ld.load_transactions()
+
+    assert cached["id"].tolist() == [1, 2]
+    # Montants rouverts mappés, sans conversion en mémoire
+    assert isinstance(cached["amount"].to_numpy().base, np.memmap)
+    assert cached["amount"].tolist() == [-77.0, 14.57]
+    assert cached["errors"].iloc[1] == "Bad PIN,Insufficient Balance"
+
+
+def test_load_transactions_rebuilds_when_csv_changes(tmp_path, monkeypatch):
+    path = write_csv(tmp_path)
+    use_dataset_dir(monkeypatch, tmp_path)
+    ld.load_transactions()
+
+    path.write_text(CSV_CONTENT.rsplit("\n", 2)[0] + "\n")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    monkeypatch.setattr(ld, "_transactions_df", None)
+
+    assert len(ld.load_transactions()) == 1
@@ -0,0 +1,160 @@
+import asyncio
+import gzip
+import threading
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+
+from app.middleware import compression
+from app.middleware.compression import CompressionMiddleware, choose_encoding
+
+BODY = "transaction;" * 500
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+
+@app.get("/big")
+def big():
+    return PlainTextResponse(BODY)
+
+
+@app.get("/small")
+def small():
+    return PlainTextResponse("ok")
+
+
+client = TestClient(app)
+
+
+def test_choose_encoding():
+    offered = ("zstd", "br", "gzip")
+
+    assert choose_encoding(None, offered) is None
+    assert choose_encoding("gzip, br", offered) == "br"
+    assert choose_encoding("gzip;q=1, br;q=0.5", offered) == "gzip"
+    assert choose_encoding("*", offered) == "zstd"
+    assert choose_encoding("*, zstd;q=0", offered) == "br"
+    assert choose_encoding("identity", offered) is None
+    assert choose_encoding("br", ("gzip",)) is None
+
+
+def test_compressed_above_threshold():
+    response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(BODY) / 10
+    assert response.text == BODY
+
+
+def test_small_or_unrequested_not_compressed():
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+    response = client.get("/big", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.text == BODY
+
+
+def test_missing_codec_not_offered(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    monkeypatch.setattr(compression, "zstandard", None)
+
+    response = client.get("/big", headers={"Accept-Encoding": "br, gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+
+
+def test_stream_compressed_chunk_by_chunk():
+    chunks = [BODY.encode(), b"", BODY.encode()]
+
+    async def streaming_app(scope, receive, send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"text/plain")],
+            }
+        )
+        for i, chunk in enumerate(chunks):
+            more_body = i < len(chunks) - 1
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": more_body,
+                }
+            )
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip")]}
+    middleware = CompressionMiddleware(streaming_app, minimum_size=100)
+    asyncio.run(middleware(scope, None, send))
+
+    start, *bodies = messages
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    assert len(bodies) == len(chunks)
+    # Chaque morceau est décodable dès sa réception (vidage du flux)
+    decoder = zlib.decompressobj(31)
+    assert decoder.decompress(bodies[0]["body"]) == BODY.encode()
+    assert gzip.decompress(b"".join(m["body"] for m in bodies)) == (
+        BODY.encode() * 2
+    )
+    assert bodies[-1]["more_body"] is False
+
+
+def test_large_body_compressed_in_thread(monkeypatch):
+    threads = []
+
+    class RecordingEncoder(compression.GzipEncoder):
+        def compress(self, data):
+            threads.append(threading.current_thread())
+            return super().compress(data)
+
+    monkeypatch.setitem(compression.ENCODERS, "gzip", RecordingEncoder)
+    body = BODY.encode()
+
+    async def body_app(scope, receive, send):
+        await send(
+            {"type": "http.response.start", "status": 200, "headers": []}
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    def run(thread_size):
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip")]}
+        middleware = CompressionMiddleware(
+            body_app, minimum_size=100, thread_size=thread_size
+        )
+        asyncio.run(middleware(scope, None, send))
+        return gzip.decompress(messages[-1]["body"])
+
+    assert run(thread_size=len(body) + 1) == body
+    assert threads.pop() is threading.current_thread()
+    assert run(thread_size=len(body)) == body
+    assert threads.pop() is not threading.current_thread()
+
+
+@pytest.mark.parametrize("encoding", ["br", "zstd"])
+def test_optional_codecs(encoding):
+    module = {"br": "brotli", "zstd": "zstandard"}[encoding]
+    pytest.importorskip(module)
+
+    response = client.get("/big", headers={"Accept-Encoding": encoding})
+
+    assert response.headers["content-encoding"] == encoding
+    assert int(response.headers["content-length"]) < len(BODY) / 10
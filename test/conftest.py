@@ -1,8 +1,17 @@
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
+from app.route import serialization
 
 
 @pytest.fixture
 def client():
     return TestClient(app)
+
+
+@pytest.fixture(params=[False, True], ids=["trusted", "validated"])
+def validate_responses(request, monkeypatch):
+    # Réponses pré-sérialisées servies telles quelles (production), puis
+    # validées par leur modèle (débogage)
+    monkeypatch.setattr(serialization, "VALIDATE_RESPONSES", request.param)
+    return request.param
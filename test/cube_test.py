@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.data.cube import RollupCube, get_cube
+from app.data.store import get_store
+
+
+def random_frame(rows=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    amounts = rng.uniform(-50, 800, rows).round(2)
+    amounts[::37] = np.nan
+    dates = pd.Timestamp("2019-12-20") + pd.to_timedelta(
+        rng.integers(0, 60 * 24 * 60, rows), unit="min"
+    )
+    dates = pd.Series(dates)
+    dates[::53] = pd.NaT
+    states = rng.choice(["CA", "NY", "TX"], rows).astype(object)
+    states[::29] = None
+    return pd.DataFrame(
+        {
+            "id": np.arange(rows) + 1000,
+            "date": dates,
+            "amount": amounts,
+            "use_chip": pd.Categorical(
+                rng.choice(["Chip", "Swipe", "Online"], rows)
+            ),
+            "mcc": rng.choice([5411, 5812, 4829], rows),
+            "merchant_state": pd.Categorical(states),
+        }
+    )
+
+
+def random_labels(df, seed=1):
+    rng = np.random.default_rng(seed)
+    labelled = df["id"].to_numpy()[::3]
+    return pd.DataFrame(
+        {
+            "transaction_id": labelled,
+            "is_fraud": rng.choice(["Yes", "No"], len(labelled)),
+        }
+    )
+
+
+def with_labels(df, labels):
+    fraud = df["id"].map(labels.set_index("transaction_id")["is_fraud"])
+    return df.assign(
+        is_fraud=fraud.fillna("Unlabeled"),
+        day=df["date"].dt.strftime("%Y-%m-%d"),
+        month=df["date"].dt.strftime("%Y-%m"),
+    )
+
+
+def expected_rollup(frame, group_by):
+    grouped = frame.dropna(subset=group_by).groupby(group_by, observed=True)
+    stats = grouped["amount"].agg(["size", "count", "sum", "mean", "min"])
+    stats["std"] = grouped["amount"].std(ddof=0)
+    return {
+        key if isinstance(key, tuple) else (key,): (
+            int(row["size"]),
+            round(row["sum"], 2),
+            round(row["mean"], 2),
+            round(row["std"], 2),
+            round(row["min"], 2),
+        )
+        for key, row in stats.iterrows()
+    }
+
+
+def assert_rollup(rows, frame, group_by):
+    actual = actual_rollup(rows, group_by)
+    expected = expected_rollup(frame, group_by)
+    assert actual.keys() == expected.keys()
+    for key, values in actual.items():
+        # Arrondis à 2 décimales de part et d'autre : écart d'un centime
+        assert values == pytest.approx(expected[key], abs=0.011)
+
+
+def actual_rollup(rows, group_by):
+    return {
+        tuple(row[name] for name in group_by): (
+            row["count"],
+            row["total_amount"],
+            row["avg_amount"],
+            row["std_amount"],
+            row["min_amount"],
+        )
+        for row in rows
+        if all(row[name] is not None for name in group_by)
+    }
+
+
+@pytest.mark.parametrize(
+    "group_by",
+    [
+        ["use_chip"],
+        ["mcc", "is_fraud"],
+        ["day"],
+        ["month", "merchant_state"],
+    ],
+)
+def test_rollup_matches_pandas(group_by):
+    df = random_frame()
+    labels = random_labels(df)
+    cube = RollupCube(df, get_store(df).fraud_column(labels))
+    frame = with_labels(df, labels)
+
+    rows = cube.rollup(group_by)
+
+    assert_rollup(rows, frame, group_by)
+    assert sum(row["count"] for row in rows) == len(df)
+
+
+def test_rollup_filters_and_date_range():
+    df = random_frame()
+    labels = random_labels(df)
+    cube = RollupCube(df, get_store(df).fraud_column(labels))
+    frame = with_labels(df, labels)
+
+    rows = cube.rollup(
+        ["use_chip"],
+        {"merchant_state": ["CA", "NY"], "is_fraud": ["Yes"]},
+        start_day="2020-01-01",
+        end_day="2020-01-31",
+    )
+
+    selected = frame[
+        frame["merchant_state"].isin(["CA", "NY"])
+        & (frame["is_fraud"] == "Yes")
+        & (frame["day"] >= "2020-01-01")
+        & (frame["day"] <= "2020-01-31")
+    ]
+    assert_rollup(rows, selected, ["use_chip"])
+
+
+def test_rollup_without_group_is_total():
+    df = random_frame()
+    cube = RollupCube(df, get_store(df).fraud_column(random_labels(df)))
+
+    [total] = cube.rollup([])
+
+    assert total["count"] == len(df)
+    assert total["total_amount"] == round(df["amount"].sum(), 2)
+    assert total["max_amount"] == df["amount"].max()
+
+
+def test_rollup_unknown_dimension():
+    df = random_frame(rows=50)
+    cube = RollupCube(df, get_store(df).fraud_column(random_labels(df)))
+
+    with pytest.raises(ValueError, match="zip"):
+        cube.rollup(["zip"])
+
+
+def test_cube_cached_per_snapshot_and_labels():
+    df = random_frame(rows=100)
+    labels = random_labels(df)
+    store = get_store(df)
+
+    cube = get_cube(store, labels)
+    assert get_cube(store, labels) is cube
+    assert get_cube(store, labels.copy()) is not cube
@@ -0,0 +1,80 @@
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from app.middleware.etag import ETagMiddleware, cached_routes, etag_matches
+
+router = APIRouter()
+state = {"version": 1, "calls": 0}
+
+
+@router.get("/api/stats/{name}")
+def stats(name: str, n: int = 0):
+    state["calls"] += 1
+    return {"name": name, "n": n}
+
+
+@router.get("/api/other")
+def other():
+    return {}
+
+
+@router.get("/api/reload")
+def reload():
+    state["version"] += 1
+    return {}
+
+
+app = FastAPI()
+app.include_router(router)
+app.add_middleware(
+    ETagMiddleware,
+    version=lambda: state["version"],
+    routes=cached_routes(
+        router, "public, max-age=5", paths=["/api/stats/{name}", "/api/reload"]
+    ),
+)
+client = TestClient(app)
+
+
+def test_not_modified_skips_handler():
+    first = client.get("/api/stats/daily?n=1&x=2")
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "public, max-age=5"
+
+    calls = state["calls"]
+    response = client.get(
+        "/api/stats/daily?x=2&n=1", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert state["calls"] == calls
+    assert response.headers["vary"] == first.headers["vary"]
+    assert first.headers["vary"] == "Accept, Accept-Encoding"
+
+
+def test_etag_per_representation_and_version():
+    etag = client.get("/api/stats/daily").headers["etag"]
+
+    assert client.get("/api/stats/by-type").headers["etag"] != etag
+    assert client.get(
+        "/api/stats/daily", headers={"Accept": "text/csv"}
+    ).headers["etag"] != etag
+
+    state["version"] += 1
+    response = client.get("/api/stats/daily", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_undeclared_route_or_reload_untagged():
+    assert "etag" not in client.get("/api/other").headers
+    # Données republiées pendant le calcul de la réponse
+    assert "etag" not in client.get("/api/reload").headers
+
+
+def test_etag_matches():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
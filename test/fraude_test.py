@@ -2,21 +2,39 @@ import pandas as pd
 from app.route import fraude_routes as fraud
 
 
-def mock_prepare_df():
+def mock_transactions():
     return pd.DataFrame(
         [
-            {"id": "1", "is_fraud": "Yes", "errors": "E1", "use_chip": "CHIP"},
-            {"id": "2", "is_fraud": "No", "errors": None, "use_chip": "SWIPE"},
-            {"id": "3", "is_fraud": "Yes", "errors": "E2", "use_chip": "CHIP"},
+            {"id": 1, "errors": "E1", "use_chip": "CHIP"},
+            {"id": 2, "errors": None, "use_chip": "SWIPE"},
+            {"id": 3, "errors": "E2", "use_chip": "CHIP"},
+            {"id": 4, "errors": "E3", "use_chip": "CHIP"},
         ]
     )
 
 
+def mock_fraud_labels():
+    return pd.DataFrame(
+        [
+            {"transaction_id": 1, "is_fraud": "Yes"},
+            {"transaction_id": 2, "is_fraud": "No"},
+            {"transaction_id": 3, "is_fraud": "Yes"},
+            {"transaction_id": 99, "is_fraud": "Yes"},
+        ]
+    )
+
+
+def mock_loaders(monkeypatch):
+    transactions, labels = mock_transactions(), mock_fraud_labels()
+    monkeypatch.setattr(fraud, "load_transactions", lambda: transactions)
+    monkeypatch.setattr(fraud, "load_train_fraud", lambda: labels)
+
+
 # -----------------------------
 # /api/fraud/summary
 # -----------------------------
 def test_fraud_summary(client, monkeypatch):
-    monkeypatch.setattr(fraud, "prepare_fraud_merge", mock_prepare_df)
+    mock_loaders(monkeypatch)
 
     response = client.get("/api/fraud/summary")
     data = response.json()
@@ -32,7 +50,7 @@ def test_fraud_summary(client, monkeypatch):
 # /api/fraud/by-type
 # -----------------------------
 def test_fraud_by_type(client, monkeypatch):
-    monkeypatch.setattr(fraud, "prepare_fraud_merge", mock_prepare_df)
+    mock_loaders(monkeypatch)
 
     response = client.get("/api/fraud/by-type")
     data = response.json()
@@ -45,6 +63,21 @@ def test_fraud_by_type(client, monkeypatch):
     assert chip["total_transactions"] == 2
 
 
+def test_fraud_labels_aligned_once(monkeypatch):
+    mock_loaders(monkeypatch)
+
+    df, labels = fraud.fraud_labels()
+
+    assert labels.tolist() == [1, 0, 1, -1]
+    assert fraud.fraud_labels()[1] is labels
+
+
+def test_flagged_mask_categorical():
+    errors = pd.Series(["Bad PIN", None, "", "Bad PIN"], dtype="category")
+
+    assert fraud.flagged_mask(errors).tolist() == [True, False, False, True]
+
+
 # -----------------------------
 # /api/fraud/predict
 # -----------------------------
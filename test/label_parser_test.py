@@ -0,0 +1,56 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app.data.load_data as ld
+from app.data.label_parser import parse_fraud_labels
+
+
+def write_labels(tmp_path, target, **dump_options):
+    path = tmp_path / "train_fraud_labels.json"
+    path.write_text(json.dumps({"target": target}, **dump_options))
+    return path
+
+
+@pytest.mark.parametrize("block_size", [7, 64, 1 << 20])
+def test_parse_across_block_boundaries(tmp_path, block_size):
+    target = {str(i): "Yes" if i % 3 == 0 else "No" for i in range(1, 200)}
+    path = write_labels(tmp_path, target, indent=2)
+
+    ids, labels = parse_fraud_labels(path, block_size=block_size)
+
+    assert ids.dtype == np.int32
+    assert labels.dtype == np.int8
+    assert ids.tolist() == list(range(1, 200))
+    assert labels.tolist() == [int(i % 3 == 0) for i in range(1, 200)]
+
+
+def test_parse_missing_target(tmp_path):
+    path = tmp_path / "train_fraud_labels.json"
+    path.write_text('{"other": {}}')
+
+    with pytest.raises(ValueError):
+        parse_fraud_labels(path)
+
+
+def test_load_train_fraud_reuses_binary_cache(tmp_path, monkeypatch):
+    write_labels(tmp_path, {"10": "No", "11": "Yes"})
+    monkeypatch.setattr(ld, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(ld, "CACHE_DIR", tmp_path / ".cache")
+    monkeypatch.setattr(ld, "_train_fraud_df", None)
+
+    ld.load_train_fraud()
+    assert (tmp_path / ".cache" / "fraud_labels" / "manifest.json").exists()
+
+    def fail_if_parsed(*args, **kwargs):
+        raise AssertionError("Le JSON ne devrait pas être relu")
+
+    monkeypatch.setattr(ld, "_train_fraud_df", None)
+    monkeypatch.setattr(ld, "parse_fraud_labels", fail_if_parsed)
+    df = ld.load_train_fraud()
+
+    assert df["transaction_id"].tolist() == [10, 11]
+    assert (df["is_fraud"] == "Yes").tolist() == [False, True]
+    assert isinstance(df["is_fraud"].dtype, pd.CategoricalDtype)
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.data.leaderboard import get_leaderboard, top_k
+from app.data.store import get_store
+
+
+def random_frame(rows=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    amounts = rng.integers(1, 50, rows).astype("float64")
+    amounts[::31] = np.nan
+    return pd.DataFrame(
+        {
+            "id": np.arange(rows),
+            "client_id": rng.integers(1, 300, rows),
+            "date": pd.Timestamp("2020-01-01")
+            + pd.to_timedelta(rng.integers(0, 90, rows), unit="D"),
+            "amount": amounts,
+        }
+    )
+
+
+def expected_ranking(df, metric):
+    grouped = df.groupby("client_id")["amount"]
+    values = {
+        "amount": grouped.sum(),
+        "count": grouped.size().astype("float64"),
+        "avg": grouped.mean(),
+    }[metric].dropna()
+    ranked = sorted(values.items(), key=lambda item: (-item[1], item[0]))
+    return [client for client, _ in ranked]
+
+
+def test_top_k_matches_full_sort_with_ties():
+    rng = np.random.default_rng(1)
+    values = rng.integers(0, 5, 200).astype("float64")
+    values[::7] = np.nan
+    keys = rng.permutation(200)
+
+    expected = sorted(
+        (i for i in range(200) if not np.isnan(values[i])),
+        key=lambda i: (-values[i], keys[i]),
+    )
+    for n in (1, 10, 50, 500):
+        assert top_k(values, keys, n).tolist() == expected[:n]
+
+
+@pytest.mark.parametrize("metric", ["amount", "count", "avg"])
+def test_leaderboard_matches_pandas(metric):
+    df = random_frame()
+    leaderboard = get_leaderboard(get_store(df))
+
+    top = leaderboard.top(metric, 25)
+
+    assert leaderboard.clients[top].tolist() == expected_ranking(
+        df, metric
+    )[:25]
+
+
+def test_leaderboard_cached_per_snapshot():
+    df = random_frame(rows=100)
+
+    board = get_leaderboard(get_store(df))
+    assert get_leaderboard(get_store(df)) is board
+    assert get_leaderboard(get_store(df.copy())) is not board
+
+
+def test_leaderboard_date_window():
+    df = random_frame()
+    store = get_store(df)
+    index = store.date_index
+    low = pd.Timestamp("2020-02-01").value
+    high = pd.Timestamp("2020-02-15").value
+    rows = index.rows(*index.bounds(low, high))
+
+    leaderboard = get_leaderboard(store, rows=rows)
+    top = leaderboard.top("amount", 10, ranked=False)
+
+    window = df[(df["date"] >= "2020-02-01") & (df["date"] <= "2020-02-15")]
+    assert leaderboard.clients[top].tolist() == expected_ranking(
+        window, "amount"
+    )[:10]
+
+
+def test_leaderboard_fraud_rate():
+    df = random_frame(rows=400)
+    labels = pd.DataFrame(
+        {
+            "transaction_id": df["id"][::2],
+            "is_fraud": np.where(df["amount"][::2] > 40, "Yes", "No"),
+        }
+    )
+    leaderboard = get_leaderboard(get_store(df), labels)
+
+    merged = df.merge(labels, left_on="id", right_on="transaction_id")
+    rates = (merged["is_fraud"] == "Yes").groupby(merged["client_id"]).mean()
+    expected = sorted(rates.items(), key=lambda item: (-item[1], item[0]))
+
+    top = leaderboard.top("fraud_rate", 15)
+    assert leaderboard.clients[top].tolist() == [
+        client for client, _ in expected[:15]
+    ]
@@ -0,0 +1,142 @@
+import pandas as pd
+import pytest
+
+import app.data.load_data as ld
+from app.data.parallel_ingest import (
+    RangeParseError,
+    parse_csv_parallel,
+    split_byte_ranges,
+)
+from app.data.schema import apply_schema
+
+HEADER = (
+    "id,date,client_id,card_id,amount,use_chip,merchant_id,"
+    "merchant_city,merchant_state,zip,mcc,errors\n"
+)
+
+
+def write_csv(tmp_path, rows=200):
+    lines = [HEADER]
+    for i in range(rows):
+        city, state, zip_code = (
+            ("ONLINE", "", "") if i % 3 == 0 else ("Beulah", "ND", "58523.0")
+        )
+        errors = '"Bad PIN,Insufficient Balance"' if i % 10 == 0 else ""
+        lines.append(
+            f"{i},2010-01-{1 + i % 28:02d} 00:01:00,{i % 17},{i % 5},"
+            f"${i - 100}.{i % 100:02d},Swipe Transaction,{500 + i},"
+            f"{city},{state},{zip_code},5499,{errors}\n"
+        )
+    path = tmp_path / "transactions_data.csv"
+    path.write_text("".join(lines))
+    return path
+
+
+def test_split_byte_ranges_aligned_on_lines(tmp_path):
+    path = write_csv(tmp_path)
+    content = path.read_bytes()
+
+    header, ranges = split_byte_ranges(path, 4)
+
+    assert header + "\n" == HEADER
+    assert ranges[0][0] == len(HEADER)
+    assert ranges[-1][1] == len(content)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start
+        assert content[end - 1:end] == b"\n"
+
+
+def test_parallel_matches_sequential(tmp_path):
+    path = write_csv(tmp_path)
+
+    parallel = parse_csv_parallel(path, workers=3)
+    sequential = apply_schema(pd.read_csv(path))
+
+    assert list(parallel.columns) == list(sequential.columns)
+    for name in sequential.columns:
+        assert parallel[name].dtype == sequential[name].dtype, name
+        assert parallel[name].astype(object).equals(
+            sequential[name].astype(object)
+        ), name
+
+
+def test_load_transactions_uses_parallel_mode(tmp_path, monkeypatch):
+    write_csv(tmp_path)
+    monkeypatch.setattr(ld, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(ld, "CACHE_DIR", tmp_path / ".cache")
+    monkeypatch.setattr(ld, "_transactions_df", None)
+    monkeypatch.setattr(ld, "INGEST_WORKERS", 2)
+    monkeypatch.setattr(ld, "PARALLEL_INGEST_MIN_BYTES", 0)
+
+    calls = []
+
+    def spy(path, workers, **kwargs):
+        calls.append(workers)
+        return parse_csv_parallel(path, workers, **kwargs)
+
+    monkeypatch.setattr(ld, "parse_csv_parallel", spy)
+
+    df = ld.load_transactions()
+
+    assert calls == [2]
+    assert len(df) == 200
+
+
+def test_parallel_custom_schema(tmp_path):
+    path = write_csv(tmp_path)
+    schema = {"id": "int64", "client_id": "int16", "mcc": "int32"}
+
+    parallel = parse_csv_parallel(path, workers=3, schema=schema)
+    sequential = apply_schema(pd.read_csv(path), schema)
+
+    for name in sequential.columns:
+        assert parallel[name].dtype == sequential[name].dtype, name
+        assert parallel[name].astype(object).equals(
+            sequential[name].astype(object)
+        ), name
+    assert parallel["id"].dtype == "int64"
+
+
+def test_blank_line_raises_range_error(tmp_path):
+    path = write_csv(tmp_path)
+    lines = path.read_text().splitlines(keepends=True)
+    path.write_text("".join(lines[:50] + ["\n"] + lines[50:]))
+
+    with pytest.raises(RangeParseError):
+        parse_csv_parallel(path, workers=2)
+
+
+def test_load_transactions_falls_back_to_sequential(tmp_path, monkeypatch):
+    path = write_csv(tmp_path)
+    lines = path.read_text().splitlines(keepends=True)
+    path.write_text("".join(lines[:50] + ["\n"] + lines[50:]))
+    monkeypatch.setattr(ld, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(ld, "CACHE_DIR", tmp_path / ".cache")
+    monkeypatch.setattr(ld, "_transactions_df", None)
+    monkeypatch.setattr(ld, "INGEST_WORKERS", 2)
+    monkeypatch.setattr(ld, "PARALLEL_INGEST_MIN_BYTES", 0)
+
+    df = ld.load_transactions()
+
+    assert len(df) == 200
+    assert df["id"].tolist() == list(range(200))
+
+
+def test_parallel_keeps_missing_int64_values(tmp_path):
+    path = write_csv(tmp_path)
+    lines = path.read_text().splitlines(keepends=True)
+    # merchant_id manquant sur une ligne
+    fields = lines[7].split(",")
+    fields[6] = ""
+    lines[7] = ",".join(fields)
+    path.write_text("".join(lines))
+    schema = {"merchant_id": "int64"}
+
+    parallel = parse_csv_parallel(path, workers=3, schema=schema)
+    sequential = apply_schema(pd.read_csv(path), schema)
+
+    assert parallel["merchant_id"].dtype == sequential["merchant_id"].dtype
+    assert pd.isna(parallel["merchant_id"].iloc[6])
+    assert parallel["merchant_id"].astype(object).equals(
+        sequential["merchant_id"].astype(object)
+    )
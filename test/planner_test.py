@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+from app.data.planner import RangePredicate, plan_query
+from app.data.store import get_store
+
+FRAME = pd.DataFrame(
+    {
+        "id": np.arange(1, 9),
+        "client_id": [1, 2, 1, 2, 1, 2, 3, 3],
+        "amount": [10.0, 20.0, np.nan, 40.0, 50.0, 60.0, 70.0, 80.0],
+        "date": pd.date_range("2020-01-01", periods=8, freq="D"),
+    }
+)
+
+
+def date(value):
+    return pd.Timestamp(value).value
+
+
+def test_plan_picks_most_selective_index():
+    store = get_store(FRAME)
+    plan = plan_query(
+        store,
+        [
+            RangePredicate("amount", 15.0, None),
+            RangePredicate("client_id", 3, 3),
+        ],
+    )
+
+    assert plan.access_path == "client_id"
+    assert plan.execute().tolist() == [6, 7]
+
+
+def test_plan_results_in_table_order_whatever_the_path():
+    store = get_store(FRAME)
+    predicates = [
+        RangePredicate("amount", 15.0, 65.0),
+        RangePredicate("date", date("2020-01-02"), None),
+    ]
+
+    plan = plan_query(store, predicates)
+
+    assert plan.access_path == "amount"
+    assert plan.execute().tolist() == [1, 3, 4, 5]
+
+
+def test_plan_excludes_missing_values():
+    store = get_store(FRAME)
+    plan = plan_query(store, [RangePredicate("amount", None, 1000.0)])
+
+    assert plan.estimates["amount <= 1000.0"] == 7
+    assert 2 not in plan.execute().tolist()
+
+
+def test_plan_full_scan_without_index():
+    plan = plan_query(get_store(FRAME), [RangePredicate("id", 3, 4)])
+
+    assert plan.access_path == "full_scan"
+    assert plan.execute().tolist() == [2, 3]
+
+
+def test_plan_without_predicates():
+    assert plan_query(get_store(FRAME), []).execute() is None
+
+
+def test_plan_skips_unbuilt_index_when_one_is_built():
+    frame = FRAME.copy()
+    store = get_store(frame).prepare()
+    plan = plan_query(
+        store,
+        [
+            RangePredicate("amount", 15.0, None),
+            RangePredicate("client_id", 3, 3),
+        ],
+    )
+
+    assert plan.access_path == "client_id"
+    assert "amount >= 15.0" not in plan.estimates
+    assert not store.is_built("sorted:amount")
+    assert plan.execute().tolist() == [6, 7]
+
+
+def test_execute_after_resumes_each_access_path():
+    frame = FRAME.copy()
+    store = get_store(frame).prepare()
+    for predicates in (
+        [RangePredicate("client_id", 1, 1)],
+        [RangePredicate("date", date("2020-01-02"), None)],
+        [RangePredicate("amount", 15.0, None)],
+        [RangePredicate("amount", 15.0, None), RangePredicate("id", 4, 8)],
+        [RangePredicate("id", 2, 7)],
+    ):
+        plan = plan_query(store, predicates)
+        rows = plan.execute()
+        for row in (-1, 0, 3, 7):
+            expected = rows[rows > row][:2].tolist()
+            assert plan.execute_after(row, 2).tolist() == expected
+            # Total connu : parcours de la table s'il est plus court
+            resumed = plan.execute_after(row, 2, total=len(rows))
+            assert resumed.tolist() == expected
@@ -0,0 +1,128 @@
+import threading
+import time
+
+import pandas as pd
+
+import app.data.load_data as ld
+from app.data.registry import LoaderRegistry
+from app.route import administration_routes as admin
+
+
+def run_concurrently(target, count=8):
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(target())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    return results, errors
+
+
+# ---------------------------------------
+# LoaderRegistry
+# ---------------------------------------
+def test_concurrent_callers_share_one_load():
+    registry = LoaderRegistry()
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        time.sleep(0.2)
+        return "data"
+
+    results, errors = run_concurrently(
+        lambda: registry.load("transactions", slow_loader)
+    )
+
+    stats = registry.stats()["transactions"]
+    assert errors == []
+    assert results == ["data"] * 8
+    assert len(calls) == 1
+    assert stats["loads"] == 1
+    assert stats["shared_waits"] == 7
+    assert stats["in_flight"] is False
+
+
+def test_error_propagated_to_waiters():
+    registry = LoaderRegistry()
+
+    def broken():
+        time.sleep(0.2)
+        raise FileNotFoundError("absent")
+
+    results, errors = run_concurrently(
+        lambda: registry.load("cards", broken), count=4
+    )
+
+    assert results == []
+    assert len(errors) == 4
+    assert all(isinstance(e, FileNotFoundError) for e in errors)
+    assert registry.stats()["cards"]["failures"] == 1
+
+
+def test_cached_value_skips_loader():
+    registry = LoaderRegistry()
+
+    def fail():
+        raise AssertionError("Le chargeur ne devrait pas être appelé")
+
+    assert registry.load("users", fail, cached=lambda: "cached") == "cached"
+    assert registry.stats() == {}
+
+
+def test_progress():
+    registry = LoaderRegistry()
+    seen = []
+
+    def loader():
+        registry.report_progress("transactions", 0.25)
+        seen.append(registry.progress("transactions"))
+        return "data"
+
+    assert registry.progress("transactions") == 0.0
+    registry.load("transactions", loader)
+    assert seen == [0.25]
+    assert registry.progress("transactions") == 1.0
+
+
+# ---------------------------------------
+# Intégration avec load_transactions
+# ---------------------------------------
+def test_load_transactions_parsed_once(tmp_path, monkeypatch):
+    calls = []
+
+    def slow_parse(*args, **kwargs):
+        calls.append(1)
+        time.sleep(0.2)
+        return pd.DataFrame({"id": [1, 2]})
+
+    monkeypatch.setattr(ld, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(ld, "_transactions_df", None)
+    monkeypatch.setattr(ld, "_parse_transactions_csv", slow_parse)
+    monkeypatch.setattr(ld, "loader_registry", LoaderRegistry())
+
+    results, errors = run_concurrently(ld.load_transactions)
+
+    assert errors == []
+    assert len(calls) == 1
+    assert all(df is results[0] for df in results)
+    assert ld.loader_registry.stats()["transactions"]["loads"] == 1
+
+
+def test_loader_stats_endpoint(client, monkeypatch):
+    registry = LoaderRegistry()
+    registry.load("cards", lambda: "data")
+    monkeypatch.setattr(admin, "loader_registry", registry)
+
+    response = client.get("/api/system/loaders")
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data["datasets"]["cards"]["loads"] == 1
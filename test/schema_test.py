@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from app.data.schema import (
+    apply_schema,
+    column_memory_report,
+    concat_typed,
+    parse_amount_cents,
+)
+
+
+def raw_transactions(n=1_000):
+    """DataFrame tel que pandas l'infère sans schéma explicite."""
+    rng = np.random.default_rng(0)
+    cities = np.array(["Beulah", "Bettendorf", "ONLINE", "Vista"])
+    zips = rng.integers(10_000, 99_999, n).astype(float)
+    zips[::7] = np.nan
+    df = pd.DataFrame(
+        {
+            "id": np.arange(n, dtype="int64"),
+            "date": ["2010-01-01 00:01:00"] * n,
+            "client_id": rng.integers(0, 2_000, n),
+            "card_id": rng.integers(0, 6_000, n),
+            "amount": [f"${x:.2f}" for x in rng.normal(40, 80, n)],
+            "use_chip": ["Swipe Transaction"] * n,
+            "merchant_id": rng.integers(0, 100_000, n),
+            "merchant_city": cities[rng.integers(0, 4, n)],
+            "merchant_state": cities[rng.integers(0, 4, n)],
+            "zip": zips,
+            "mcc": rng.integers(1_000, 9_999, n).astype(float),
+            "errors": [None] * n,
+        }
+    )
+    # Ancien chargement : NaN remplacés par None dans les colonnes optionnelles
+    df["zip"] = df["zip"].astype(object).where(df["zip"].notna(), None)
+    return df
+
+
+def test_parse_amount_cents():
+    cents = parse_amount_cents(pd.Series(["$-77.00", "$14.57", "$1,200.10"]))
+
+    assert cents.dtype == np.int64
+    assert cents.tolist() == [-7700, 1457, 120010]
+
+
+def test_apply_schema_dtypes():
+    df = apply_schema(raw_transactions(10))
+
+    assert df["id"].dtype == "int32"
+    assert df["client_id"].dtype == "int32"
+    assert df["mcc"].dtype == "int16"
+    assert df["zip"].dtype == "Int32"
+    assert pd.isna(df["zip"].iloc[0])
+    assert isinstance(df["merchant_city"].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_dtype(df["date"])
+
+
+def test_concat_typed_keeps_categories():
+    first = apply_schema(pd.DataFrame({"use_chip": ["Chip Transaction"]}))
+    second = apply_schema(pd.DataFrame({"use_chip": [None]}))
+
+    df = concat_typed([first, second])
+
+    assert isinstance(df["use_chip"].dtype, pd.CategoricalDtype)
+    assert df["use_chip"].iloc[0] == "Chip Transaction"
+    assert pd.isna(df["use_chip"].iloc[1])
+
+
+def test_schema_cuts_memory_by_three():
+    raw = raw_transactions()
+    before = sum(column_memory_report(raw).values())
+    after = sum(column_memory_report(apply_schema(raw)).values())
+
+    assert before >= 3 * after
@@ -0,0 +1,126 @@
+import numpy as np
+import orjson
+import pandas as pd
+import pytest
+from fastapi.exceptions import ResponseValidationError
+
+from app.models.transactions import Transaction
+from app.route import serialization
+from app.route import transaction_routes as transactions
+from app.route.serialization import (
+    JSONBytesResponse,
+    column_values,
+    frame_records,
+    trusted_response,
+)
+
+
+def test_column_values_missing_values():
+    assert column_values(pd.Series([1.5, np.nan])) == [1.5, None]
+    assert column_values(pd.Series([3, None], dtype="Int32")) == [3, None]
+    assert column_values(pd.Series(["a", None, np.nan])) == ["a", None, None]
+    assert column_values(pd.Series(["x", None, "y"], dtype="category")) == [
+        "x",
+        None,
+        "y",
+    ]
+
+
+def test_column_values_dates_iso():
+    dates = pd.Series(
+        pd.to_datetime(["2020-01-02 03:04:05", None, "2020-01-03 00:00:00"])
+    )
+    assert column_values(dates) == [
+        "2020-01-02T03:04:05",
+        None,
+        "2020-01-03T00:00:00",
+    ]
+
+    precise = pd.Series(pd.to_datetime(["2020-01-02 03:04:05.25"]))
+    assert column_values(precise) == ["2020-01-02T03:04:05.250000"]
+
+
+def test_frame_records_match_pydantic_output():
+    df = pd.DataFrame(
+        {
+            "id": np.array([1, 2], dtype="int32"),
+            "date": pd.to_datetime(["2020-01-02 03:04:05", None]),
+            "client_id": [10, 11],
+            "card_id": [100, 101],
+            "amount": [12.5, -3.0],
+            "use_chip": pd.Categorical(["Chip", None]),
+            "merchant_id": pd.array([5, None], dtype="Int32"),
+            "merchant_city": ["Paris", None],
+            "merchant_state": pd.Categorical([None, "TX"]),
+            "zip": [75001.0, np.nan],
+            "mcc": pd.array([5411, 5812], dtype="Int16"),
+            "errors": pd.Categorical([None, "Bad PIN"]),
+        }
+    )
+
+    records = frame_records(df)
+
+    expected = [
+        Transaction(**row).model_dump(mode="json")
+        for row in df.astype(object).where(pd.notna(df), None).to_dict(
+            "records"
+        )
+    ]
+    assert orjson.loads(orjson.dumps(records)) == expected
+    assert frame_records(df, ["id", "amount"]) == [
+        {"id": 1, "amount": 12.5},
+        {"id": 2, "amount": -3.0},
+    ]
+
+
+def test_json_bytes_response_renders_numpy():
+    response = JSONBytesResponse({"values": np.arange(3), "rate": np.nan})
+
+    assert response.body == b'{"values":[0,1,2],"rate":null}'
+    assert response.media_type == "application/json"
+    assert JSONBytesResponse(b"[1]").body == b"[1]"
+
+
+def test_trusted_response_skips_validation(monkeypatch):
+    monkeypatch.setattr(serialization, "VALIDATE_RESPONSES", False)
+
+    response = trusted_response(Transaction, {"id": "pas un entier"})
+
+    assert orjson.loads(response.body) == {"id": "pas un entier"}
+
+
+def test_trusted_response_validates_in_debug(monkeypatch):
+    monkeypatch.setattr(serialization, "VALIDATE_RESPONSES", True)
+
+    with pytest.raises(ResponseValidationError):
+        trusted_response(Transaction, {"id": "pas un entier"})
+
+
+def test_trusted_page_matches_validated_page(client, monkeypatch):
+    df = pd.DataFrame(
+        {
+            "id": np.arange(5, dtype="int32"),
+            "date": pd.date_range("2020-01-01", periods=5, freq="h"),
+            "client_id": np.array([1, 2, 1, 3, 1], dtype="int32"),
+            "card_id": np.arange(5, dtype="int32"),
+            "amount": [1.0, -2.5, 3.25, np.nan, 5.0],
+            "use_chip": pd.Categorical(["Chip", None, "Swipe", "Chip", None]),
+            "merchant_id": pd.array([1, None, 3, 4, 5], dtype="Int32"),
+            "merchant_city": ["A", "B", None, "D", "E"],
+            "merchant_state": pd.Categorical(["CA", None, "TX", "TX", "NY"]),
+            "zip": pd.array([1, 2, None, 4, 5], dtype="Int32"),
+            "mcc": pd.array([5411] * 5, dtype="Int16"),
+            "errors": pd.Categorical([None, "Bad PIN", None, None, None]),
+            "extra": range(5),
+        }
+    )
+    monkeypatch.setattr(transactions, "load_transactions", lambda: df)
+
+    pages = []
+    for validate in (True, False):
+        monkeypatch.setattr(serialization, "VALIDATE_RESPONSES", validate)
+        response = client.get("/api/transactions?client_id=1")
+        assert response.status_code == 200
+        pages.append(response.content)
+
+    assert pages[0] == pages[1]
@@ -0,0 +1,198 @@
+import gc
+import threading
+import time
+from collections import deque
+
+import pandas as pd
+
+import app.data.load_data as ld
+import app.route.administration_routes as admin
+from app.data.registry import LoaderRegistry
+from app.data.store import find_store, get_store
+from app.route.statistiques_routes import normalize_amount
+
+CSV_HEADER = (
+    "id,date,client_id,card_id,amount,use_chip,merchant_id,"
+    "merchant_city,merchant_state,zip,mcc,errors\n"
+)
+CSV_ROW = (
+    "{id},2010-01-01 00:0{id}:00,10,100,$1{id}.00,Swipe Transaction,500,"
+    "Beulah,ND,58523.0,5499,\n"
+)
+
+
+def write_dataset(path, rows):
+    (path / "transactions_data.csv").write_text(
+        CSV_HEADER + "".join(CSV_ROW.format(id=i) for i in rows)
+    )
+    (path / "train_fraud_labels.json").write_text(
+        '{"target": {"1": "Yes"}}'
+    )
+
+
+def use_dataset_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(ld, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(ld, "CACHE_DIR", tmp_path / ".cache")
+    monkeypatch.setattr(ld, "_transactions_df", None)
+    monkeypatch.setattr(ld, "_train_fraud_df", None)
+    monkeypatch.setattr(ld, "loader_registry", LoaderRegistry())
+    monkeypatch.setattr(ld, "_retained_snapshots", deque(maxlen=1))
+
+
+def test_reload_publishes_new_version(tmp_path, monkeypatch):
+    write_dataset(tmp_path, [1, 2])
+    use_dataset_dir(monkeypatch, tmp_path)
+
+    old = ld.load_transactions()
+    old_version = get_store(old).version
+
+    write_dataset(tmp_path, [1, 2, 3])
+    new = ld.reload_transactions()
+
+    assert ld.load_transactions() is new
+    assert get_store(new).version > old_version
+    # L'ancien snapshot, encore référencé, reste intact
+    assert old["id"].tolist() == [1, 2]
+    assert get_store(old).id_index.lookup(3) == -1
+    assert get_store(new).id_index.lookup(3) == 2
+
+
+def test_replaced_snapshot_retained_for_cursors(tmp_path, monkeypatch):
+    write_dataset(tmp_path, [1, 2])
+    use_dataset_dir(monkeypatch, tmp_path)
+    first = get_store(ld.load_transactions()).version
+
+    write_dataset(tmp_path, [1, 2, 3])
+    second = get_store(ld.reload_transactions()).version
+    gc.collect()
+    snapshots = ld.transaction_snapshots()
+    assert find_store(first, snapshots).frame["id"].tolist() == [1, 2]
+    del snapshots
+
+    # Un seul snapshot remplacé gardé : le premier est libéré
+    ld.reload_transactions()
+    gc.collect()
+    assert find_store(first, ld.transaction_snapshots()) is None
+    assert find_store(second, ld.transaction_snapshots()) is not None
+
+
+def test_dataset_version_follows_publications(tmp_path, monkeypatch):
+    write_dataset(tmp_path, [1, 2])
+    use_dataset_dir(monkeypatch, tmp_path)
+    assert ld.dataset_version() is None
+
+    ld.load_transactions()
+    version = ld.dataset_version()
+    ld.load_transactions()
+    assert ld.dataset_version() == version
+
+    ld.reload_train_fraud()
+    assert ld.dataset_version() > version
+
+
+def test_old_snapshot_served_during_reload(tmp_path, monkeypatch):
+    write_dataset(tmp_path, [1, 2])
+    use_dataset_dir(monkeypatch, tmp_path)
+    old = ld.load_transactions()
+
+    release = threading.Event()
+    parse = ld._parse_transactions_csv
+
+    def slow_parse(*args, **kwargs):
+        release.wait(timeout=5)
+        return parse(*args, **kwargs)
+
+    monkeypatch.setattr(ld, "_parse_transactions_csv", slow_parse)
+    write_dataset(tmp_path, [1, 2, 3])
+    reload = threading.Thread(target=ld.reload_transactions)
+    reload.start()
+
+    assert ld.load_transactions() is old
+    release.set()
+    reload.join(timeout=5)
+    assert len(ld.load_transactions()) == 3
+
+
+def test_reload_endpoint(client, tmp_path, monkeypatch):
+    write_dataset(tmp_path, [1, 2])
+    use_dataset_dir(monkeypatch, tmp_path)
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "secret")
+    ld.load_transactions()
+    version = client.get("/api/system/snapshot").json()["version"]
+
+    response = client.post(
+        "/api/system/reload", headers={"X-Admin-Token": "secret"}
+    )
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data["previous_version"] == version
+    assert data["snapshot"]["version"] > version
+    assert data["snapshot"]["rows"] == 2
+
+
+def test_reload_endpoint_requires_admin_token(client, monkeypatch):
+    def fail_reload():
+        raise AssertionError("Le rechargement ne devrait pas être lancé")
+
+    monkeypatch.setattr(ld, "reload_transactions", fail_reload)
+
+    # Désactivé tant qu'aucun jeton n'est configuré
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "")
+    assert client.post("/api/system/reload").status_code == 403
+
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "secret")
+    assert client.post("/api/system/reload").status_code == 403
+    response = client.post(
+        "/api/system/reload", headers={"X-Admin-Token": "wrong"}
+    )
+    assert response.status_code == 403
+
+
+def test_reload_endpoint_refuses_concurrent_reload(client, monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "secret")
+    headers = {"X-Admin-Token": "secret"}
+
+    with admin._reload_lock:
+        response = client.post("/api/system/reload", headers=headers)
+
+    assert response.status_code == 409
+
+
+def test_normalize_amount_does_not_mutate_snapshot():
+    df = pd.DataFrame({"amount": ["$1.50", "$2.00"]})
+
+    normalized = normalize_amount(df)
+
+    assert normalized["amount"].tolist() == [1.5, 2.0]
+    assert df["amount"].tolist() == ["$1.50", "$2.00"]
+
+
+def test_normalize_amount_built_once_per_snapshot():
+    df = pd.DataFrame({"amount": ["$1.50", "$2.00"]})
+    typed = pd.DataFrame({"amount": [1.5, 2.0]})
+
+    # Même DataFrame normalisé, donc même store, d'une requête à l'autre
+    assert normalize_amount(df) is normalize_amount(df)
+    assert get_store(normalize_amount(df)) is get_store(normalize_amount(df))
+    assert normalize_amount(typed) is typed
+
+
+def test_parallel_loads_join_fraud_labels(tmp_path, monkeypatch):
+    write_dataset(tmp_path, [1, 2])
+    use_dataset_dir(monkeypatch, tmp_path)
+    threads = [
+        threading.Thread(target=ld.load_transactions),
+        threading.Thread(target=ld.load_train_fraud),
+    ]
+    # Les deux chargements finissent ensemble et publient l'un après
+    # l'autre : le second construit la jointure
+    with ld._publish_lock:
+        for thread in threads:
+            thread.start()
+        time.sleep(0.3)
+    for thread in threads:
+        thread.join()
+
+    store = get_store(ld._transactions_df)
+    assert "fraud" in store._joined
@@ -134,3 +134,106 @@ def test_get_daily_stats(mock_load_tx):
     )
     response_dates = set([d["date"] for d in data])
     assert mock_dates == response_dates
+
+
+# ---------------- Tests pour /api/stats/rollup ----------------
+
+
+@patch("app.route.statistiques_routes.load_transactions")
+@patch("app.route.statistiques_routes.load_train_fraud")
+def test_get_rollup(mock_load_fraud, mock_load_tx):
+    mock_load_tx.return_value = MOCK_TRANSACTIONS
+    mock_load_fraud.return_value = MOCK_FRAUD
+
+    response = client.get(
+        "/api/stats/rollup",
+        params={"group_by": "mcc,is_fraud", "filter": "use_chip:chip"},
+    )
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["group_by"] == ["mcc", "is_fraud"]
+    assert data["filters"] == {"use_chip": ["chip"]}
+    assert data["rows"] == [
+        {
+            "mcc": 5411,
+            "is_fraud": "Yes",
+            "count": 2,
+            "total_amount": 1100.0,
+            "avg_amount": 550.0,
+            "std_amount": 450.0,
+            "min_amount": 100.0,
+            "max_amount": 1000.0,
+        }
+    ]
+
+
+@patch("app.route.statistiques_routes.load_transactions")
+@patch("app.route.statistiques_routes.load_train_fraud")
+def test_get_rollup_date_range(mock_load_fraud, mock_load_tx):
+    mock_load_tx.return_value = MOCK_TRANSACTIONS
+    mock_load_fraud.return_value = MOCK_FRAUD
+
+    response = client.get(
+        "/api/stats/rollup",
+        params={"group_by": "day", "start_date": "2026-01-24"},
+    )
+    assert response.status_code == 200
+    assert [(r["day"], r["count"]) for r in response.json()["rows"]] == [
+        ("2026-01-24", 2)
+    ]
+
+
+@patch("app.route.statistiques_routes.load_transactions")
+@patch("app.route.statistiques_routes.load_train_fraud")
+def test_get_rollup_invalid(mock_load_fraud, mock_load_tx):
+    mock_load_tx.return_value = MOCK_TRANSACTIONS
+    mock_load_fraud.return_value = MOCK_FRAUD
+
+    assert client.get(
+        "/api/stats/rollup", params={"group_by": "zip"}
+    ).status_code == 400
+    assert client.get(
+        "/api/stats/rollup", params={"filter": "use_chip"}
+    ).status_code == 400
+    assert client.get(
+        "/api/stats/rollup", params={"start_date": "hier"}
+    ).status_code == 400
+
+
+# ---------------- Formats colonnaires ----------------
+
+
+@patch("app.route.statistiques_routes.load_transactions")
+@patch("app.route.statistiques_routes.load_train_fraud")
+def test_stats_columnar(mock_load_fraud, mock_load_tx):
+    mock_load_tx.return_value = MOCK_TRANSACTIONS
+    mock_load_fraud.return_value = MOCK_FRAUD
+
+    rows = client.get("/api/stats/by-type").json()
+    columns = client.get("/api/stats/by-type?format=columnar").json()
+    assert list(columns) == ["type", "count", "avg_amount"]
+    assert columns["type"] == [row["type"] for row in rows]
+
+    rows = client.get("/api/stats/rollup", params={"group_by": "mcc"}).json()
+    data = client.get(
+        "/api/stats/rollup",
+        params={"group_by": "mcc", "format": "columnar"},
+    ).json()
+    assert data["group_by"] == ["mcc"]
+    assert data["rows"]["mcc"] == [row["mcc"] for row in rows["rows"]]
+    assert data["rows"]["count"] == [row["count"] for row in rows["rows"]]
+
+
+@patch("app.route.statistiques_routes.load_transactions")
+def test_stats_arrow_requires_pyarrow(mock_load_tx, monkeypatch):
+    from app.route import columnar
+
+    mock_load_tx.return_value = MOCK_TRANSACTIONS
+    monkeypatch.setattr(columnar, "pa", None)
+
+    response = client.get(
+        "/api/stats/daily",
+        headers={"Accept": "application/vnd.apache.arrow.stream"},
+    )
+    assert response.status_code == 406
@@ -0,0 +1,128 @@
+import gc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.data import store as store_module
+from app.data.store import (
+    ClientIndex,
+    IdIndex,
+    SortedIndex,
+    date_values,
+    get_store,
+)
+
+
+# ---------------------------------------
+# IdIndex
+# ---------------------------------------
+@pytest.mark.parametrize(
+    "keys, kind",
+    [
+        (np.array([10, 11, 12, 15], dtype="int32"), "sorted"),
+        (np.array([12, 10, 11, 13], dtype="int32"), "dense"),
+        (np.array([900, 5, 70_000, 42], dtype="int32"), "permuted"),
+    ],
+)
+def test_id_index_lookup(keys, kind):
+    index = IdIndex(keys)
+
+    assert index.kind == kind
+    for position, key in enumerate(keys):
+        assert index.lookup(int(key)) == position
+    assert index.lookup(14) == -1
+    assert index.lookup(-1) == -1
+    assert index.lookup(2**40) == -1
+
+
+def test_id_index_lookup_many_keeps_order():
+    index = IdIndex(np.array([7, 3, 5], dtype="int32"))
+
+    assert index.lookup_many([5, 8, 7]).tolist() == [2, -1, 0]
+
+
+def test_id_index_empty():
+    assert IdIndex(np.array([], dtype="int32")).lookup(1) == -1
+
+
+# ---------------------------------------
+# ClientIndex
+# ---------------------------------------
+def test_client_index_slices_are_chronological():
+    dates = date_values(
+        pd.Series(["2020-03-01", "2020-01-01", "2020-02-01", "2020-01-15"])
+    )
+    index = ClientIndex(np.array([7, 7, 3, 7]), dates)
+
+    assert index.rows(7).tolist() == [1, 3, 0]
+    assert index.rows(3).tolist() == [2]
+    assert index.rows(5).tolist() == []
+    assert index.rows(99).tolist() == []
+
+
+def test_date_values_invalid_dates_first():
+    values = date_values(pd.Series(["2020-01-01", "pas une date"]))
+
+    assert values[1] == np.iinfo("int64").min
+    assert values[0] > values[1]
+
+
+# ---------------------------------------
+# SortedIndex
+# ---------------------------------------
+def test_sorted_index_range_on_sorted_column():
+    values = np.array([1, 3, 3, 5, 9])
+    index = SortedIndex(values)
+
+    assert index.order is None
+    assert index.rows(*index.bounds(3, 5)).tolist() == [1, 2, 3]
+    assert index.bounds(10, None) == (5, 5)
+
+
+def test_sorted_index_excludes_invalid_rows():
+    values = np.array([5.0, np.nan, 1.0, 3.0])
+    index = SortedIndex(values, valid=~np.isnan(values))
+
+    assert index.rows(*index.bounds(None, None)).tolist() == [2, 3, 0]
+    assert index.rows(*index.bounds(2.0, None)).tolist() == [3, 0]
+    assert index.rows(index.size - 1, index.size).tolist() == [0]
+
+
+# ---------------------------------------
+# get_store
+# ---------------------------------------
+def test_store_reused_per_frame_and_released():
+    df = pd.DataFrame({"id": [1, 2, 3]})
+
+    store = get_store(df)
+    assert get_store(df) is store
+    assert store.id_index is store.id_index
+
+    key = id(df)
+    del df, store
+    gc.collect()
+    assert key not in store_module._stores
+
+
+def test_query_rows_memoized_and_bounded(monkeypatch):
+    monkeypatch.setattr(store_module, "QUERY_CACHE_ROWS", 3)
+    store = get_store(pd.DataFrame({"id": [1, 2, 3]}))
+    calls = []
+
+    def builder(rows):
+        def build():
+            calls.append(rows)
+            return np.arange(rows)
+        return build
+
+    store.query_rows("a", builder(2))
+    store.query_rows("a", builder(2))
+    assert calls == [2]
+
+    # "b" évince "a" (2 + 2 > 3 positions) ; "big" n'est pas mémorisé
+    store.query_rows("b", builder(2))
+    store.query_rows("a", builder(2))
+    store.query_rows("big", builder(4))
+    store.query_rows("big", builder(4))
+    assert calls == [2, 2, 2, 4, 4]
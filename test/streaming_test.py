@@ -0,0 +1,117 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from app.route import streaming
+from app.route import transaction_routes as transactions
+from app.route.streaming import CSV, JSON, NDJSON, batched, negotiate
+
+
+def test_negotiate_by_quality_and_order():
+    offered = (JSON, NDJSON, CSV)
+
+    assert negotiate(None, offered) == JSON
+    assert negotiate("*/*", offered) == JSON
+    assert negotiate("text/csv", offered) == CSV
+    assert negotiate("application/ndjson", offered) == NDJSON
+    assert negotiate("text/csv;q=0.5, application/x-ndjson", offered) == (
+        NDJSON
+    )
+    assert negotiate("text/html, text/csv;q=0.1", offered) == CSV
+    assert negotiate("text/csv;q=0", offered) == JSON
+
+
+def test_batched_fixed_size():
+    blocks = [np.arange(0, 3), np.arange(3, 3), np.arange(3, 10)]
+
+    batches = list(batched(iter(blocks), size=4))
+
+    assert [b.tolist() for b in batches] == [
+        [0, 1, 2, 3],
+        [4, 5, 6, 7],
+        [8, 9],
+    ]
+
+
+def test_search_rows_scans_by_block():
+    df = pd.DataFrame({"amount": np.arange(10, dtype="float64")})
+
+    blocks = list(
+        transactions.search_rows(df, {"amount_range": [2, 7]}, block_rows=4)
+    )
+
+    assert [b.tolist() for b in blocks] == [[2, 3], [4, 5, 6, 7], []]
+
+
+def big_frame(rows=25):
+    return pd.DataFrame(
+        {
+            "id": np.arange(rows),
+            "date": pd.date_range("2020-01-01", periods=rows, freq="D"),
+            "client_id": np.arange(rows) % 3,
+            "card_id": np.arange(rows),
+            "amount": np.arange(rows, dtype="float64") * 10,
+            "use_chip": pd.Categorical(
+                np.where(np.arange(rows) % 2, "Swipe", "Chip")
+            ),
+            "merchant_id": np.arange(rows),
+            "merchant_city": ["Paris"] * rows,
+            "merchant_state": [None] * rows,
+            "zip": np.arange(rows),
+            "mcc": [5411] * rows,
+            "errors": [None] * rows,
+        }
+    )
+
+
+def test_search_streams_ndjson_in_batches(client, monkeypatch):
+    df = big_frame()
+    monkeypatch.setattr(transactions, "load_transactions", lambda: df)
+    monkeypatch.setattr(transactions, "SEARCH_BLOCK_ROWS", 7)
+    monkeypatch.setattr(streaming, "STREAM_BATCH_ROWS", 4)
+    query = {"type": "Chip", "amount_range": [0, 200]}
+
+    expected = client.post("/api/transactions/search", json=query).json()
+    with client.stream(
+        "POST",
+        "/api/transactions/search",
+        json=query,
+        headers={"Accept": "application/x-ndjson"},
+    ) as response:
+        assert response.headers["content-type"] == NDJSON
+        chunks = list(response.iter_bytes())
+
+    assert expected["total"] == 11
+    lines = b"".join(chunks).splitlines()
+    assert [json.loads(line) for line in lines] == expected["data"]
+
+
+def test_ndjson_stream_one_chunk_per_batch(monkeypatch):
+    df = big_frame()
+    monkeypatch.setattr(streaming, "STREAM_BATCH_ROWS", 4)
+    rows = transactions.search_rows(df, {"type": "Chip"}, block_rows=7)
+
+    chunks = list(
+        streaming.ndjson_stream(df, batched(rows), ["id", "amount"])
+    )
+
+    # 13 lignes retenues : lots de 4, 4, 4 et 1, produits à la demande
+    assert [chunk.count(b"\n") for chunk in chunks] == [4, 4, 4, 1]
+    assert json.loads(chunks[0].splitlines()[1]) == {"id": 2, "amount": 20.0}
+
+
+def test_search_streams_csv(client, monkeypatch):
+    df = big_frame(rows=6)
+    monkeypatch.setattr(transactions, "load_transactions", lambda: df)
+
+    response = client.post(
+        "/api/transactions/search",
+        json={"type": "Swipe"},
+        headers={"Accept": "text/csv"},
+    )
+
+    assert response.headers["content-type"].startswith(CSV)
+    lines = response.text.splitlines()
+    assert lines[0] == ",".join(transactions.TRANSACTION_FIELDS)
+    assert [line.split(",")[0] for line in lines[1:]] == ["1", "3", "5"]
@@ -1,6 +1,6 @@
 # test/test_load_data.py
 import pandas as pd
-from unittest.mock import patch, mock_open
+from unittest.mock import patch
 
 import app.data.load_data as ld
 
@@ -15,7 +15,7 @@ def test_load_transactions(mock_read_csv):
         "amount": ["$100.0", "$200.0"],
         "date": ["2026-01-01", "2026-02-01"],
         "use_chip": [1, None],
-        "merchant_id": ["m1", "m2"]
+        "merchant_id": [101, 102]
     }
     df_mock = pd.DataFrame(data)
 
@@ -31,6 +31,7 @@ def test_load_transactions(mock_read_csv):
     assert pd.api.types.is_datetime64_any_dtype(df["date"])
     # Vérifier les NaN avec pd.isna()
     assert pd.isna(df["use_chip"].iloc[1])
+    assert df["merchant_id"].dtype == "int32"
     assert df.shape[0] == 2
 
 
@@ -63,9 +64,14 @@ def test_load_mcc_codes(mock_read_json):
 # ---------------------------------------
 # Test load_train_fraud
 # ---------------------------------------
-@patch("builtins.open", new_callable=mock_open,
-       read_data='{"target": {"1": "Yes"}}')
-def test_load_train_fraud(mock_file):
+def test_load_train_fraud(tmp_path, monkeypatch):
+    (tmp_path / "train_fraud_labels.json").write_text(
+        '{"target": {"1": "Yes"}}'
+    )
+    monkeypatch.setattr(ld, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(ld, "CACHE_DIR", tmp_path / ".cache")
+    monkeypatch.setattr(ld, "_train_fraud_df", None)
+
     df = ld.load_train_fraud()
     assert isinstance(df, pd.DataFrame)
     assert "transaction_id" in df.columns
@@ -108,3 +114,38 @@ def test_is_dataset_loaded(monkeypatch):
     monkeypatch.setattr(ld, "_user_data_df", pd.DataFrame())
 
     assert ld.is_dataset_loaded() is True
+
+
+# ---------------------------------------
+# Mémoïsation des petits datasets
+# ---------------------------------------
+def test_load_user_data_memoized_until_file_changes(tmp_path, monkeypatch):
+    path = tmp_path / "users_data.csv"
+    path.write_text("id,age\n1,30\n")
+    monkeypatch.setattr(ld, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(ld, "_user_data_df", None)
+    generation = ld.loader_registry.generation("users")
+
+    first = ld.load_user_data()
+    assert ld.load_user_data() is first
+    assert ld.loader_registry.generation("users") == generation + 1
+
+    path.write_text("id,age\n1,30\n2,40\n")
+    reloaded = ld.load_user_data()
+
+    assert reloaded is not first
+    assert len(reloaded) == 2
+    assert ld.loader_registry.generation("users") == generation + 2
+
+
+def test_load_mcc_codes_flat_json(tmp_path, monkeypatch):
+    (tmp_path / "mcc_codes.json").write_text(
+        '{"5812": "Eating Places", "5411": "Grocery Stores"}'
+    )
+    monkeypatch.setattr(ld, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(ld, "_mcc_codes_df", None)
+
+    df = ld.load_mcc_codes()
+
+    assert df.columns.tolist() == ["mcc", "description"]
+    assert df.set_index("mcc")["description"][5812] == "Eating Places"
@@ -1,10 +1,30 @@
+import base64
+import gc
+from collections import deque
+
+import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch
 import pandas as pd
 from app.main import app
+import orjson
+
+import app.data.load_data as ld
+from app.data import planner
+from app.data import store as store_module
+from app.data.store import get_store
+from app.route.cursors import (
+    SIGNATURE_SIZE,
+    cursor_scope,
+    decode_cursor,
+    encode_cursor,
+)
 
 client = TestClient(app)
 
+# Routes servies en mode de confiance puis en mode validé
+pytestmark = pytest.mark.usefixtures("validate_responses")
+
 # -------------------------------
 # MOCK DATA
 # -------------------------------
@@ -209,3 +229,319 @@ def test_transactions_generic_error(mock_load):
     mock_load.side_effect = Exception("Erreur")
     response = client.get("/api/transactions")
     assert response.status_code == 500
+
+
+# 13. Test GET plusieurs transactions par ID
+
+
+@patch("app.route.transaction_routes.load_transactions")
+def test_get_transactions_batch(mock_load):
+    mock_load.return_value = MOCK_TRANS
+    response = client.get("/api/transactions/batch?ids=3&ids=999&ids=1")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 2
+    assert [t["id"] for t in data["data"]] == [3, 1]
+    assert data["missing"] == [999]
+
+
+# 14. Test GET transactions par client, ordre chronologique
+
+
+@patch("app.route.transaction_routes.load_transactions")
+def test_get_transactions_by_customer_chronological(mock_load):
+    mock_load.return_value = MOCK_TRANS.iloc[::-1].reset_index(drop=True)
+    response = client.get("/api/transactions/by-customer/101?limit=1&offset=1")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 2
+    assert [t["id"] for t in data["data"]] == [2]
+
+
+# 15. Test filtres par date (index trié) et transactions récentes
+
+
+@patch("app.route.transaction_routes.load_transactions")
+def test_get_transactions_date_range(mock_load):
+    mock_load.return_value = MOCK_TRANS
+    response = client.get(
+        "/api/transactions?start_date=2026-01-02&end_date=2026-01-03"
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [t["id"] for t in data["data"]] == [2, 3]
+    assert MOCK_TRANS["date"].dtype == object
+
+
+@patch("app.route.transaction_routes.load_transactions")
+def test_get_transactions_client_and_date(mock_load):
+    mock_load.return_value = MOCK_TRANS
+    response = client.get(
+        "/api/transactions?client_id=101&start_date=2026-01-02"
+    )
+    assert [t["id"] for t in response.json()["data"]] == [2]
+
+
+@patch("app.route.transaction_routes.load_transactions")
+def test_get_transactions_invalid_date(mock_load):
+    mock_load.return_value = MOCK_TRANS
+    response = client.get("/api/transactions?start_date=hier")
+    assert response.status_code == 400
+
+
+@patch("app.route.transaction_routes.load_transactions")
+def test_get_transactions_rejects_nat_and_timezone(mock_load):
+    mock_load.return_value = MOCK_TRANS
+    for bound in ["NaT", "2026-01-02T00:00:00+02:00"]:
+        response = client.get(
+            "/api/transactions", params={"end_date": bound}
+        )
+        assert response.status_code == 400, bound
+
+
+@patch("app.route.transaction_routes.load_transactions")
+def test_get_recent_transactions_newest_first(mock_load):
+    mock_load.return_value = MOCK_TRANS
+    response = client.get("/api/transactions/recent?n=2")
+    assert [t["id"] for t in response.json()["data"]] == [3, 2]
+
+
+# 16. Test plan de requête (explain)
+
+
+@patch("app.route.transaction_routes.load_transactions")
+def test_get_transactions_explain(mock_load):
+    mock_load.return_value = MOCK_TRANS
+    # Index construits : les deux chemins sont estimés
+    get_store(MOCK_TRANS).prepare().sorted_index("amount")
+    response = client.get(
+        "/api/transactions?client_id=101&min_amount=1000&explain=true"
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [t["id"] for t in data["data"]] == [2]
+    assert data["plan"]["access_path"] == "amount"
+    assert data["plan"]["estimates"]["amount >= 1000.0"] == 1
+    assert data["plan"]["estimates"]["client_id = 101"] == 2
+    assert [s["stage"] for s in data["plan"]["stages"]] == [
+        "plan",
+        "access:amount",
+        "filter:client_id = 101",
+        "sort",
+        "materialize",
+    ]
+
+
+# 17. Pagination par curseur
+
+
+def follow_cursor(url, limit, method="get", **kwargs):
+    ids, cursor = [], None
+    while True:
+        page_url = f"{url}{'&' if '?' in url else '?'}limit={limit}"
+        if cursor:
+            page_url += f"&cursor={cursor}"
+        data = getattr(client, method)(page_url, **kwargs).json()
+        ids += [t["id"] for t in data["data"]]
+        cursor = data["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+@patch("app.route.transaction_routes.load_transactions")
+def test_cursor_pages_cover_listing(mock_load):
+    mock_load.return_value = MOCK_TRANS
+    assert follow_cursor("/api/transactions", 2) == [1, 2, 3]
+    assert follow_cursor("/api/transactions?min_amount=200", 1) == [2, 3]
+    assert follow_cursor("/api/transactions/by-customer/101", 1) == [1, 2]
+    assert follow_cursor(
+        "/api/transactions/search", 1, method="post", json={"isFraud": 0}
+    ) == [1, 3]
+
+
+@patch("app.route.transaction_routes.load_transactions")
+def test_search_without_limit_returns_everything(mock_load):
+    mock_load.return_value = MOCK_TRANS
+    data = client.post("/api/transactions/search", json={}).json()
+    assert data["total"] == 3 and data["next_cursor"] is None
+
+
+@patch("app.route.transaction_routes.load_transactions")
+def test_cursor_rejects_other_query_and_tampering(mock_load):
+    mock_load.return_value = MOCK_TRANS
+    cursor = client.get("/api/transactions?limit=1").json()["next_cursor"]
+    response = client.get(f"/api/transactions?client_id=101&cursor={cursor}")
+    assert response.status_code == 400
+    response = client.get(f"/api/transactions?cursor={cursor[:-2]}")
+    assert response.status_code == 400
+
+
+@patch("app.route.transaction_routes.load_transactions")
+def test_cursor_reads_its_snapshot(mock_load, monkeypatch):
+    mock_load.return_value = MOCK_TRANS
+    cursor = client.get("/api/transactions?limit=2").json()["next_cursor"]
+
+    # Rechargement : le snapshot du curseur reste lu tant qu'il est gardé
+    monkeypatch.setattr(ld, "_retained_snapshots", deque([MOCK_TRANS]))
+    mock_load.return_value = MOCK_TRANS.iloc[:1].copy()
+    data = client.get(f"/api/transactions?limit=2&cursor={cursor}").json()
+    assert data["total"] == 3
+    assert [t["id"] for t in data["data"]] == [3]
+
+
+@patch("app.route.transaction_routes.load_transactions")
+def test_cursor_signed(mock_load):
+    mock_load.return_value = MOCK_TRANS
+    cursor = client.get("/api/transactions?limit=1").json()["next_cursor"]
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    payload, signature = raw[:-SIGNATURE_SIZE], raw[-SIGNATURE_SIZE:]
+    scope, version, offset, total, row, key = orjson.loads(payload)
+
+    # Position modifiée, signature d'origine
+    forged = orjson.dumps([scope, version, offset, total, 1, key])
+    token = base64.urlsafe_b64encode(forged + signature).rstrip(b"=")
+    response = client.get(f"/api/transactions?limit=1&cursor={token.decode()}")
+    assert response.status_code == 400
+
+
+@patch("app.route.transaction_routes.load_transactions")
+def test_cursor_only_reads_transaction_snapshots(mock_load):
+    mock_load.return_value = MOCK_TRANS
+    url = "/api/transactions/by-customer/101?limit=1"
+    scope = cursor_scope("by-customer", 101)
+    valid = client.get(url).json()["next_cursor"]
+    assert client.get(f"{url}&cursor={valid}").status_code == 200
+
+    # DataFrame enregistré hors des snapshots de transactions
+    other = MOCK_TRANS.copy()
+    cursor = decode_cursor(valid, scope)
+    cursor.version = get_store(other).version
+    token = encode_cursor(scope, cursor)
+    assert client.get(f"{url}&cursor={token}").status_code == 410
+
+
+@patch("app.route.transaction_routes.load_transactions")
+def test_cursor_resumes_without_cached_result(mock_load, monkeypatch):
+    mock_load.return_value = MOCK_TRANS.copy()
+    # Aucun résultat mémorisé : chaque page reprend après la précédente
+    monkeypatch.setattr(store_module, "QUERY_CACHE_ROWS", 0)
+    executions = []
+    execute = planner.QueryPlan.execute
+
+    def counted(plan):
+        executions.append(plan)
+        return execute(plan)
+
+    monkeypatch.setattr(planner.QueryPlan, "execute", counted)
+
+    assert follow_cursor("/api/transactions?min_amount=200", 1) == [2, 3]
+    assert follow_cursor("/api/transactions?client_id=101", 1) == [1, 2]
+    assert len(executions) == 2
+    assert follow_cursor(
+        "/api/transactions/search", 1, method="post", json={"isFraud": 0}
+    ) == [1, 3]
+
+
+@patch("app.route.transaction_routes.load_transactions")
+def test_cursor_expired_snapshot(mock_load):
+    mock_load.return_value = MOCK_TRANS.copy()
+    cursor = client.get("/api/transactions?limit=1").json()["next_cursor"]
+
+    mock_load.return_value = MOCK_TRANS
+    gc.collect()
+    response = client.get(f"/api/transactions?limit=1&cursor={cursor}")
+    assert response.status_code == 410
+
+
+# 18. Projection des champs (fields=)
+
+
+@patch("app.route.transaction_routes.load_transactions")
+def test_fields_projection(mock_load):
+    mock_load.return_value = MOCK_TRANS
+    for url in (
+        "/api/transactions?fields=amount,id,date",
+        "/api/transactions?client_id=101&fields=amount,id,date",
+        "/api/transactions/by-customer/101?fields=amount,id,date",
+        "/api/transactions/recent?fields=amount,id,date",
+    ):
+        data = client.get(url).json()["data"]
+        assert list(data[0]) == ["id", "date", "amount"], url
+
+    response = client.post(
+        "/api/transactions/search?fields=id,use_chip", json={"isFraud": 1}
+    )
+    assert response.json()["data"] == [{"id": 2, "use_chip": "TRANSFER"}]
+
+    response = client.post(
+        "/api/transactions/search?fields=id,amount",
+        json={},
+        headers={"Accept": "text/csv"},
+    )
+    assert response.text.splitlines()[:2] == ["id,amount", "1,100.0"]
+
+
+@patch("app.route.transaction_routes.load_transactions")
+def test_fields_unknown(mock_load):
+    mock_load.return_value = MOCK_TRANS
+    response = client.get("/api/transactions?fields=id,secret")
+    assert response.status_code == 400
+    assert "secret" in response.json()["detail"]
+
+
+# 19. Formats colonnaires (format=columnar, Arrow)
+
+
+@patch("app.route.transaction_routes.load_transactions")
+def test_columnar_json(mock_load):
+    mock_load.return_value = MOCK_TRANS
+    data = client.get(
+        "/api/transactions?limit=2&format=columnar&fields=id,amount"
+    ).json()
+    assert data["data"] == {"id": [1, 2], "amount": [100.0, 2000.0]}
+    assert data["total"] == 3 and data["next_cursor"] is not None
+
+    data = client.post(
+        "/api/transactions/search?format=columnar&fields=id", json={}
+    ).json()
+    assert data["data"] == {"id": [1, 2, 3]}
+
+    response = client.get("/api/transactions?format=rows")
+    assert response.status_code == 422
+
+
+@patch("app.route.transaction_routes.load_transactions")
+def test_arrow_without_pyarrow(mock_load, monkeypatch):
+    from app.route import columnar
+
+    mock_load.return_value = MOCK_TRANS
+    monkeypatch.setattr(columnar, "pa", None)
+    headers = {"Accept": "application/vnd.apache.arrow.stream"}
+
+    assert client.get(
+        "/api/transactions", headers=headers
+    ).status_code == 406
+    assert client.post(
+        "/api/transactions/search", json={}, headers=headers
+    ).status_code == 406
+
+
+@patch("app.route.transaction_routes.load_transactions")
+def test_arrow_stream(mock_load):
+    pa = pytest.importorskip("pyarrow")
+
+    mock_load.return_value = MOCK_TRANS
+    headers = {"Accept": "application/vnd.apache.arrow.stream"}
+    response = client.get(
+        "/api/transactions?limit=2&fields=id,amount", headers=headers
+    )
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.column_names == ["id", "amount"]
+    assert table.column("id").to_pylist() == [1, 2]
+    assert response.headers["X-Total-Count"] == "3"
+
+    response = client.post(
+        "/api/transactions/search", json={"isFraud": 0}, headers=headers
+    )
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.column("id").to_pylist() == [1, 3]
@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from app.data.registry import LoaderRegistry
+from app.data.warmup import DatasetWarmup
+from app.route import administration_routes as admin
+from app.route import dependencies
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def blocked_warmup(monkeypatch):
+    """Préchargement dont le dataset `transactions` reste en cours."""
+    release = threading.Event()
+    done = threading.Event()
+    registry = LoaderRegistry()
+
+    def parse():
+        registry.report_progress("transactions", 0.5)
+        release.wait(timeout=5)
+        done.set()
+        return "ok"
+
+    warmup = DatasetWarmup(
+        {
+            "transactions": lambda: registry.load("transactions", parse),
+            "users": lambda: None,
+        },
+        registry,
+    )
+    monkeypatch.setattr(dependencies, "warmup", warmup)
+    monkeypatch.setattr(admin, "warmup", warmup)
+    warmup.start()
+    yield warmup, release, done
+    release.set()
+
+
+def test_data_routes_unavailable_while_loading(client, blocked_warmup):
+    response = client.get("/api/transactions/types")
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+
+
+def test_readiness_reports_progress(client, blocked_warmup):
+    response = client.get("/api/system/ready")
+    data = response.json()
+
+    assert response.status_code == 503
+    assert data["status"] == "loading"
+    assert data["datasets"]["transactions"]["progress"] == 0.5
+
+
+def test_ready_once_loaded(client, blocked_warmup, monkeypatch):
+    warmup, release, _ = blocked_warmup
+    release.set()
+    wait_until(lambda: warmup.status == "ready")
+
+    monkeypatch.setattr(
+        "app.route.transaction_routes.load_transactions",
+        lambda: pd.DataFrame({"use_chip": ["Chip Transaction"]}),
+    )
+
+    assert client.get("/api/system/ready").json()["status"] == "ready"
+    assert client.get("/api/transactions/types").status_code == 200
+
+
+def test_failed_loader_reported():
+    def broken():
+        raise FileNotFoundError("absent")
+
+    warmup = DatasetWarmup({"cards": broken})
+    warmup.start()
+    wait_until(lambda: warmup.status != "loading")
+
+    report = warmup.report()
+    assert report["status"] == "failed"
+    assert report["datasets"]["cards"]["error"] == "absent"
+
+
+def test_idle_without_warmup(client):
+    response = client.get("/api/system/ready")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "idle"